@@ -18,12 +18,15 @@ import androidx.recyclerview.widget.RecyclerView;
 
 import com.example.mobile.api.ApiService;
 import com.example.mobile.api.FallEvent;
+import com.example.mobile.api.FallEventChanges;
 import com.example.mobile.api.RetrofitClient;
 import com.example.mobile.ui.FallEventAdapter;
 import com.example.mobile.ui.ImageZoomDialog;
 import com.google.android.material.floatingactionbutton.FloatingActionButton;
 
 import java.util.List;
+import java.util.regex.Matcher;
+import java.util.regex.Pattern;
 
 import retrofit2.Call;
 import retrofit2.Callback;
@@ -42,10 +45,16 @@ public class MainActivity extends AppCompatActivity {
     private static final long CHECK_INTERVAL = 10000; // 10초마다 체크
     private int lastEventId = -1; // 마지막으로 확인한 이벤트 ID
 
+    private static final Pattern NEXT_LINK = Pattern.compile("<([^>]+)>;\\s*rel=\"next\"");
+    private String nextPageUrl = null; // 다음 페이지 URL (없으면 마지막 페이지)
+    private String syncToken = null; // 변경분 동기화 토큰 (/api/fall-events/changes/)
+    private boolean loadingMore = false;
+
     @Override
     protected void onCreate(Bundle savedInstanceState) {
         super.onCreate(savedInstanceState);
         setContentView(R.layout.activity_fall_events);
+        RetrofitClient.init(this);
 
         Toolbar toolbar = findViewById(R.id.toolbar);
         setSupportActionBar(toolbar);
@@ -76,6 +85,18 @@ public class MainActivity extends AppCompatActivity {
         });
         recyclerView.setAdapter(adapter);
 
+        // 목록 끝에 가까워지면 다음 페이지 로드
+        recyclerView.addOnScrollListener(new RecyclerView.OnScrollListener() {
+            @Override
+            public void onScrolled(RecyclerView recyclerView, int dx, int dy) {
+                LinearLayoutManager layoutManager = (LinearLayoutManager) recyclerView.getLayoutManager();
+                if (dy > 0 && layoutManager != null
+                        && layoutManager.findLastVisibleItemPosition() >= adapter.getItemCount() - 5) {
+                    loadMoreFallEvents();
+                }
+            }
+        });
+
         // 새로고침 버튼 클릭 리스너
         fabRefresh.setOnClickListener(v -> loadFallEvents());
 
@@ -83,6 +104,8 @@ public class MainActivity extends AppCompatActivity {
         handler = new Handler(Looper.getMainLooper());
         
         // 초기 데이터 로드
+        // 토큰은 서버가 최근 몇 초를 보류한 시점이므로 목록보다 앞서고, 그 사이 이벤트는 변경분으로 다시 옴
+        fetchSyncToken();
         loadFallEvents();
         
         // 주기적으로 새 이벤트 체크 시작
@@ -132,6 +155,7 @@ public class MainActivity extends AppCompatActivity {
 
                 if (response.isSuccessful() && response.body() != null) {
                     List<FallEvent> events = response.body();
+                    nextPageUrl = parseNextLink(response.headers().get("Link"));
                     if (events.isEmpty()) {
                         // 빈 상태 표시
                         emptyTextView.setVisibility(View.VISIBLE);
@@ -163,6 +187,47 @@ public class MainActivity extends AppCompatActivity {
         });
     }
 
+    /**
+     * 다음 페이지를 가져와 목록 뒤에 추가
+     */
+    private void loadMoreFallEvents() {
+        if (loadingMore || nextPageUrl == null) {
+            return;
+        }
+        loadingMore = true;
+
+        ApiService apiService = RetrofitClient.getApiService();
+        Call<List<FallEvent>> call = apiService.getFallEventsPage(nextPageUrl);
+
+        call.enqueue(new Callback<List<FallEvent>>() {
+            @Override
+            public void onResponse(Call<List<FallEvent>> call, Response<List<FallEvent>> response) {
+                loadingMore = false;
+                if (response.isSuccessful() && response.body() != null) {
+                    nextPageUrl = parseNextLink(response.headers().get("Link"));
+                    adapter.addFallEvents(response.body());
+                }
+            }
+
+            @Override
+            public void onFailure(Call<List<FallEvent>> call, Throwable t) {
+                // 다음 스크롤 때 다시 시도
+                loadingMore = false;
+            }
+        });
+    }
+
+    /**
+     * Link 헤더에서 rel="next" URL 추출
+     */
+    private static String parseNextLink(String linkHeader) {
+        if (linkHeader == null) {
+            return null;
+        }
+        Matcher matcher = NEXT_LINK.matcher(linkHeader);
+        return matcher.find() ? matcher.group(1) : null;
+    }
+
     /**
      * 에러 메시지 표시
      */
@@ -220,36 +285,73 @@ public class MainActivity extends AppCompatActivity {
     }
     
     /**
-     * 새로운 이벤트가 있는지 확인
+     * 동기화 토큰 받기 (현재 시점부터 변경분을 받기 위함)
+     */
+    private void fetchSyncToken() {
+        ApiService apiService = RetrofitClient.getApiService();
+        apiService.getChanges(null).enqueue(new Callback<FallEventChanges>() {
+            @Override
+            public void onResponse(Call<FallEventChanges> call, Response<FallEventChanges> response) {
+                if (response.isSuccessful() && response.body() != null && syncToken == null) {
+                    syncToken = response.body().next;
+                }
+            }
+
+            @Override
+            public void onFailure(Call<FallEventChanges> call, Throwable t) {
+                // 다음 정기 체크에서 다시 시도
+            }
+        });
+    }
+
+    /**
+     * 마지막 동기화 이후 새로 생기거나 바뀐 이벤트가 있는지 확인
      */
     private void checkForNewEvents() {
+        if (syncToken == null) {
+            fetchSyncToken();
+            return;
+        }
         ApiService apiService = RetrofitClient.getApiService();
-        Call<List<FallEvent>> call = apiService.getFallEvents();
+        Call<FallEventChanges> call = apiService.getChanges(syncToken);
 
-        call.enqueue(new Callback<List<FallEvent>>() {
+        call.enqueue(new Callback<FallEventChanges>() {
             @Override
-            public void onResponse(Call<List<FallEvent>> call, Response<List<FallEvent>> response) {
+            public void onResponse(Call<FallEventChanges> call, Response<FallEventChanges> response) {
                 if (response.isSuccessful() && response.body() != null) {
-                    List<FallEvent> events = response.body();
-                    if (!events.isEmpty()) {
-                        int latestId = events.get(0).id;
-                        
-                        // 새로운 이벤트가 있는지 확인
-                        if (lastEventId != -1 && latestId > lastEventId) {
-                            // 새 이벤트 발견
-                            showNewEventWarning(events.get(0));
-                            // 목록 새로고침
-                            loadFallEvents();
-                        } else if (lastEventId == -1 && !events.isEmpty()) {
-                            // 첫 로드 시 마지막 ID 저장
-                            lastEventId = latestId;
+                    FallEventChanges changes = response.body();
+                    syncToken = changes.next;
+                    if (changes.events == null || changes.events.isEmpty()) {
+                        return;
+                    }
+
+                    // 새로운 이벤트가 있는지 확인 (목록의 최신 ID보다 큰 ID)
+                    FallEvent newest = null;
+                    for (FallEvent event : changes.events) {
+                        if (event.id > lastEventId && (newest == null || event.id > newest.id)) {
+                            newest = event;
                         }
                     }
+                    if (newest != null) {
+                        // 새 이벤트 발견
+                        showNewEventWarning(newest);
+                        // 목록 새로고침 (변경이 없는 페이지는 304로 끝남)
+                        loadFallEvents();
+                    } else {
+                        // 기존 이벤트의 변경 (예: 확인 처리)만 반영
+                        adapter.updateFallEvents(changes.events);
+                    }
+                    if (changes.has_more) {
+                        checkForNewEvents();
+                    }
+                } else if (response.code() == 400) {
+                    // 토큰이 유효하지 않음: 새로 받기
+                    syncToken = null;
                 }
             }
 
             @Override
-            public void onFailure(Call<List<FallEvent>> call, Throwable t) {
+            public void onFailure(Call<FallEventChanges> call, Throwable t) {
                 // 조용히 실패 (에러 표시 안 함, 정기 체크이므로)
             }
         });
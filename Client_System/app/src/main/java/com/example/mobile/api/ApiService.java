@@ -4,6 +4,7 @@ import java.util.List;
 import retrofit2.Call;
 import retrofit2.http.GET;
 import retrofit2.http.Query;
+import retrofit2.http.Url;
 
 /**
  * RESTful API 서비스 인터페이스
@@ -11,12 +12,30 @@ import retrofit2.http.Query;
  */
 public interface ApiService {
     /**
-     * 모든 낙상 이벤트 목록 조회
+     * 최신 낙상 이벤트 첫 페이지 조회
      * GET /api/fall-events/list/
+     * 다음 페이지 URL은 응답의 Link 헤더(rel="next")에 있음 → getFallEventsPage()
      */
     @GET("api/fall-events/list/")
     Call<List<FallEvent>> getFallEvents();
 
+    /**
+     * 마지막 동기화 이후 생성/수정된 이벤트만 조회 (새 이벤트 확인용)
+     * GET /api/fall-events/changes/?since=...
+     *
+     * @param since 이전 응답의 next 값. null이면 이벤트 없이 현재 시점의 토큰만 받음
+     */
+    @GET("api/fall-events/changes/")
+    Call<FallEventChanges> getChanges(@Query("since") String since);
+
+    /**
+     * 다음 페이지 조회
+     *
+     * @param nextUrl 이전 응답의 Link 헤더에 있는 rel="next" URL
+     */
+    @GET
+    Call<List<FallEvent>> getFallEventsPage(@Url String nextUrl);
+
     /**
      * 기간별 필터링된 낙상 이벤트 목록 조회
      * GET /api/fall-events/list/?start_date=2025-12-01T00:00:00Z&end_date=2025-12-31T23:59:59Z
@@ -6,10 +6,14 @@ package com.example.mobile.api;
 public class FallEvent {
     public int id;
     public String image_url;
+    public String thumbnail_url; // 목록용 축소본 (없으면 원본 URL)
+    public String medium_url;
+    public String webp_url;      // 아직 생성 전이면 null
     public String location;
     public String description;
     public String occurred_at;
     public String created_at;
+    public String updated_at;
     public boolean is_checked;
 
     public FallEvent() {
@@ -0,0 +1,15 @@
+package com.example.mobile.api;
+
+import java.util.List;
+
+/**
+ * 변경분 동기화 응답 (GET /api/fall-events/changes/)
+ */
+public class FallEventChanges {
+    public List<FallEvent> events; // 마지막 동기화 이후 생성/수정된 이벤트
+    public String next;            // 다음 요청의 since 값
+    public boolean has_more;       // true면 바로 다시 요청
+
+    public FallEventChanges() {
+    }
+}
@@ -1,5 +1,11 @@
 package com.example.mobile.api;
 
+import android.content.Context;
+
+import java.io.File;
+
+import okhttp3.Cache;
+import okhttp3.OkHttpClient;
 import retrofit2.Retrofit;
 import retrofit2.converter.gson.GsonConverterFactory;
 
@@ -15,6 +21,28 @@ public class RetrofitClient {
 
     private static Retrofit retrofit;
     private static ApiService apiService;
+    private static OkHttpClient httpClient;
+
+    /**
+     * HTTP 캐시 설정 (Activity onCreate에서 한 번 호출)
+     * 서버가 ETag/Last-Modified를 주므로 캐시된 응답은 조건부 요청으로 재검증되고,
+     * 변경이 없으면 304 응답만 받아 캐시된 본문을 그대로 사용
+     */
+    public static void init(Context context) {
+        if (httpClient == null) {
+            File cacheDir = new File(context.getCacheDir(), "http");
+            httpClient = new OkHttpClient.Builder()
+                    .cache(new Cache(cacheDir, 10L * 1024 * 1024))
+                    .build();
+        }
+    }
+
+    private static OkHttpClient getHttpClient() {
+        if (httpClient == null) {
+            httpClient = new OkHttpClient();
+        }
+        return httpClient;
+    }
 
     /**
      * Retrofit 인스턴스 생성
@@ -23,6 +51,7 @@ public class RetrofitClient {
         if (retrofit == null) {
             retrofit = new Retrofit.Builder()
                     .baseUrl(BASE_URL)
+                    .client(getHttpClient())
                     .addConverterFactory(GsonConverterFactory.create())
                     .build();
         }
@@ -45,6 +74,7 @@ public class RetrofitClient {
     public static void setBaseUrl(String baseUrl) {
         retrofit = new Retrofit.Builder()
                 .baseUrl(baseUrl)
+                .client(getHttpClient())
                 .addConverterFactory(GsonConverterFactory.create())
                 .build();
         apiService = retrofit.create(ApiService.class);
@@ -68,6 +68,24 @@ public class FallEventAdapter extends RecyclerView.Adapter<FallEventAdapter.View
         }
     }
 
+    /**
+     * 이미 목록에 있는 이벤트를 변경된 내용으로 교체 (예: is_checked 변경)
+     */
+    public void updateFallEvents(List<FallEvent> events) {
+        if (events == null) {
+            return;
+        }
+        for (FallEvent changed : events) {
+            for (int i = 0; i < fallEvents.size(); i++) {
+                if (fallEvents.get(i).id == changed.id) {
+                    fallEvents.set(i, changed);
+                    notifyItemChanged(i);
+                    break;
+                }
+            }
+        }
+    }
+
     class ViewHolder extends RecyclerView.ViewHolder {
         private ImageView imageView;
         private TextView locationTextView;
@@ -94,8 +112,10 @@ public class FallEventAdapter extends RecyclerView.Adapter<FallEventAdapter.View
         void bind(FallEvent event) {
             // 이미지 로드 (Glide 사용)
             if (event.image_url != null && !event.image_url.isEmpty()) {
+                // 목록에는 썸네일만 로드 (확대 보기는 원본)
+                String listImageUrl = event.thumbnail_url != null ? event.thumbnail_url : event.image_url;
                 Glide.with(itemView.getContext())
-                        .load(event.image_url)
+                        .load(listImageUrl)
                         .placeholder(android.R.drawable.ic_menu_gallery) // 로딩 중 이미지
                         .error(android.R.drawable.ic_dialog_alert) // 에러 시 이미지
                         .centerCrop()
@@ -0,0 +1,153 @@
+"""
+Offline fall analysis of recorded video files, as fast as the CPU allows.
+
+A decoder thread prefetches frames, the detector runs on batches of frames
+and nothing is displayed. Cooldowns use video time, not wall-clock time.
+The result is a fall timeline (JSON or CSV) plus throughput figures.
+
+Usage:
+    python analyze.py videos/ssitdown.mp4 [--output timeline.json] [--batch-size 8]
+"""
+import argparse
+import csv
+import json
+import os
+import threading
+import time
+
+import cv2
+
+from detection_log import LOG_SUFFIX, DetectionLogWriter
+from detector import BACKENDS, create_detector
+from main import CONF_THRESHOLD, COOLDOWN_SECONDS  # same thresholds as the live system
+from pipeline import CaptureThread, FrameQueue, StageStats
+from tracker import PersonTracker
+from video_source import get_capture
+
+PREFETCH_FRAMES = 64  # decoded frames buffered ahead of inference
+
+
+def format_video_time(seconds):
+    minutes, secs = divmod(seconds, 60)
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:06.3f}"
+
+
+def analyze_video(path, detector, batch_size=8, detection_log=None):
+    """
+    Run the detector and tracker over every frame of `path`.
+    Returns (events, summary): one event dict per confirmed fall and the throughput figures.
+    detection_log: optional DetectionLogWriter; tracked detections are recorded with video time.
+    """
+    cap = get_capture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    if fps <= 0:
+        fps = 30  # Default FPS if cannot detect
+
+    decode_stats = StageStats("decode")
+    frame_queue = FrameQueue(PREFETCH_FRAMES, drop_oldest=False, stats=StageStats("analyze"))
+    decoder = CaptureThread(cap, frame_queue, threading.Event(), decode_stats)
+    tracker = PersonTracker(cooldown_seconds=COOLDOWN_SECONDS)
+
+    events = []
+    frame_index = 0
+    inference_seconds = 0.0
+    started = time.perf_counter()
+    decoder.start()
+    try:
+        done = False
+        while not done:
+            batch = []
+            while len(batch) < batch_size:
+                frame = frame_queue.get()
+                if frame is None:
+                    done = True
+                    break
+                batch.append(frame)
+            if not batch:
+                break
+
+            t0 = time.perf_counter()
+            batch_detections = detector.detect(batch)
+            inference_seconds += time.perf_counter() - t0
+
+            for detections in batch_detections:
+                video_time = frame_index / fps
+                tracks = tracker.update(detections.xyxy, now=video_time)
+                if detection_log is not None and tracks:
+                    matched = [t.detection for t in tracks]
+                    detection_log.record(video_time, frame_index, [t.track_id for t in tracks],
+                                         detections.xyxy[matched], detections.conf[matched])
+                fallen = [t for t in tracks if t.fell]
+                if fallen:
+                    events.append({
+                        "frame": frame_index,
+                        "video_time_s": round(video_time, 3),
+                        "video_time": format_video_time(video_time),
+                        "track_ids": [t.track_id for t in fallen],
+                        "persons": len(detections),
+                    })
+                    print(f"[{format_video_time(video_time)}] FALL DETECTED (track "
+                          f"{', '.join(f'#{t.track_id}' for t in fallen)})")
+                frame_index += 1
+    finally:
+        frame_queue.close()
+        decoder.close(timeout=2)  # releases cap once no read is in progress
+
+    elapsed = time.perf_counter() - started
+    video_seconds = frame_index / fps
+    summary = {
+        "source": path,
+        "backend": detector.name,
+        "frames": frame_index,
+        "video_seconds": round(video_seconds, 3),
+        "elapsed_seconds": round(elapsed, 3),
+        "inference_seconds": round(inference_seconds, 3),
+        "fps": round(frame_index / elapsed, 2) if elapsed else 0.0,
+        "speedup_vs_realtime": round(video_seconds / elapsed, 2) if elapsed else 0.0,
+        "falls": len(events),
+    }
+    return events, summary
+
+
+def write_timeline(events, summary, output):
+    """JSON keeps the summary next to the events; CSV holds one row per event."""
+    if output.endswith(".csv"):
+        with open(output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["frame", "video_time_s", "video_time", "track_ids", "persons"])
+            writer.writeheader()
+            for event in events:
+                writer.writerow({**event, "track_ids": " ".join(map(str, event["track_ids"]))})
+    else:
+        with open(output, "w") as f:
+            json.dump({"summary": summary, "events": events}, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline fall analysis of recorded video")
+    parser.add_argument("video", help="video file to analyze")
+    parser.add_argument("--output", default=None, help="timeline file, .json or .csv (default: <video>_falls.json)")
+    parser.add_argument("--batch-size", type=int, default=8, help="frames per detector call (default: 8)")
+    parser.add_argument("--backend", choices=BACKENDS, default="ultralytics")
+    parser.add_argument("--weights", default="yolov8n.pt")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--int8", action="store_true")
+    parser.add_argument("--record", action="store_true",
+                        help="also write the tracked detections to <video>.dlog for replay.py")
+    args = parser.parse_args()
+
+    output = args.output or f"{os.path.splitext(args.video)[0]}_falls.json"
+    detector = create_detector(args.backend, weights=args.weights, imgsz=args.imgsz,
+                               conf=CONF_THRESHOLD, int8=args.int8)
+    detection_log = DetectionLogWriter(f"{os.path.splitext(args.video)[0]}{LOG_SUFFIX}", append=False) if args.record else None
+    try:
+        events, summary = analyze_video(args.video, detector, batch_size=args.batch_size,
+                                        detection_log=detection_log)
+    finally:
+        if detection_log is not None:
+            detection_log.close()
+    write_timeline(events, summary, output)
+
+    print(f"\n{len(events)} fall(s) in {summary['frames']} frames → {output}")
+    print(f"{summary['fps']} FPS, {summary['speedup_vs_realtime']}x real time "
+          f"(inference {summary['inference_seconds']}s of {summary['elapsed_seconds']}s)")
@@ -0,0 +1,129 @@
+"""
+Repeatable benchmark of the edge pipeline (capture → motion gate → detector → tracker).
+
+Runs the real EdgeStream / inference_loop code headless on a clip, as fast as
+possible, with uploads disabled and fall evidence written to a temp directory.
+Reports frames per second and the per-stage latency breakdown so backends and
+settings can be compared.
+
+Usage:
+    python benchmark.py                          # bundled videos/ssitdown.mp4
+    python benchmark.py --synthetic --streams 4  # generated clip, 4 parallel streams
+    python benchmark.py --backend onnx --imgsz 416 --json onnx_416.json
+    python benchmark.py --workers 4              # detector in 4 processes (inference_pool.py)
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from detector import BACKENDS, create_detector
+from evidence import EvidenceWriter
+from inference_pool import InferencePool
+from main import CONF_THRESHOLD, EdgeStream, inference_loop
+from timing import TIMERS
+
+DEFAULT_CLIP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "videos", "ssitdown.mp4")
+
+
+def make_synthetic_clip(path, seconds=10, fps=30, size=(1280, 720)):
+    """A moving 'person' that stands, falls and gets up again, on a noisy background."""
+    w, h = size
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, size)
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 40, (h, w, 3), dtype=np.uint8)
+    for i in range(seconds * fps):
+        frame = background.copy()
+        x = 100 + (i * 4) % (w - 400)
+        if (i // (3 * fps)) % 2 == 0:
+            cv2.rectangle(frame, (x, h // 4), (x + 120, h - 60), (180, 160, 140), -1)  # standing
+        else:
+            cv2.rectangle(frame, (x, h - 200), (x + 320, h - 60), (180, 160, 140), -1)  # lying
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def run_benchmark(clip, detector, streams=1, idle_stride=1):
+    """Run `streams` copies of `clip` through one shared detector. Returns the result dict."""
+    TIMERS.reset()
+    # Fall evidence goes to a temp directory and nothing is uploaded
+    evidence = EvidenceWriter(tempfile.mkdtemp(prefix="edge_bench_")).start()
+    stop_event = threading.Event()
+    ready_event = threading.Event()
+    edge_streams = [
+        EdgeStream(clip, f"bench{i}", stop_event, ready_event, idle_stride=idle_stride)
+        for i in range(streams)
+    ]
+
+    started = time.perf_counter()
+    for stream in edge_streams:
+        stream.start()
+    inference_loop(detector, edge_streams, ready_event, evidence, render=False)
+    elapsed = time.perf_counter() - started
+    for stream in edge_streams:
+        stream.close()
+    evidence.stop()
+
+    frames = sum(stream.inference_stats.processed for stream in edge_streams)
+    return {
+        "clip": clip,
+        "backend": detector.name,
+        "imgsz": detector.imgsz,
+        "int8": detector.int8,
+        "streams": streams,
+        "idle_stride": idle_stride,
+        "frames": frames,
+        "elapsed_seconds": round(elapsed, 3),
+        "fps": round(frames / elapsed, 2) if elapsed else 0.0,
+        "stages": TIMERS.summary(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Edge pipeline benchmark")
+    parser.add_argument("--clip", default=DEFAULT_CLIP, help="video to run (default: bundled videos/ssitdown.mp4)")
+    parser.add_argument("--synthetic", action="store_true", help="generate a synthetic 720p clip instead")
+    parser.add_argument("--streams", type=int, default=1, help="parallel copies of the clip (default: 1)")
+    parser.add_argument("--idle-stride", type=int, default=1, help="motion gate stride (default: 1 = off)")
+    parser.add_argument("--backend", choices=BACKENDS, default="ultralytics")
+    parser.add_argument("--weights", default="yolov8n.pt")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--int8", action="store_true")
+    parser.add_argument("--workers", type=int, default=0, help="inference worker processes (default: 0 = in-process)")
+    parser.add_argument("--json", default=None, help="also write the result to this file")
+    args = parser.parse_args()
+
+    clip = args.clip
+    if args.synthetic:
+        clip = make_synthetic_clip(os.path.join(tempfile.mkdtemp(prefix="edge_bench_"), "synthetic.avi"))
+
+    detector_kwargs = {"backend": args.backend, "weights": args.weights, "imgsz": args.imgsz,
+                       "conf": CONF_THRESHOLD, "int8": args.int8}
+    if args.workers:
+        cap = cv2.VideoCapture(clip)
+        slot_bytes = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) * int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) * 3
+        cap.release()
+        detector = InferencePool(detector_kwargs, workers=args.workers, slot_bytes=slot_bytes).start()
+    else:
+        detector = create_detector(**detector_kwargs)
+        # The pool warms its workers up in start(); lazy first-call setup must not count as pipeline time
+        detector.warmup()
+    try:
+        result = run_benchmark(clip, detector, streams=args.streams, idle_stride=args.idle_stride)
+    finally:
+        if args.workers:
+            detector.close()
+    result["workers"] = args.workers
+
+    print(f"\n{result['backend']} imgsz={result['imgsz']} int8={result['int8']} streams={result['streams']}: "
+          f"{result['frames']} frames in {result['elapsed_seconds']}s → {result['fps']} FPS")
+    print(TIMERS.report())
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
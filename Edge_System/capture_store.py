@@ -0,0 +1,187 @@
+"""
+Size- and age-bounded store of saved fall evidence.
+
+Every fall leaves a group of files in SAVE_DIR sharing one prefix:
+
+    <YYYYmmdd_HHMMSS_mmm>_<room>_fall.jpg
+    <YYYYmmdd_HHMMSS_mmm>_<room>_pre_fall.mp4   (or a _pre_fall/ directory of JPEGs)
+    <YYYYmmdd_HHMMSS_mmm>_<room>_sequence.jpg
+
+Captures from before rooms were recorded are named <YYYYmmdd_HHMMSS>_fall.jpg
+etc. and are indexed the same way.
+
+CaptureStore keeps an index of these events (prefix → time, bytes) and a
+background thread evicts whole events, oldest first, when they are older
+than max_age_days or the store is over max_bytes. An event is only evicted
+once the outbox has it acknowledged by the server, so nothing that has not
+been uploaded is ever deleted, even if that leaves the store over budget.
+"""
+import os
+import re
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+EVENT_FILE = re.compile(r"^(\d{8}_\d{6}(?:_.+?)?)_(fall\.jpg|pre_fall\.mp4|pre_fall|sequence\.jpg)$")
+
+
+@dataclass
+class StoredEvent:
+    prefix: str
+    created: float  # epoch seconds
+    nbytes: int
+
+
+def _path_size(path):
+    if os.path.isdir(path):
+        return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+    return os.path.getsize(path)
+
+
+class CaptureStore:
+    """
+    save_dir: directory the EvidenceWriter writes to
+    outbox: Outbox used to check that an event's fall image was uploaded
+    max_bytes / max_age_days: budget; None disables that limit
+    interval: seconds between background sweeps (add() can trigger one sooner)
+    """
+
+    def __init__(self, save_dir, outbox, max_bytes=2 * 1024 ** 3, max_age_days=30, interval=60):
+        self.save_dir = save_dir
+        self.outbox = outbox
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.interval = interval
+        self.evicted = 0
+        self.evicted_bytes = 0
+        self.blocked = 0  # events kept over budget because they are not uploaded yet (last sweep)
+        self._index = {}  # prefix -> StoredEvent
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="capture-store", daemon=True)
+        self.rescan()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+
+    def rescan(self):
+        """Rebuild the index from the files on disk (temporary .tmp files are skipped)."""
+        groups = {}
+        if os.path.isdir(self.save_dir):
+            for name in os.listdir(self.save_dir):
+                match = EVENT_FILE.match(name)
+                if match:
+                    groups.setdefault(match.group(1), []).append(os.path.join(self.save_dir, name))
+        index = {}
+        for prefix, paths in groups.items():
+            index[prefix] = StoredEvent(prefix, self._created(prefix, paths), sum(_path_size(p) for p in paths))
+        with self._lock:
+            self._index = index
+
+    def add(self, prefix):
+        """Index a newly written event (EvidenceWriter on_written callback)."""
+        paths = self._paths(prefix)
+        event = StoredEvent(prefix, self._created(prefix, paths), sum(_path_size(p) for p in paths))
+        with self._lock:
+            self._index[prefix] = event
+            over = self.max_bytes is not None and self._total() > self.max_bytes
+        if over:
+            self._wake.set()
+
+    def _total(self):
+        return sum(event.nbytes for event in self._index.values())
+
+    def _paths(self, prefix):
+        paths = []
+        for suffix in ("fall.jpg", "pre_fall.mp4", "pre_fall", "sequence.jpg"):
+            path = os.path.join(self.save_dir, f"{prefix}_{suffix}")
+            if os.path.exists(path):
+                paths.append(path)
+        return paths
+
+    @staticmethod
+    def _created(prefix, paths):
+        try:
+            return datetime.strptime(prefix[:15], "%Y%m%d_%H%M%S").timestamp()
+        except ValueError:
+            return min((os.path.getmtime(p) for p in paths), default=time.time())
+
+    def _fall_path(self, prefix):
+        return os.path.join(self.save_dir, f"{prefix}_fall.jpg")
+
+    def sweep(self, now=None):
+        """Evict expired events, then the oldest until under max_bytes. Returns how many were evicted."""
+        now = time.time() if now is None else now
+        with self._lock:
+            events = sorted(self._index.values(), key=lambda e: e.created)
+            total = self._total()
+        cutoff = now - self.max_age_days * 86400 if self.max_age_days is not None else None
+
+        evicted = 0
+        blocked = 0
+        for event in events:
+            expired = cutoff is not None and event.created < cutoff
+            over = self.max_bytes is not None and total > self.max_bytes
+            if not expired and not over:
+                break  # oldest first: every later event is newer and the budget is met
+            if not self.outbox.is_acked(self._fall_path(event.prefix)):
+                blocked += 1
+                continue  # never delete what the server has not got
+            self._evict(event)
+            total -= event.nbytes
+            evicted += 1
+        self.blocked = blocked
+        if blocked and self.max_bytes is not None and total > self.max_bytes:
+            print(f"[store] Over budget ({total / 1e6:.0f} MB > {self.max_bytes / 1e6:.0f} MB) "
+                  f"but {blocked} event(s) are not uploaded yet")
+        return evicted
+
+    def _evict(self, event):
+        for path in self._paths(event.prefix):
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        with self._lock:
+            self._index.pop(event.prefix, None)
+        self.evicted += 1
+        self.evicted_bytes += event.nbytes
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                evicted = self.sweep()
+                if evicted:
+                    print(f"[store] Evicted {evicted} uploaded event(s); {self.stats()['bytes'] / 1e6:.0f} MB stored")
+            except Exception as e:
+                print(f"[store] Sweep failed: {type(e).__name__}: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self._total()
+            events = len(self._index)
+        usage = shutil.disk_usage(self.save_dir)
+        return {
+            "bytes": total,
+            "events": events,
+            "max_bytes": self.max_bytes,
+            "evicted": self.evicted,
+            "evicted_bytes": self.evicted_bytes,
+            "blocked": self.blocked,
+            "disk_free_bytes": usage.free,
+            "disk_total_bytes": usage.total,
+        }
@@ -0,0 +1,92 @@
+"""
+Compact binary log of per-frame person detections, for offline re-tuning.
+
+Each tracked detection is one fixed-size record (DETECTION_DTYPE, 26 bytes).
+Files are plain concatenations of records: appending is a single write and
+reading back is np.memmap, so replay.py can re-run the fall logic over weeks
+of detections without running YOLO again.
+
+File name: <timestamp>_<room>.dlog (same prefix style as the saved evidence).
+"""
+import os
+from datetime import datetime
+
+import numpy as np
+
+LOG_SUFFIX = ".dlog"
+
+DETECTION_DTYPE = np.dtype([
+    ("t", "<f8"),  # epoch seconds (live edge) or video seconds (analyze.py)
+    ("frame", "<u4"),  # index of the inferred frame within the log
+    ("track", "<u4"),  # PersonTracker track id
+    ("x1", "<i2"),
+    ("y1", "<i2"),
+    ("x2", "<i2"),
+    ("y2", "<i2"),
+    ("conf", "<f2"),
+])
+
+
+def log_path(log_dir, room, started=None):
+    started = started or datetime.now()
+    return os.path.join(log_dir, f"{started.strftime('%Y%m%d_%H%M%S')}_{room}{LOG_SUFFIX}")
+
+
+def room_from_path(path):
+    """Room part of a <YYYYmmdd>_<HHMMSS>_<room>.dlog name, or "" for other names."""
+    parts = os.path.basename(path)[:-len(LOG_SUFFIX)].split("_", 2)
+    return parts[2] if len(parts) == 3 and parts[0].isdigit() and parts[1].isdigit() else ""
+
+
+def load_log(path):
+    """Memory-map a log read-only. A record cut short by a crash at the end is ignored."""
+    count = os.path.getsize(path) // DETECTION_DTYPE.itemsize
+    if count == 0:
+        return np.empty(0, dtype=DETECTION_DTYPE)
+    return np.memmap(path, dtype=DETECTION_DTYPE, mode="r", shape=(count,))
+
+
+class DetectionLogWriter:
+    """
+    Appends detections to a .dlog file. Rows are staged in a preallocated
+    array and written flush_every rows at a time (and on close).
+    Not thread-safe: one writer per stream, used from the inference thread.
+    append=False starts the file over instead of adding to it.
+    """
+
+    def __init__(self, path, flush_every=1024, append=True):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.records = 0
+        self._buffer = np.zeros(flush_every, dtype=DETECTION_DTYPE)
+        self._staged = 0
+        self._file = open(path, "ab" if append else "wb")
+
+    def record(self, t, frame, track_ids, xyxy, conf):
+        """One frame: track_ids (n,), xyxy (n, 4) and conf (n,) of its tracked detections."""
+        n = len(track_ids)
+        if n == 0:
+            return
+        if self._staged + n > len(self._buffer):
+            self.flush()
+            if n > len(self._buffer):
+                self._buffer = np.zeros(n, dtype=DETECTION_DTYPE)
+        rows = self._buffer[self._staged:self._staged + n]
+        xyxy = np.asarray(xyxy).reshape(-1, 4)
+        rows["t"] = t
+        rows["frame"] = frame
+        rows["track"] = track_ids
+        rows["x1"], rows["y1"], rows["x2"], rows["y2"] = xyxy.T
+        rows["conf"] = conf
+        self._staged += n
+        self.records += n
+
+    def flush(self):
+        if self._staged:
+            self._file.write(self._buffer[:self._staged].tobytes())
+            self._file.flush()
+            self._staged = 0
+
+    def close(self):
+        self.flush()
+        self._file.close()
@@ -0,0 +1,246 @@
+"""
+Person detector with interchangeable CPU inference backends.
+
+    ultralytics  PyTorch eager, the original YOLO("yolov8n.pt") path (Conv+BN fused once, cached)
+    onnx         exported model on ONNX Runtime (optional INT8 dynamic quantization)
+    openvino     exported model on OpenVINO, if installed (optional INT8 via NNCF)
+
+Every backend takes a batch of BGR frames and returns one postprocess.Detections
+per frame, so the tracker and fall logic never see which backend ran. Only the
+person class is detected (other classes are dropped before NMS), so
+Detections.candidates counts person boxes, not objects of every class.
+"""
+import os
+
+import cv2
+import numpy as np
+
+from postprocess import PERSON_CLASS, detections_from_array, detections_from_result
+from timing import TIMERS
+
+BACKENDS = ("ultralytics", "onnx", "openvino")
+
+
+class Detector:
+    """Base class: `detect(frames)` → list of Detections, one per frame."""
+
+    name = None
+
+    def __init__(self, weights="yolov8n.pt", imgsz=640, conf=0.25, int8=False):
+        self.weights = weights
+        self.imgsz = imgsz
+        self.conf = conf
+        self.int8 = int8
+
+    def detect(self, frames):
+        raise NotImplementedError
+
+    def warmup(self, runs=2):
+        """
+        Run the detector on blank frames so lazy initialisation (layer fusing,
+        kernel selection, buffer allocation) happens before the first real frame.
+        """
+        blank = np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)
+        for _ in range(runs):
+            self.detect([blank])
+
+    def __call__(self, frames):
+        return self.detect(frames)
+
+
+class UltralyticsDetector(Detector):
+    name = "ultralytics"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.int8:
+            raise ValueError("INT8 weights need the onnx or openvino backend")
+        from ultralytics import YOLO
+
+        self.model = YOLO(prepare_model("ultralytics", self.weights))
+
+    def detect(self, frames):
+        with TIMERS.time("inference"):
+            results = self.model(frames, imgsz=self.imgsz, classes=[PERSON_CLASS], verbose=False)
+        with TIMERS.time("postprocess"):
+            return [detections_from_result(r, self.conf) for r in results]
+
+
+def letterbox(frame, size):
+    """Resize keeping aspect ratio and pad to size×size (YOLO's preprocessing). Returns (image, scale, (pad_x, pad_y))."""
+    h, w = frame.shape[:2]
+    scale = min(size / h, size / w)
+    nh, nw = int(round(h * scale)), int(round(w * scale))
+    pad_y, pad_x = (size - nh) // 2, (size - nw) // 2
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    canvas[pad_y:pad_y + nh, pad_x:pad_x + nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    return canvas, scale, (pad_x, pad_y)
+
+
+def preprocess(frames, size):
+    """BGR frames → (N, 3, size, size) float32 RGB blob plus the letterbox parameters of each frame."""
+    blob = np.empty((len(frames), 3, size, size), dtype=np.float32)
+    params = []
+    for i, frame in enumerate(frames):
+        image, scale, pad = letterbox(frame, size)
+        blob[i] = image[:, :, ::-1].transpose(2, 0, 1) / 255.0
+        params.append((scale, pad))
+    return blob, params
+
+
+def decode_yolov8(output, params, conf, iou=0.45):
+    """
+    Raw YOLOv8 head output (N, 4 + classes, anchors) → Detections per frame.
+    Only the person class is decoded; boxes are mapped back to frame pixels.
+    Like ultralytics' NMS, each anchor belongs to its best-scoring class only, so a
+    box that is more likely a chair is not reported as a person with a weak score.
+    """
+    detections = []
+    for pred, (scale, (pad_x, pad_y)) in zip(output, params):
+        scores = pred[4 + PERSON_CLASS]
+        keep = (pred[4:].argmax(axis=0) == PERSON_CLASS) & (scores >= conf)
+        cx, cy, w, h = pred[:4, keep]
+        scores = scores[keep]
+        x1 = (cx - w / 2 - pad_x) / scale
+        y1 = (cy - h / 2 - pad_y) / scale
+        x2 = (cx + w / 2 - pad_x) / scale
+        y2 = (cy + h / 2 - pad_y) / scale
+        boxes = np.stack([x1, y1, x2, y2, scores, np.full_like(scores, PERSON_CLASS)], axis=1)
+        if len(boxes):
+            # cv2.dnn.NMSBoxes wants (x, y, w, h)
+            xywh = np.stack([x1, y1, x2 - x1, y2 - y1], axis=1)
+            kept = cv2.dnn.NMSBoxes(xywh.tolist(), scores.tolist(), conf, iou)
+            boxes = boxes[np.asarray(kept, dtype=np.int64).reshape(-1)]
+        detections.append(detections_from_array(boxes, conf))
+    return detections
+
+
+def _is_fresh(artifact, source):
+    """The cached artifact exists and is not older than what it was made from."""
+    if not os.path.exists(artifact):
+        return False
+    return not os.path.exists(source) or os.path.getmtime(artifact) >= os.path.getmtime(source)
+
+
+def fuse_weights(weights):
+    """
+    Save a copy of `weights` with Conv+BatchNorm already fused, unless an up-to-date one exists.
+    Loading it skips the fuse pass ultralytics otherwise runs on every start.
+    """
+    stem = os.path.splitext(weights)[0]
+    path = f"{stem}_fused.pt"
+    if not _is_fresh(path, weights):
+        from ultralytics import YOLO
+
+        print(f"[detector] Fusing {weights} (one-time)...")
+        model = YOLO(weights)
+        model.fuse()
+        model.save(path)
+    return path
+
+
+def export_model(weights, fmt, imgsz, int8=False):
+    """
+    Export `weights` with ultralytics unless an up-to-date artifact already exists.
+    Returns the path of the exported model.
+    """
+    stem = os.path.splitext(weights)[0]
+    if fmt == "onnx":
+        path = f"{stem}.onnx"
+    else:
+        path = f"{stem}_int8_openvino_model" if int8 else f"{stem}_openvino_model"
+    if not _is_fresh(path, weights):
+        from ultralytics import YOLO
+
+        print(f"[detector] Exporting {weights} to {fmt} (one-time)...")
+        kwargs = {"format": fmt, "imgsz": imgsz, "dynamic": True}
+        if fmt == "openvino":
+            kwargs["int8"] = int8
+        path = YOLO(weights).export(**kwargs)
+    return path
+
+
+class OnnxDetector(Detector):
+    name = "onnx"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError("onnx backend needs `pip install onnxruntime`") from e
+
+        path = prepare_model("onnx", self.weights, self.imgsz, self.int8)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def detect(self, frames):
+        with TIMERS.time("preprocess"):
+            blob, params = preprocess(frames, self.imgsz)
+        with TIMERS.time("inference"):
+            output = self.session.run(None, {self.input_name: blob})[0]
+        with TIMERS.time("postprocess"):
+            return decode_yolov8(output, params, self.conf)
+
+
+class OpenVinoDetector(Detector):
+    name = "openvino"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        try:
+            import openvino as ov
+        except ImportError as e:
+            raise RuntimeError("openvino backend needs `pip install openvino`") from e
+
+        model_dir = prepare_model("openvino", self.weights, self.imgsz, self.int8)
+        xml = next(os.path.join(model_dir, f) for f in os.listdir(model_dir) if f.endswith(".xml"))
+        core = ov.Core()
+        self.compiled = core.compile_model(xml, "CPU", {"PERFORMANCE_HINT": "THROUGHPUT"})
+
+    def detect(self, frames):
+        with TIMERS.time("preprocess"):
+            blob, params = preprocess(frames, self.imgsz)
+        with TIMERS.time("inference"):
+            output = self.compiled(blob)[self.compiled.output(0)]
+        with TIMERS.time("postprocess"):
+            return decode_yolov8(output, params, self.conf)
+
+
+def quantize_onnx(path):
+    """INT8 dynamic quantization of an ONNX model, cached next to it."""
+    int8_path = path.replace(".onnx", ".int8.onnx")
+    if not _is_fresh(int8_path, path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        print(f"[detector] Quantizing {path} to INT8 (one-time)...")
+        quantize_dynamic(path, int8_path, weight_type=QuantType.QUInt8)
+    return int8_path
+
+
+def prepare_model(backend, weights, imgsz=640, int8=False):
+    """
+    Make sure the on-disk artifact `backend` loads exists and is up to date;
+    returns what to pass as `weights`. Idempotent: preparing an already
+    prepared path returns it unchanged, so it can run once before several
+    processes load the same model.
+    """
+    if backend == "onnx":
+        path = weights if weights.endswith(".onnx") else export_model(weights, "onnx", imgsz)
+        if int8 and not path.endswith(".int8.onnx"):
+            path = quantize_onnx(path)
+        return path
+    if backend == "openvino":
+        return weights if os.path.isdir(weights) else export_model(weights, "openvino", imgsz, int8=int8)
+    if weights.endswith(".pt") and not weights.endswith("_fused.pt"):
+        return fuse_weights(weights)
+    return weights
+
+
+def create_detector(backend="ultralytics", weights="yolov8n.pt", imgsz=640, conf=0.25, int8=False):
+    detectors = {cls.name: cls for cls in (UltralyticsDetector, OnnxDetector, OpenVinoDetector)}
+    if backend not in detectors:
+        raise ValueError(f"Unknown backend: {backend} (choose from {', '.join(BACKENDS)})")
+    return detectors[backend](weights=weights, imgsz=imgsz, conf=conf, int8=int8)
@@ -0,0 +1,217 @@
+"""
+Asynchronous writer for fall evidence.
+
+On a fall the detection loop only pays for a snapshot of the pre-fall ring
+buffer and hands it over. A background thread then writes, in order:
+
+    <prefix>_fall.jpg       the annotated fall frame (then on_saved() queues the upload)
+    <prefix>_pre_fall.mp4   the pre-fall window as one clip (or a _pre_fall/ JPEG directory)
+    <prefix>_sequence.jpg   the composite grid of the sequence
+
+Every file appears under its final name only once it is complete
+(write to a temporary name, then os.replace).
+"""
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from timing import TIMERS
+
+
+def create_frame_sequence_image(frames, cols=5, max_tiles=20, tile_width=320, max_pixels=4_000_000):
+    """
+    Create a composite image showing a sequence of frames in a grid.
+    frames: list of frames to combine (oldest first, fall frame last)
+    cols: number of columns in the grid
+    max_tiles: the sequence is subsampled evenly in time to at most this many tiles
+    tile_width: tiles are downscaled to this width (aspect ratio kept)
+    max_pixels: upper bound on the composite size; tiles shrink further to stay under it
+    """
+    if not frames:
+        return None
+
+    # Temporal subsampling; the first and last (fall) frames are always kept
+    num_frames = len(frames)
+    indices = np.unique(np.linspace(0, num_frames - 1, min(num_frames, max_tiles)).round().astype(int))
+    num_tiles = len(indices)
+    cols = min(cols, num_tiles)
+    rows = (num_tiles + cols - 1) // cols  # Ceiling division
+
+    # Tile size from the first frame, bounded by tile_width and the pixel budget
+    h, w = frames[0].shape[:2]
+    tile_w = min(tile_width, w)
+    tile_h = max(1, round(h * tile_w / w))
+    budget_scale = (max_pixels / (rows * cols * tile_w * tile_h)) ** 0.5
+    if budget_scale < 1:
+        tile_w = max(1, int(tile_w * budget_scale))
+        tile_h = max(1, int(tile_h * budget_scale))
+
+    # Downscale into one preallocated tile stack (unused trailing tiles stay black)
+    tiles = np.zeros((rows * cols, tile_h, tile_w, 3), dtype=np.uint8)
+    for slot, index in enumerate(indices):
+        cv2.resize(frames[index], (tile_w, tile_h), dst=tiles[slot], interpolation=cv2.INTER_AREA)
+        # Add frame number label
+        cv2.putText(tiles[slot], f"T-{num_frames - index - 1}", (10, 25),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+
+    # (rows, cols, th, tw, 3) → (rows * th, cols * tw, 3) in a single reshape/transpose
+    return tiles.reshape(rows, cols, tile_h, tile_w, 3).transpose(0, 2, 1, 3, 4).reshape(rows * tile_h, cols * tile_w, 3)
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _encode_jpeg(frame, quality=90):
+    ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise RuntimeError("JPEG encoding failed")
+    return buf
+
+
+@dataclass
+class EvidenceJob:
+    prefix: str  # <YYYYmmdd_HHMMSS_mmm>_<room> (made unique by EvidenceWriter.submit)
+    room: str
+    fall_frame: np.ndarray  # annotated fall frame
+    history: list  # pre-fall frames oldest → newest: BGR arrays, or JPEG buffers if encoded
+    encoded: bool = False
+    fps: float = 30.0
+
+
+class EvidenceWriter:
+    """
+    clip_format: "mp4" (one clip per fall) or "jpeg" (frame_XXX.jpg files written in parallel)
+    on_saved(path, room): called from the writer thread once the fall JPEG is on disk
+    on_written(prefix): called once every file of the event is on disk
+    """
+
+    def __init__(self, save_dir, on_saved=None, clip_format="mp4", max_pending=4, jpeg_workers=4,
+                 on_written=None):
+        if clip_format not in ("mp4", "jpeg"):
+            raise ValueError(f"Unknown clip format: {clip_format}")
+        os.makedirs(save_dir, exist_ok=True)
+        self.save_dir = save_dir
+        self.on_saved = on_saved
+        self.on_written = on_written
+        self.clip_format = clip_format
+        self.written = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._recent_prefixes = deque(maxlen=64)
+        self._prefix_lock = threading.Lock()
+        self._jpeg_pool = ThreadPoolExecutor(max_workers=jpeg_workers) if clip_format == "jpeg" else None
+        self._thread = threading.Thread(target=self._run, name="evidence", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=30):
+        """Finish the queued evidence (up to `timeout` seconds), then return."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self._jpeg_pool is not None:
+            self._jpeg_pool.shutdown(wait=False)
+
+    def submit(self, job):
+        """
+        Queue a job. Returns the path the fall image will have.
+        Blocks only if max_pending jobs are already waiting (evidence is never dropped).
+        A prefix already used (two falls of one room in the same millisecond) gets a -2, -3, ... suffix,
+        so one event never overwrites another.
+        """
+        with self._prefix_lock:
+            base, n = job.prefix, 1
+            while job.prefix in self._recent_prefixes or os.path.exists(self.fall_path(job.prefix)):
+                n += 1
+                job.prefix = f"{base}-{n}"
+            self._recent_prefixes.append(job.prefix)
+        self._queue.put(job)
+        return self.fall_path(job.prefix)
+
+    def fall_path(self, prefix):
+        return os.path.join(self.save_dir, f"{prefix}_fall.jpg")
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            try:
+                with TIMERS.time("evidence"):
+                    self._write(job)
+                self.written += 1
+                if self.on_written is not None:
+                    self.on_written(job.prefix)
+            except Exception as e:
+                self.failed += 1
+                print(f"[evidence] Failed to write {job.prefix}: {type(e).__name__}: {e}")
+
+    def _write(self, job):
+        # Fall frame first so the upload can start while the rest is encoded
+        path = self.fall_path(job.prefix)
+        _write_atomic(path, _encode_jpeg(job.fall_frame))
+        if self.on_saved is not None:
+            self.on_saved(path, job.room)
+
+        if not job.history:
+            return
+        if job.encoded:
+            frames = [cv2.imdecode(buf, cv2.IMREAD_COLOR) for buf in job.history]
+        else:
+            frames = job.history
+
+        if self.clip_format == "mp4":
+            self._write_clip(job, frames)
+        else:
+            self._write_jpegs(job)
+
+        composite = create_frame_sequence_image(frames + [job.fall_frame])
+        if composite is not None:
+            _write_atomic(os.path.join(self.save_dir, f"{job.prefix}_sequence.jpg"), _encode_jpeg(composite))
+        print(f"Saved {len(frames)} pre-fall frames + current frame")
+
+    def _write_clip(self, job, frames):
+        h, w = frames[0].shape[:2]
+        final_path = os.path.join(self.save_dir, f"{job.prefix}_pre_fall.mp4")
+        tmp_path = os.path.join(self.save_dir, f"{job.prefix}_pre_fall.tmp.mp4")
+        writer = cv2.VideoWriter(tmp_path, cv2.VideoWriter_fourcc(*"mp4v"), job.fps, (w, h))
+        if not writer.isOpened():
+            raise RuntimeError(f"Cannot open video writer for {tmp_path}")
+        try:
+            for frame in frames:
+                if frame.shape[:2] != (h, w):
+                    frame = cv2.resize(frame, (w, h))
+                writer.write(frame)
+        finally:
+            writer.release()
+        os.replace(tmp_path, final_path)
+
+    def _write_jpegs(self, job):
+        final_dir = os.path.join(self.save_dir, f"{job.prefix}_pre_fall")
+        tmp_dir = f"{final_dir}.tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        def write_one(item):
+            i, frame = item
+            # Encoded history is written as is, without a decode/encode round trip
+            data = frame if job.encoded else _encode_jpeg(frame)
+            with open(os.path.join(tmp_dir, f"frame_{i:03d}.jpg"), "wb") as f:
+                f.write(data)
+
+        list(self._jpeg_pool.map(write_one, enumerate(job.history)))
+        os.replace(tmp_dir, final_dir)
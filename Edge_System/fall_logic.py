@@ -3,6 +3,8 @@ Simple fall logic based on bounding box aspect ratio.
 """
 from dataclasses import dataclass
 
+import numpy as np
+
 
 @dataclass
 class PersonState:
@@ -25,6 +27,17 @@ def is_lying_down(bbox, ratio_threshold=1.3):
     return ratio > ratio_threshold
 
 
+def lying_mask(xyxy, ratio_threshold=1.3):
+    """
+    Vectorized is_lying_down for an (n, 4) array of boxes.
+    Returns an (n,) bool array; zero-height boxes are never lying.
+    """
+    xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+    w = xyxy[:, 2] - xyxy[:, 0]
+    h = xyxy[:, 3] - xyxy[:, 1]
+    return (h != 0) & (w > ratio_threshold * np.where(h != 0, h, 1))
+
+
 def detect_fall(prev_state: "PersonState | None", curr_state: PersonState):
     """
     Detect fall when previous frame was standing and current is lying.
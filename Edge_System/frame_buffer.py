@@ -0,0 +1,99 @@
+"""
+Fixed-size ring buffer for the pre-fall frame history.
+"""
+import cv2
+import numpy as np
+
+
+class FrameRingBuffer:
+    """
+    Keeps the most recent `capacity` frames.
+
+    Raw mode (default): frames are copied into one preallocated
+    (capacity, H, W, C) uint8 array, so pushing never allocates.
+    Compressed mode (compress=True): each slot holds the JPEG bytes of a frame,
+    which keeps a 1080p history at a few MB instead of hundreds.
+    """
+
+    def __init__(self, capacity, compress=False, jpeg_quality=85):
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive: {capacity}")
+        self.capacity = capacity
+        self.compress = compress
+        self.jpeg_quality = jpeg_quality
+        self._frames = None  # raw mode: allocated on the first push (frame shape unknown until then)
+        self._encoded = [None] * capacity if compress else None
+        self._head = 0  # next slot to write
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+        if self._encoded is not None:
+            self._encoded = [None] * self.capacity
+
+    def push(self, frame):
+        """Write `frame` into the oldest slot (in place for raw mode)."""
+        if self.compress:
+            ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not ok:
+                return
+            self._encoded[self._head] = buf
+        else:
+            if self._frames is None or self._frames.shape[1:] != frame.shape:
+                # First frame, or the source changed resolution: (re)allocate once
+                self._frames = np.empty((self.capacity,) + frame.shape, dtype=frame.dtype)
+                self._head = 0
+                self._count = 0
+            np.copyto(self._frames[self._head], frame)
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def _ordered_slots(self):
+        """Slot indices from oldest to newest."""
+        start = (self._head - self._count) % self.capacity
+        return (np.arange(self._count) + start) % self.capacity
+
+    def snapshot(self, max_bytes=None):
+        """
+        Return the buffered frames oldest → newest as a list of BGR arrays.
+        The result does not share memory with the buffer, so it stays valid
+        while new frames keep arriving.
+        max_bytes: raw mode copies at most this much; frames are then taken
+        evenly across the window (always including the newest one).
+        """
+        if self._count == 0:
+            return []
+        slots = self._ordered_slots()
+        if not self.compress and max_bytes is not None:
+            limit = max(1, max_bytes // self._frames[0].nbytes)
+            if limit < len(slots):
+                # Spaced back from the newest so a budget of one frame still keeps it
+                slots = slots[np.unique(np.linspace(len(slots) - 1, 0, limit).round().astype(int))]
+        if self.compress:
+            return [cv2.imdecode(self._encoded[i], cv2.IMREAD_COLOR) for i in slots]
+        # Fancy indexing makes one contiguous copy of the ordered window
+        return list(self._frames[slots])
+
+    def snapshot_encoded(self):
+        """
+        Return the buffered frames oldest → newest as JPEG-encoded buffers.
+        Compressed mode hands out the stored bytes without re-encoding.
+        """
+        if self._count == 0:
+            return []
+        slots = self._ordered_slots()
+        if self.compress:
+            return [self._encoded[i] for i in slots]
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+        return [cv2.imencode(".jpg", self._frames[i], params)[1] for i in slots]
+
+    @property
+    def nbytes(self):
+        """Memory currently held by the frame history."""
+        if self.compress:
+            return sum(buf.nbytes for buf in self._encoded if buf is not None)
+        return 0 if self._frames is None else self._frames.nbytes
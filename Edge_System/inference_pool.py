@@ -0,0 +1,221 @@
+"""
+Multi-process inference over shared-memory frame slots.
+
+One Python process runs decode, inference and the fall logic on a single
+core because of the GIL. InferencePool keeps the detector in N worker
+processes instead:
+
+    inference thread ──copy──▶ shared-memory slot ──(seq, slot, shape)──▶ worker
+    inference thread ◀──────── (seq, slot, Detections) ◀──────────────── worker
+
+Frames are never pickled: each one is copied once into a free slot and the
+worker wraps that slot in an ndarray without copying. Only the small
+Detections arrays come back. Results are released strictly in submission
+order, so every stream's fall logic still sees its frames in sequence.
+
+A frame larger than a slot (e.g. a camera that came back at a higher
+resolution after a reconnect) is downscaled to fit and its boxes are mapped
+back, so one stream can never stop inference for all of them.
+"""
+import multiprocessing
+import os
+import queue
+import time
+import uuid
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from detector import prepare_model
+from timing import TIMERS
+
+
+def _worker_main(shm_name, tasks, results, detector_kwargs, threads):
+    # Spawned process: limit math library threads before the detector imports torch / onnxruntime
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(var, str(threads))
+    import cv2
+
+    from detector import create_detector
+
+    cv2.setNumThreads(1)
+    shm = None  # the parent creates the block once it knows the frame size
+    try:
+        detector = create_detector(**detector_kwargs)
+        detector.warmup()
+        results.put(("ready", os.getpid(), None, 0))
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            seq, slot, offset, shape = task
+            started = time.perf_counter_ns()
+            if shm is None:
+                shm = shared_memory.SharedMemory(name=shm_name)
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=offset)
+            detections = detector.detect([frame])[0]
+            del frame  # release the view before the slot can be reused
+            # The worker's own TIMERS never reach the parent, so the detect time travels with the result
+            results.put((seq, slot, detections, time.perf_counter_ns() - started))
+    except Exception as e:
+        results.put(("error", os.getpid(), f"{type(e).__name__}: {e}", 0))
+    finally:
+        if shm is not None:
+            shm.close()
+
+
+class InferencePool:
+    """
+    Detector running in `workers` processes, fed through shared memory.
+
+    detector_kwargs: arguments for detector.create_detector() in each worker
+    slot_bytes: size of one frame slot (the largest frame that will be submitted);
+                None sizes the slots from the first frame, see allocate()
+    slots: frames in flight at once (default: 2 per worker)
+
+    Workers load and warm up their model as soon as start() is called, so
+    this can overlap with opening the cameras.
+
+    submit(key, frame, infer) queues a frame (infer=False just keeps its place
+    in the order); collect() returns the finished (key, frame, detections)
+    tuples in submission order, detections None for frames not inferred.
+    """
+
+    def __init__(self, detector_kwargs, workers=2, slot_bytes=None, slots=None):
+        self.workers = workers
+        self.slot_bytes = None
+        self.slots = slots or 2 * workers
+        self.name = f"{detector_kwargs.get('backend', 'ultralytics')} x{workers} processes"
+        self.imgsz = detector_kwargs.get("imgsz", 640)
+        self.int8 = detector_kwargs.get("int8", False)
+
+        self._shm_name = f"edge_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+        self._shm = None
+        if slot_bytes:
+            self.allocate(slot_bytes)
+        self._free = list(range(self.slots))
+        self._next_seq = 0
+        self._next_out = 0
+        self._entries = {}  # seq -> [key, frame, detections, finished, scale of the copy sent to the worker]
+        self._oversize_warned = set()
+        # Export / quantize once here, not in every worker at the same time
+        detector_kwargs = dict(detector_kwargs)
+        detector_kwargs["weights"] = prepare_model(detector_kwargs.get("backend", "ultralytics"),
+                                                   detector_kwargs.get("weights", "yolov8n.pt"),
+                                                   self.imgsz, self.int8)
+        ctx = multiprocessing.get_context("spawn")  # no fork of a process that already runs threads
+        self._tasks = ctx.Queue()
+        self._results = ctx.Queue()
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        self._procs = [
+            ctx.Process(target=_worker_main, name=f"inference-{i}", daemon=True,
+                        args=(self._shm_name, self._tasks, self._results, detector_kwargs, threads))
+            for i in range(workers)
+        ]
+
+    def allocate(self, slot_bytes):
+        """Create the shared-memory slots (once; before the first submit)."""
+        if self._shm is not None:
+            return
+        self.slot_bytes = slot_bytes
+        self._shm = shared_memory.SharedMemory(name=self._shm_name, create=True, size=slot_bytes * self.slots)
+
+    def start(self):
+        """Start the workers and wait until every one has loaded and warmed up its model."""
+        for proc in self._procs:
+            proc.start()
+        for _ in self._procs:
+            try:
+                tag, pid, error, _ = self._results.get(timeout=300)
+            except queue.Empty:
+                tag, pid, error = "error", "?", "no answer within 300s"
+            if tag != "ready":
+                self.close()
+                raise RuntimeError(f"Inference worker {pid} failed to start: {error}")
+        print(f"[inference] {self.workers} worker processes ready, {self.slots} shared-memory slots")
+        return self
+
+    @property
+    def in_flight(self):
+        return len(self._entries)
+
+    def submit(self, key, frame, infer=True):
+        seq = self._next_seq
+        self._next_seq += 1
+        if not infer:
+            self._entries[seq] = [key, frame, None, True, 1.0]
+            return
+        self.allocate(frame.nbytes)
+        original, scale = frame, 1.0
+        if frame.nbytes > self.slot_bytes:
+            frame, scale = self._fit(frame)
+        while not self._free:
+            # Every slot is busy: wait for a worker to hand one back
+            self._receive(1.0)
+        slot = self._free.pop()
+        with TIMERS.time("shm_copy"):
+            view = np.ndarray(frame.shape, dtype=np.uint8, buffer=self._shm.buf, offset=slot * self.slot_bytes)
+            view[...] = frame
+            del view
+        self._entries[seq] = [key, original, None, False, scale]
+        self._tasks.put((seq, slot, slot * self.slot_bytes, frame.shape))
+
+    def _fit(self, frame):
+        """Downscale a frame that is larger than a slot. Returns (smaller frame, scale)."""
+        import cv2  # not at module level: spawned workers import this module before setting thread limits
+
+        h, w = frame.shape[:2]
+        scale = (self.slot_bytes / frame.nbytes) ** 0.5
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        if frame.shape not in self._oversize_warned:
+            self._oversize_warned.add(frame.shape)
+            print(f"[inference] {w}x{h} frames do not fit the {self.slot_bytes}-byte slots; "
+                  f"downscaling them to {size[0]}x{size[1]} for detection")
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        return small, small.shape[1] / w
+
+    def collect(self, timeout=0.0):
+        """Finished results in submission order. Waits up to `timeout` for the next one if none is ready."""
+        if self._entries and not self._entries[self._next_out][3]:
+            self._receive(timeout)
+        while self._receive(0):
+            pass
+        ready = []
+        while self._next_out in self._entries and self._entries[self._next_out][3]:
+            key, frame, detections, _, _ = self._entries.pop(self._next_out)
+            ready.append((key, frame, detections))
+            self._next_out += 1
+        return ready
+
+    def _receive(self, timeout):
+        """Move one worker result into its entry and free its slot. False if none arrived in time."""
+        try:
+            seq, slot, detections, detect_ns = (
+                self._results.get(timeout=timeout) if timeout > 0 else self._results.get_nowait()
+            )
+        except queue.Empty:
+            dead = [p.name for p in self._procs if not p.is_alive()]
+            if dead:
+                raise RuntimeError(f"Inference worker(s) exited: {', '.join(dead)}")
+            return False
+        if seq == "error":
+            raise RuntimeError(f"Inference worker {slot} failed: {detections}")
+        self._free.append(slot)
+        TIMERS.record_ns("inference", detect_ns)
+        entry = self._entries[seq]
+        if entry[4] != 1.0:
+            detections = detections.scaled(1 / entry[4])
+        entry[2], entry[3] = detections, True
+        return True
+
+    def close(self):
+        for _ in self._procs:
+            self._tasks.put(None)
+        for proc in self._procs:
+            if proc.pid is not None:
+                proc.join(timeout=5)
+                if proc.is_alive():
+                    proc.terminate()
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
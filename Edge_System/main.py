@@ -1,277 +1,603 @@
 """
 Edge loop: capture video, run YOLO, simple fall detection, and send to server.
 """
+import argparse
 import os
+import re
+import threading
 import time
+from dataclasses import dataclass, field, replace
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import cv2
 import numpy as np
-from ultralytics import YOLO
 
-from video_source import get_capture, is_video_file
-from fall_logic import PersonState, is_lying_down, detect_fall
-from sender import send_fall_event
+from video_source import CAPTURE_BACKENDS, StreamCapture, get_capture, is_video_file
+from tracker import PersonTracker
+from sender import UploadWorker
+from outbox import Outbox
+from capture_store import CaptureStore
+from frame_buffer import FrameRingBuffer
+from evidence import EvidenceJob, EvidenceWriter
+from pipeline import CaptureThread, FrameQueue, StageStats
+from preview import MjpegPreviewServer
+from postprocess import Detections
+from detector import BACKENDS, create_detector
+from inference_pool import InferencePool
+from scheduler import MotionGate
+from detection_log import DetectionLogWriter, log_path
+from metrics import MetricsServer, RateMeter, collect
+from timing import STARTUP, TIMERS
 
 SAVE_DIR = "captured"
-os.makedirs(SAVE_DIR, exist_ok=True)
+CONF_THRESHOLD = 0.25  # Minimum person confidence used for fall detection
+COOLDOWN_SECONDS = 10  # 10 seconds cooldown between fall detections (per tracked person)
+BUFFER_SECONDS = 2  # Store 2 seconds of frames before fall
+SNAPSHOT_MAX_BYTES = 64 * 1024 * 1024  # Raw history copied per fall (1080p: ~10 of 60 frames); --compress-history keeps all
+QUEUE_SIZE = 2  # Frames queued between stages; small so live sources stay near real time
+STATS_INTERVAL_SECONDS = 30  # How often the per-stage counters are printed
 
 
-def create_frame_sequence_image(frames, cols=5):
+@dataclass
+class FrameResult:
+    """What the inference stage hands to the render stage for one frame."""
+    frame: np.ndarray
+    detections: Detections = field(default_factory=Detections.empty)
+    tracks: list = field(default_factory=list)  # [(track_id, bbox, is_lying, ratio)] seen on this frame
+    alert: tuple = None  # (text, font_scale, color, thickness) drawn at the top-left
+
+
+def annotate_frame(result):
+    """Draw detections, each tracked person's state and any alert onto result.frame."""
+    frame = result.frame
+
+    # Draw all person detections
+    for (x1, y1, x2, y2), confidence in zip(result.detections.xyxy.tolist(), result.detections.conf.tolist()):
+        color = (0, 255, 0)  # Green for normal detection
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+        label = f"Person {confidence:.2f}"
+        cv2.putText(frame, label, (x1, y1 - 10),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+
+    # Show detection count on screen
+    info_text = f"Persons detected: {len(result.detections)}"
+    cv2.putText(frame, info_text, (10, frame.shape[0] - 20),
+               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+
+    for track_id, (x1, y1, x2, y2), is_lying, ratio in result.tracks:
+        # Highlight tracked persons (used for fall detection) with different color
+        status_color = (0, 0, 255) if is_lying else (255, 0, 0)  # Red if lying, Blue if standing
+        cv2.rectangle(frame, (x1, y1), (x2, y2), status_color, 3)
+        status_text = f"#{track_id} {'LYING' if is_lying else 'STANDING'}"
+        cv2.putText(frame, status_text, (x1, y2 + 20),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, status_color, 2)
+
+        # Also show ratio on screen
+        ratio_text = f"Ratio: {ratio:.2f}"
+        cv2.putText(frame, ratio_text, (x1, y2 + 45),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+    if result.alert:
+        text, scale, color, thickness = result.alert
+        cv2.putText(frame, text, (10, 30),
+                   cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+    return frame
+
+
+class EdgeStream:
     """
-    Create a composite image showing a sequence of frames in a grid.
-    frames: list of frames to combine
-    cols: number of columns in the grid
+    One camera: its capture thread, stage queues, pre-fall frame history and
+    person tracker (fall state and cooldown per track). Streams share the
+    detector; nothing else is shared between them.
     """
-    if not frames:
-        return None
-    
-    # Calculate grid dimensions
-    num_frames = len(frames)
-    rows = (num_frames + cols - 1) // cols  # Ceiling division
-    
-    # Get frame dimensions
-    h, w = frames[0].shape[:2]
-    
-    # Create composite image
-    composite = np.zeros((h * rows, w * cols, 3), dtype=np.uint8)
-    
-    for i, frame in enumerate(frames):
-        row = i // cols
-        col = i % cols
-        y_start = row * h
-        y_end = y_start + h
-        x_start = col * w
-        x_end = x_start + w
-        
-        # Resize frame if needed and place in composite
-        if frame.shape[:2] != (h, w):
-            frame = cv2.resize(frame, (w, h))
-        composite[y_start:y_end, x_start:x_end] = frame
-        
-        # Add frame number label
-        cv2.putText(composite, f"T-{num_frames-i-1}", 
-                   (x_start + 10, y_start + 25),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-    
-    return composite
-
-
-def run_edge(source=0):
-    cap = get_capture(source)
-    model = YOLO("yolov8n.pt")
-    prev_state = None
-    last_fall_time = None  # Track last fall detection time for cooldown
-    COOLDOWN_SECONDS = 10  # 10 seconds cooldown between fall detections
-    
-    # Frame buffer to store recent frames (1-2 seconds before fall)
-    frame_buffer = []
-    BUFFER_SECONDS = 2  # Store 2 seconds of frames before fall
-    buffer_max_size = None  # Will be set based on FPS
-    
-    # For video files, calculate delay based on FPS
-    is_file = is_video_file(source)
-    if is_file:
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        if fps <= 0:
-            fps = 30  # Default FPS if cannot detect
-        delay_ms = int(1000 / fps)  # Delay in milliseconds
-        buffer_max_size = int(fps * BUFFER_SECONDS)  # Store 2 seconds of frames
-        print(f"Processing video file at {fps:.2f} FPS")
-    else:
-        delay_ms = 1  # Minimal delay for live camera
-        buffer_max_size = 60  # Default: 60 frames for live camera (assuming ~30fps)
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            if is_file:
-                print("Video ended. Press 'q' to exit or restart.")
-                # Optionally loop the video
-                # cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                # continue
-            break
 
-        # Store frame in buffer (before processing)
-        frame_buffer.append(frame.copy())
-        # Keep only recent frames (1-2 seconds)
-        if len(frame_buffer) > buffer_max_size:
-            frame_buffer.pop(0)
-        
-        # YOLO inference
-        results = model(frame, verbose=False)[0]
+    def __init__(self, source, room, stop_event, ready_event, compress_history=False, idle_stride=5,
+                 capture_options=None, detection_log=None):
+        self.source = source
+        self.room = room
+        self.detection_log = detection_log  # optional DetectionLogWriter for offline re-tuning
+        # Live sources reconnect on their own; stop_event cuts a reconnect wait short
+        self.cap = get_capture(source, stop_event=stop_event, **(capture_options or {}))
+        self.tracker = PersonTracker(cooldown_seconds=COOLDOWN_SECONDS)
+        self.motion_gate = MotionGate(idle_stride=idle_stride)
+        self.last_result = None  # shown again on frames the motion gate skips
+        self.last_fall_time = None  # epoch seconds, for the metrics endpoint
+        self.fps_meter = RateMeter()
+        self.debug_count = 0
+        self.frame_count = 0
 
+        # For video files, calculate delay based on FPS
+        self.is_file = is_video_file(source)
+        if self.is_file:
+            fps = self.cap.get(cv2.CAP_PROP_FPS)
+            if fps <= 0:
+                fps = 30  # Default FPS if cannot detect
+            self.delay_ms = int(1000 / fps)  # Delay in milliseconds
+            buffer_max_size = int(fps * BUFFER_SECONDS)  # Store 2 seconds of frames
+            print(f"[{room}] Processing video file at {fps:.2f} FPS")
+        else:
+            self.delay_ms = 1  # Minimal delay for live camera
+            fps = 30  # Assumed for live cameras
+            buffer_max_size = 60  # Default: 60 frames for live camera (assuming ~30fps)
+        self.fps = fps
+        # Ring buffer storing recent frames (1-2 seconds before fall)
+        self.frame_buffer = FrameRingBuffer(buffer_max_size, compress=compress_history)
+
+        # Live sources drop the oldest queued frame so inference always sees the newest one;
+        # video files keep every frame and let the queues apply back-pressure instead.
+        drop_oldest = not self.is_file
+        self.capture_stats = StageStats("capture")
+        self.inference_stats = StageStats("inference")
+        self.render_stats = StageStats("render")
+        self.inference_queue = FrameQueue(QUEUE_SIZE, drop_oldest, self.inference_stats, ready_event)
+        self.render_queue = FrameQueue(QUEUE_SIZE, drop_oldest, self.render_stats)
+        self.capture = CaptureThread(self.cap, self.inference_queue, stop_event, self.capture_stats)
+
+    def start(self):
+        self.capture.start()
+
+    def close(self):
+        self.inference_queue.close()
+        self.render_queue.close()
+        self.capture.close(timeout=2)  # the capture thread releases self.cap
+        if self.detection_log is not None:
+            self.detection_log.close()
+
+    def stats_line(self):
+        line = (f"[pipeline:{self.room}] {self.capture_stats} | {self.inference_stats} | "
+                f"{self.render_stats} | {self.motion_gate.stats}")
+        if isinstance(self.cap, StreamCapture):
+            line += f" | {self.cap.stats}"
+        return line
+
+    def skip(self, frame):
+        """Result for a frame the motion gate kept from the detector: the last known persons, no fall check."""
+        if self.last_result is None:
+            return FrameResult(frame=frame)
+        return FrameResult(frame=frame, detections=self.last_result.detections, tracks=self.last_result.tracks)
+
+    def process(self, frame, detections, evidence):
+        """Fall logic for one frame's Detections of this stream. Returns the FrameResult to render."""
         # Debug: Print detection info (first few frames only)
-        if not hasattr(run_edge, '_debug_count'):
-            run_edge._debug_count = 0
-        if run_edge._debug_count < 5:
-            print(f"Frame {run_edge._debug_count}: Detected {len(results.boxes)} objects")
-            if len(results.boxes) > 0:
-                for i, box in enumerate(results.boxes[:3]):  # Show first 3
-                    cls_id = int(box.cls[0])
-                    conf = float(box.conf[0])
-                    print(f"  Object {i}: class_id={cls_id}, confidence={conf:.2f}")
-            run_edge._debug_count += 1
-
-        # Use the largest person bbox
-        person_bbox = None
-        max_area = 0
-        person_count = 0
-        for box in results.boxes:
-            cls_id = int(box.cls[0])
-            if cls_id != 0:  # 0 is person class in COCO dataset
-                continue
-            person_count += 1
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            area = (x2 - x1) * (y2 - y1)
-            if area > max_area:
-                max_area = area
-                person_bbox = (x1, y1, x2, y2)
-
-        # Draw all person detections
-        for box in results.boxes:
-            cls_id = int(box.cls[0])
-            if cls_id != 0:  # 0 is person class
-                continue
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            confidence = float(box.conf[0])
-            
-            # Draw bounding box
-            color = (0, 255, 0)  # Green for normal detection
-            cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-            
-            # Draw label with confidence
-            label = f"Person {confidence:.2f}"
-            cv2.putText(frame, label, (x1, y1 - 10), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-        
-        # Show detection count on screen
-        info_text = f"Persons detected: {person_count}"
-        cv2.putText(frame, info_text, (10, frame.shape[0] - 20), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-
-        if person_bbox:
-            # Calculate ratio for debugging
-            x1, y1, x2, y2 = person_bbox
-            w = x2 - x1
-            h = y2 - y1
-            ratio = w / h if h > 0 else 0
-            
-            curr_state = PersonState(
-                is_lying=is_lying_down(person_bbox),
-                bbox=person_bbox,
-            )
+        if self.debug_count < 5:
+            print(f"[{self.room}] Frame {self.debug_count}: {detections.candidates} person candidates, {len(detections)} above conf")
+            for i, conf in enumerate(detections.conf[:3].tolist()):  # Show first 3
+                print(f"  Person {i}: confidence={conf:.2f}")
+            self.debug_count += 1
+
+        result = FrameResult(frame=frame, detections=detections)
+        now = time.time()
+        tracks = self.tracker.update(detections.xyxy, now=now)
+        if self.detection_log is not None and tracks:
+            matched = [t.detection for t in tracks]
+            self.detection_log.record(now, self.frame_count, [t.track_id for t in tracks],
+                                      detections.xyxy[matched], detections.conf[matched])
+        result.tracks = [(t.track_id, t.bbox, t.state.is_lying, t.ratio) for t in tracks]
+        self.last_result = result
 
-            # Debug: Print state info (first 20 frames or when state changes)
-            if not hasattr(run_edge, '_frame_count'):
-                run_edge._frame_count = 0
-            run_edge._frame_count += 1
-            
+        fallen = []
+        for track in tracks:
+            prev_state, curr_state = track.prev_state, track.state
+
+            # Debug: Print state info (first 20 frames or when a track's state changes)
             state_changed = prev_state is not None and prev_state.is_lying != curr_state.is_lying
-            if run_edge._frame_count <= 20 or state_changed:
+            if self.frame_count < 20 or state_changed:
                 prev_status = "None" if prev_state is None else ("LYING" if prev_state.is_lying else "STANDING")
                 curr_status = "LYING" if curr_state.is_lying else "STANDING"
-                print(f"Frame {run_edge._frame_count}: ratio={ratio:.2f}, prev={prev_status}, curr={curr_status}")
-
-            # Highlight the largest person (used for fall detection) with different color
-            status_color = (0, 0, 255) if curr_state.is_lying else (255, 0, 0)  # Red if lying, Blue if standing
-            cv2.rectangle(frame, (x1, y1), (x2, y2), status_color, 3)
-            status_text = "LYING" if curr_state.is_lying else "STANDING"
-            cv2.putText(frame, status_text, (x1, y2 + 20), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, status_color, 2)
-            
-            # Also show ratio on screen
-            ratio_text = f"Ratio: {ratio:.2f}"
-            cv2.putText(frame, ratio_text, (x1, y2 + 45), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-
-            # Fall detection with cooldown
-            if detect_fall(prev_state, curr_state):
-                current_time = time.time()
-                
-                # Check if enough time has passed since last fall detection
-                if last_fall_time is None or (current_time - last_fall_time) >= COOLDOWN_SECONDS:
-                    print("FALL DETECTED!")
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    
-                    # Save current frame (fall detected frame)
-                    filename = f"{timestamp}_fall.jpg"
-                    path = os.path.join(SAVE_DIR, filename)
-                    cv2.imwrite(path, frame)
-                    
-                    # Save frames from buffer (before fall)
-                    if len(frame_buffer) > 1:
-                        # Create a composite image with frames before fall
-                        buffer_frames = frame_buffer[:-1]  # Exclude current frame (already saved)
-                        
-                        # Save individual frames before fall
-                        pre_fall_dir = os.path.join(SAVE_DIR, f"{timestamp}_pre_fall")
-                        os.makedirs(pre_fall_dir, exist_ok=True)
-                        
-                        for i, pre_frame in enumerate(buffer_frames):
-                            pre_filename = f"frame_{i:03d}.jpg"
-                            pre_path = os.path.join(pre_fall_dir, pre_filename)
-                            cv2.imwrite(pre_path, pre_frame)
-                        
-                        # Create a composite image showing sequence
-                        composite = create_frame_sequence_image(buffer_frames + [frame])
-                        if composite is not None:
-                            composite_path = os.path.join(SAVE_DIR, f"{timestamp}_sequence.jpg")
-                            cv2.imwrite(composite_path, composite)
-                        print(f"Saved {len(buffer_frames)} pre-fall frames + current frame")
-                    
-                    # Send to server
-                    upload_success = send_fall_event(path, room="living_room")
-                    if upload_success:
-                        print(f"[성공] Fall event saved and sent to server. Cooldown: {COOLDOWN_SECONDS}s")
-                    else:
-                        print(f"[실패] Fall event saved locally but failed to send to server. Check server connection. Cooldown: {COOLDOWN_SECONDS}s")
-                    # Draw fall alert on frame
-                    cv2.putText(frame, "FALL DETECTED!", (10, 30), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 3)
-                    
-                    # Update last fall time
-                    last_fall_time = current_time
+                print(f"[{self.room}] Frame {self.frame_count}: track #{track.track_id} "
+                      f"ratio={track.ratio:.2f}, prev={prev_status}, curr={curr_status}")
+
+            # Fall detection with cooldown (per track)
+            if track.fell:
+                fallen.append(track)
+            elif track.cooldown_remaining > 0:
+                remaining_time = track.cooldown_remaining
+                print(f"[{self.room}] Fall detected on track #{track.track_id} but in cooldown. "
+                      f"Ignoring. ({remaining_time:.1f}s remaining)")
+                # Draw cooldown message on frame
+                result.alert = (f"COOLDOWN: {remaining_time:.1f}s", 0.7, (0, 165, 255), 2)
+        self.frame_count += 1
+
+        if fallen:
+            self.last_fall_time = now
+            ids = ", ".join(f"#{t.track_id}" for t in fallen)
+            print(f"[{self.room}] FALL DETECTED! (track {ids})")
+            # One saved event per frame, even when several people fall at once.
+            # Only the snapshot happens here; encoding and file writes run on the evidence thread,
+            # which also queues the upload once the fall image is on disk.
+            with TIMERS.time("snapshot"):
+                fall_frame = annotate_frame(replace(result, frame=result.frame.copy()))
+                if self.frame_buffer.compress:
+                    history = self.frame_buffer.snapshot_encoded()
+                else:
+                    # Bounded copy: the full 2 s at 1080p would be ~370 MB per queued fall
+                    history = self.frame_buffer.snapshot(max_bytes=SNAPSHOT_MAX_BYTES)
+                # A subsampled history plays back at the matching lower rate
+                clip_fps = self.fps * len(history) / max(1, len(self.frame_buffer))
+            stamp = datetime.now()
+            job = EvidenceJob(
+                # Milliseconds: falls are per track and per stream, several can land in one second
+                prefix=f"{stamp.strftime('%Y%m%d_%H%M%S')}_{stamp.microsecond // 1000:03d}_{self.room}",
+                room=self.room,
+                fall_frame=fall_frame,
+                history=history[:-1],  # Exclude current frame (saved as the fall image)
+                encoded=self.frame_buffer.compress,
+                fps=clip_fps,
+            )
+            path = evidence.submit(job)
+            print(f"[{self.room}] Fall evidence queued: {path}. Cooldown: {COOLDOWN_SECONDS}s")
+            # Draw fall alert on frame
+            result.alert = ("FALL DETECTED!", 1, (0, 0, 255), 3)
+
+        return result
+
+
+def inference_loop(detector, streams, ready_event, evidence, render=True, preview=None):
+    """
+    Inference stage shared by all streams: take the newest queued frame of
+    every stream, run them through the detector as one batch and hand each
+    result back to its stream's fall logic. Fall evidence goes to `evidence`
+    (an EvidenceWriter).
+
+    detector may also be an InferencePool: frames are then submitted to the
+    worker processes without waiting and their results come back in frame
+    order, several frames later.
+    render=False (headless): results are not queued for the window at all.
+    preview: optional MjpegPreviewServer fed with annotated frames at its own low rate.
+    """
+    pool = detector if isinstance(detector, InferencePool) else None
+    first_detection = True
+    active = list(streams)
+    try:
+        while active or (pool is not None and pool.in_flight):
+            batch = []
+            for stream in list(active):
+                frame = stream.inference_queue.get_nowait()
+                if frame is not None:
+                    batch.append((stream, frame))
+                elif stream.inference_queue.done():
+                    if stream.is_file and stream.capture.ended:
+                        print(f"[{stream.room}] Video ended.")
+                    if pool is None:
+                        stream.render_queue.close()  # with a pool, results may still be in flight
+                    active.remove(stream)
+
+            # (stream, frame, detections) per frame; detections None when the motion gate skipped it
+            finished = []
+            to_infer = []
+            for stream, frame in batch:
+                # Still, empty rooms only get every Nth frame through the detector
+                with TIMERS.time("motion_gate"):
+                    infer = stream.motion_gate.should_infer(frame, tracking=bool(stream.tracker.tracks))
+                if pool is not None:
+                    pool.submit(stream, frame, infer)
+                elif infer:
+                    to_infer.append((stream, frame))
+                else:
+                    finished.append((stream, frame, None))
+
+            if to_infer:
+                # YOLO inference: one batched forward pass over all streams
+                batch_detections = detector.detect([frame for _, frame in to_infer])
+                finished += [(stream, frame, d) for (stream, frame), d in zip(to_infer, batch_detections)]
+            if pool is not None:
+                finished = pool.collect(timeout=0 if batch else 0.005)
+
+            if not batch and not finished:
+                if pool is None or not pool.in_flight:
+                    # Nothing queued anywhere: sleep until a capture thread puts a frame
+                    ready_event.wait(timeout=0.1)
+                    ready_event.clear()
+                continue
+
+            for stream, frame, detections in finished:
+                # Store frame in buffer (before processing); the oldest slot is overwritten in place
+                stream.frame_buffer.push(frame)
+                if detections is None:
+                    result = stream.skip(frame)
                 else:
-                    # Still in cooldown period
-                    remaining_time = COOLDOWN_SECONDS - (current_time - last_fall_time)
-                    print(f"Fall detected but in cooldown. Ignoring. ({remaining_time:.1f}s remaining)")
-                    # Draw cooldown message on frame
-                    cv2.putText(frame, f"COOLDOWN: {remaining_time:.1f}s", (10, 30), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 165, 255), 2)
-
-            prev_state = curr_state
-
-        # Local monitoring
-        cv2.imshow("Edge Fall Detection", frame)
-        # Use appropriate delay: video files need FPS-based delay, live camera needs minimal delay
-        key = cv2.waitKey(delay_ms) & 0xFF
+                    with TIMERS.time("track"):
+                        result = stream.process(frame, detections, evidence)
+                    if first_detection:
+                        # Time to first detection: the blind spot of every restart
+                        first_detection = False
+                        STARTUP.mark("first_detection")
+                        print(STARTUP.report())
+                stream.inference_stats.processed += 1
+                stream.fps_meter.tick()
+                if preview is not None and preview.should_update(stream.room):
+                    with TIMERS.time("preview"):
+                        preview.update(stream.room, annotate_frame(replace(result, frame=result.frame.copy())))
+                if render:
+                    stream.render_queue.put(result)
+    finally:
+        for stream in streams:
+            stream.render_queue.close()
+
+
+def report_stats(streams, uploader):
+    for stream in streams:
+        print(stream.stats_line())
+    print(f"[upload] {uploader.stats()}")
+    print(TIMERS.report())
+
+
+def render_loop(streams, uploader):
+    """Render stage (main thread): annotate and show each stream's frames until 'q' or all streams end."""
+    # Use appropriate delay: video files need FPS-based delay, live camera needs minimal delay
+    delay_ms = min(stream.delay_ms for stream in streams)
+    rendering = list(streams)
+    last_report = time.monotonic()
+    while rendering:
+        shown = False
+        for stream in list(rendering):
+            result = stream.render_queue.get_nowait()
+            if result is None:
+                if stream.render_queue.done():
+                    rendering.remove(stream)
+                continue
+
+            # Local monitoring
+            with TIMERS.time("draw"):
+                annotated = annotate_frame(result)
+            cv2.imshow(f"Edge Fall Detection - {stream.room}", annotated)
+            stream.render_stats.processed += 1
+            shown = True
+
+        key = cv2.waitKey(delay_ms if shown else 1) & 0xFF
         if key == ord("q"):
             break
 
-    cap.release()
-    cv2.destroyAllWindows()
+        if time.monotonic() - last_report >= STATS_INTERVAL_SECONDS:
+            report_stats(streams, uploader)
+            last_report = time.monotonic()
 
 
-if __name__ == "__main__":
-    import sys
-    
-    # Command line argument: python main.py [source]
+def wait_headless(inference, streams, uploader):
+    """Headless main thread: no window, just wait for the streams to end (or Ctrl+C)."""
+    last_report = time.monotonic()
+    while inference.is_alive():
+        inference.join(timeout=1)
+        if time.monotonic() - last_report >= STATS_INTERVAL_SECONDS:
+            report_stats(streams, uploader)
+            last_report = time.monotonic()
+
+
+def load_detector(detector_kwargs, workers=0):
+    """
+    Load the detector and run a warm-up inference, so the first camera frame
+    does not pay for lazy initialisation. With workers > 0 the worker
+    processes load and warm up their own copies.
+    ultralytics / torch are only imported here, on first use.
+    """
+    with STARTUP.phase("model_load"):
+        if workers > 0:
+            return InferencePool(detector_kwargs, workers=workers).start()
+        detector = create_detector(**detector_kwargs)
+    with STARTUP.phase("warmup"):
+        detector.warmup()
+    return detector
+
+
+def run_edge(sources=0, compress_history=False, headless=False, preview_port=None, preview_fps=2,
+             idle_stride=5, backend="ultralytics", weights="yolov8n.pt", imgsz=640, int8=False,
+             clip_format="mp4", capture_backend="auto", rtsp_transport="tcp", hw_decode=True,
+             record_dir=None, metrics_port=None, metrics_host="127.0.0.1", workers=0,
+             store_max_mb=2048, store_max_days=30):
+    """
+    sources: one video source, or a list of (room, source) pairs to watch
+    several cameras from one process with a single shared detector.
+
+    Staged pipeline: a capture thread per stream, one inference thread that
+    batches frames across streams, and rendering on the main thread
+    (cv2.imshow must stay there), joined by bounded queues.
+
+    compress_history: keep the pre-fall history as JPEG bytes instead of raw
+    frames (a few MB per camera instead of ~370 MB at 1080p).
+    headless: skip all drawing and the GUI window; only frames saved for a
+    fall event are annotated. No display server is needed.
+    preview_port: serve a low-rate MJPEG preview on localhost instead of a window.
+    idle_stride: while a room is still and nobody is tracked, run the detector
+    only every Nth frame (1 runs it on every frame).
+    backend / weights / imgsz / int8: detector settings, see detector.py.
+    clip_format: pre-fall evidence as one "mp4" clip or a directory of "jpeg" frames.
+    capture_backend / rtsp_transport / hw_decode: how live sources are opened,
+    see video_source.StreamCapture. Dropped live streams reconnect instead of ending the loop.
+    record_dir: also append every tracked detection to <record_dir>/<timestamp>_<room>.dlog
+    for threshold tuning with replay.py.
+    metrics_port: serve health metrics (Prometheus text at /metrics, JSON at
+    /metrics.json) on metrics_host:metrics_port.
+    workers: run the detector in this many processes fed through shared memory
+    (inference_pool.py) instead of on the inference thread; 0 keeps it in-process.
+    store_max_mb / store_max_days: budget of SAVE_DIR; the oldest uploaded events
+    are deleted beyond it (capture_store.py). 0 disables a limit.
+    """
+    if not isinstance(sources, list):
+        sources = [("living_room", sources)]
+
+    STARTUP.mark("imports")
+    stop_event = threading.Event()
+    ready_event = threading.Event()
+    detector_kwargs = {"backend": backend, "weights": weights, "imgsz": imgsz, "conf": CONF_THRESHOLD, "int8": int8}
+    # The model loads on its own thread while the cameras open; both can take seconds
+    loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-loader")
+    model_future = loader.submit(load_detector, detector_kwargs, workers)
+    loader.shutdown(wait=False)
+
+    capture_options = {"backend": capture_backend, "transport": rtsp_transport, "hw_decode": hw_decode}
+    with STARTUP.phase("capture_open"):
+        streams = [
+            EdgeStream(source, room, stop_event, ready_event, compress_history=compress_history,
+                       idle_stride=idle_stride, capture_options=capture_options,
+                       detection_log=DetectionLogWriter(log_path(record_dir, room)) if record_dir else None)
+            for room, source in sources
+        ]
+    detector = model_future.result()
+    if workers > 0:
+        # Slots sized for the largest stream; 1080p if a source does not report its size
+        detector.allocate(max(
+            int(stream.cap.get(cv2.CAP_PROP_FRAME_WIDTH)) * int(stream.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) * 3
+            or 1920 * 1080 * 3
+            for stream in streams
+        ))
+    os.makedirs(SAVE_DIR, exist_ok=True)
+    outbox = Outbox(os.path.join(SAVE_DIR, "outbox.sqlite3"))
+    uploader = UploadWorker(outbox=outbox).start()
+
+    def queue_upload(path, room):
+        # Send to server in the background; never wait on the network here
+        if uploader.enqueue(path, room=room):
+            print(f"[대기열] Fall event saved and queued for upload: {path}")
+        else:
+            print(f"[실패] Fall event saved locally but the upload queue is full: {path}")
+
+    store = CaptureStore(SAVE_DIR, outbox, max_bytes=store_max_mb * 1024 ** 2 if store_max_mb else None,
+                         max_age_days=store_max_days or None).start()
+    evidence = EvidenceWriter(SAVE_DIR, on_saved=queue_upload, clip_format=clip_format,
+                              on_written=store.add).start()
+    preview = MjpegPreviewServer(port=preview_port, fps=preview_fps).start() if preview_port else None
+    started = time.monotonic()
+    metrics = None
+    if metrics_port:
+        metrics = MetricsServer(lambda: collect(streams, uploader, evidence, started, store),
+                                port=metrics_port, host=metrics_host).start()
+
+    inference = threading.Thread(
+        target=inference_loop,
+        args=(detector, streams, ready_event, evidence),
+        kwargs={"render": not headless, "preview": preview},
+        name="inference",
+        daemon=True,
+    )
+    for stream in streams:
+        stream.start()
+    inference.start()
+    STARTUP.mark("pipeline_started")
+
+    try:
+        if headless:
+            wait_headless(inference, streams, uploader)
+        else:
+            render_loop(streams, uploader)
+    finally:
+        stop_event.set()
+        for stream in streams:
+            stream.close()
+        inference.join(timeout=5)
+        if isinstance(detector, InferencePool):
+            detector.close()
+        if not headless:
+            cv2.destroyAllWindows()
+        if preview is not None:
+            preview.stop()
+        if metrics is not None:
+            metrics.stop()
+        evidence.stop()
+        uploader.stop()
+        store.stop()
+        report_stats(streams, uploader)
+        print(f"[evidence] written={evidence.written}, failed={evidence.failed}")
+        print(f"[outbox] {outbox.counts()}")
+        print(f"[store] {store.stats()}")
+        outbox.close()
+
+
+def parse_sources(args):
+    """
+    Turn command line arguments into (room, source) pairs.
+    Each argument is either a source or room=source; digits become webcam indexes.
+    """
+    sources = []
+    for i, arg in enumerate(args):
+        match = re.match(r"^(\w+)=(.+)$", arg)
+        if match:
+            room, source = match.groups()
+        else:
+            room = "living_room" if len(args) == 1 else f"camera{i}"
+            source = arg
+        # If it's a number string, convert to int
+        if source.isdigit():
+            source = int(source)
+        sources.append((room, source))
+    return sources
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Edge fall detection")
     # source can be:
     #   - 0 (default): webcam
     #   - "rtsp://..." or "http://...": IP camera stream
     #   - "path/to/video.mp4": Video file (mp4, avi, mov, etc.)
-    if len(sys.argv) > 1:
-        source = sys.argv[1]
-        # If it's a number string, convert to int
-        if source.isdigit():
-            source = int(source)
-    else:
-        source = 0
-    
-    print(f"Starting with video source: {source}")
+    # Several sources run in one process, e.g.
+    #   python main.py living_room=rtsp://cam1/stream bedroom=rtsp://cam2/stream
+    parser.add_argument("sources", nargs="*", default=["0"], help="[room=]source, one per camera")
+    parser.add_argument("--headless", action="store_true",
+                        help="no window or per-frame drawing (unattended edge box)")
+    parser.add_argument("--preview-port", type=int, default=None,
+                        help="serve a low-rate MJPEG preview on 127.0.0.1:PORT")
+    parser.add_argument("--preview-fps", type=float, default=2, help="preview frame rate (default: 2)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve Prometheus /metrics and /metrics.json on this port")
+    parser.add_argument("--metrics-host", default="127.0.0.1",
+                        help="metrics bind address (default: 127.0.0.1; 0.0.0.0 for fleet scraping)")
+    parser.add_argument("--idle-stride", type=int, default=5,
+                        help="run the detector every Nth frame while nothing moves (1 = every frame)")
+    parser.add_argument("--backend", choices=BACKENDS, default="ultralytics",
+                        help="inference backend (default: ultralytics)")
+    parser.add_argument("--weights", default="yolov8n.pt",
+                        help="YOLO weights, or an exported .onnx file / OpenVINO model directory")
+    parser.add_argument("--imgsz", type=int, default=640, help="detector input size (default: 640)")
+    parser.add_argument("--int8", action="store_true", help="use INT8 weights (onnx / openvino backends)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="inference worker processes sharing frames through shared memory (default: 0 = in-process)")
+    parser.add_argument("--clip-format", choices=("mp4", "jpeg"), default="mp4",
+                        help="pre-fall evidence as one mp4 clip or a directory of JPEGs (default: mp4)")
+    parser.add_argument("--capture-backend", choices=CAPTURE_BACKENDS, default="auto",
+                        help="decoder for live streams (default: auto = GStreamer if available, else FFMPEG)")
+    parser.add_argument("--rtsp-transport", choices=("tcp", "udp"), default="tcp",
+                        help="RTSP transport (default: tcp)")
+    parser.add_argument("--no-hw-decode", action="store_true", help="never use hardware video decoding")
+    parser.add_argument("--record-detections", metavar="DIR", default=None,
+                        help="log every tracked detection to DIR for offline tuning (see replay.py)")
+    parser.add_argument("--store-max-mb", type=int, default=2048,
+                        help="disk budget for saved evidence in MB; oldest uploaded events go first (0 = no limit)")
+    parser.add_argument("--store-max-days", type=int, default=30,
+                        help="delete uploaded evidence older than this many days (0 = keep)")
+    parser.add_argument("--compress-history", action="store_true",
+                        help="keep the pre-fall history as JPEG bytes instead of raw frames")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    # python main.py [[room=]source ...] [--headless] [--preview-port 8080]
+    args = parse_args()
+    sources = parse_sources(args.sources)
+
+    print(f"Starting with video sources: {sources}")
     try:
-        run_edge(source)
+        run_edge(
+            sources,
+            compress_history=args.compress_history,
+            idle_stride=args.idle_stride,
+            backend=args.backend,
+            weights=args.weights,
+            imgsz=args.imgsz,
+            int8=args.int8,
+            workers=args.workers,
+            clip_format=args.clip_format,
+            capture_backend=args.capture_backend,
+            rtsp_transport=args.rtsp_transport,
+            hw_decode=not args.no_hw_decode,
+            record_dir=args.record_detections,
+            store_max_mb=args.store_max_mb,
+            store_max_days=args.store_max_days,
+            headless=args.headless,
+            preview_port=args.preview_port,
+            preview_fps=args.preview_fps,
+            metrics_port=args.metrics_port,
+            metrics_host=args.metrics_host,
+        )
     except KeyboardInterrupt:
         print("\nInterrupted by user")
     except Exception as e:
@@ -0,0 +1,206 @@
+"""
+Health metrics of a running edge box over HTTP, for fleet monitoring.
+
+    http://<host>:<port>/metrics       Prometheus text format
+    http://<host>:<port>/metrics.json  the same numbers as JSON
+
+Everything is read from counters the pipeline already keeps (StageStats,
+TIMERS, UploadWorker.stats(), ...) when a request comes in; the only
+per-frame cost is RateMeter.tick() for the rolling frame rate.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from timing import STARTUP, TIMERS
+
+
+class RateMeter:
+    """Events per second over the last `window` seconds, counted in one-second buckets."""
+
+    def __init__(self, window=10):
+        self.window = window
+        self._buckets = [0] * (window + 1)
+        self._seconds = [0] * (window + 1)  # which second each bucket currently counts
+        self._started = time.monotonic()
+
+    def tick(self, n=1):
+        second = int(time.monotonic())
+        i = second % len(self._buckets)
+        if self._seconds[i] != second:
+            self._seconds[i] = second
+            self._buckets[i] = 0
+        self._buckets[i] += n
+
+    def rate(self):
+        now = time.monotonic()
+        second = int(now)
+        # Complete seconds only: the current bucket is still filling up
+        total = sum(count for count, s in zip(self._buckets, self._seconds) if second - self.window <= s < second)
+        span = min(self.window, now - self._started)
+        return total / span if span >= 1 else 0.0
+
+
+def collect(streams, uploader=None, evidence=None, started=None, store=None):
+    """Snapshot of the pipeline as a JSON-serializable dict."""
+    snapshot = {
+        "time": time.time(),
+        "uptime_seconds": round(time.monotonic() - started, 1) if started is not None else None,
+        "streams": {},
+        "latency_ms": TIMERS.summary(),
+        "startup": STARTUP.summary(),
+    }
+    for stream in streams:
+        gate = stream.motion_gate.stats
+        entry = {
+            "fps": round(stream.fps_meter.rate(), 2),
+            "frames": {s.name: s.processed for s in (stream.capture_stats, stream.inference_stats, stream.render_stats)},
+            "dropped": {s.name: s.dropped for s in (stream.capture_stats, stream.inference_stats, stream.render_stats)},
+            "inference_duty_cycle": round(gate.duty_cycle, 4),
+            "frame_history_bytes": stream.frame_buffer.nbytes,
+            "last_fall_time": stream.last_fall_time,
+        }
+        source = getattr(stream.cap, "stats", None)
+        if source is not None:
+            entry["source"] = {
+                "connected": source.connected,
+                "decode_fps": round(source.fps, 2),
+                "reconnects": source.reconnects,
+                "failed_opens": source.failed_opens,
+            }
+        snapshot["streams"][stream.room] = entry
+    if uploader is not None:
+        snapshot["upload"] = uploader.stats()
+    if evidence is not None:
+        snapshot["evidence"] = {"written": evidence.written, "failed": evidence.failed, "pending": evidence.pending}
+    if store is not None:
+        snapshot["store"] = store.stats()
+    return snapshot
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(snapshot):
+    """Prometheus text exposition (version 0.0.4) of a collect() snapshot."""
+    families = {}  # name -> (type, help, [(labels, value)])
+
+    def add(name, kind, help_text, value, **labels):
+        if value is None:
+            return
+        families.setdefault(name, (kind, help_text, []))[2].append((labels, value))
+
+    if snapshot.get("uptime_seconds") is not None:
+        add("edge_uptime_seconds", "gauge", "Seconds since the pipeline started.", snapshot["uptime_seconds"])
+    for milestone, seconds in snapshot["startup"]["milestones"].items():
+        add("edge_startup_seconds", "gauge", "Seconds from process start to each start-up milestone.", seconds,
+            milestone=milestone)
+    for room, s in snapshot["streams"].items():
+        add("edge_stream_fps", "gauge", "Frames per second through the inference stage (rolling).", s["fps"], room=room)
+        for stage, n in s["frames"].items():
+            add("edge_frames_total", "counter", "Frames processed per pipeline stage.", n, room=room, stage=stage)
+        for stage, n in s["dropped"].items():
+            add("edge_frames_dropped_total", "counter", "Frames dropped before a stage could take them.", n,
+                room=room, stage=stage)
+        add("edge_inference_duty_cycle", "gauge", "Fraction of frames the motion gate sent to the detector.",
+            s["inference_duty_cycle"], room=room)
+        add("edge_frame_history_bytes", "gauge", "Memory held by the pre-fall frame history.",
+            s["frame_history_bytes"], room=room)
+        add("edge_last_fall_timestamp_seconds", "gauge", "Unix time of the last detected fall.",
+            s["last_fall_time"], room=room)
+        source = s.get("source")
+        if source is not None:
+            add("edge_source_up", "gauge", "1 while the live source delivers frames.", int(source["connected"]), room=room)
+            add("edge_source_decode_fps", "gauge", "Decoded frames per second of the live source.",
+                source["decode_fps"], room=room)
+            add("edge_source_reconnects_total", "counter", "Reconnects after the live source dropped.",
+                source["reconnects"], room=room)
+
+    for stage, t in snapshot["latency_ms"].items():
+        for q in ("50", "95", "99"):
+            add("edge_stage_latency_seconds", "summary", "Per-stage latency.", round(t[f"p{q}_ms"] / 1000, 6),
+                stage=stage, quantile=f"0.{q}")
+        add("edge_stage_latency_seconds_count", "summary", None, t["count"], stage=stage)
+        add("edge_stage_latency_seconds_sum", "summary", None, round(t["mean_ms"] * t["count"] / 1000, 6), stage=stage)
+
+    upload = snapshot.get("upload")
+    if upload is not None:
+        add("edge_upload_queue_depth", "gauge", "Fall events waiting to be uploaded.", upload["queue_depth"])
+        add("edge_uploads_total", "counter", "Finished fall event uploads.", upload["uploaded"], result="success")
+        add("edge_uploads_total", "counter", "Finished fall event uploads.", upload["failed"], result="failure")
+        add("edge_upload_retries_total", "counter", "Upload retries.", upload["retries"])
+        add("edge_upload_last_latency_seconds", "gauge", "Latency of the last successful upload.",
+            upload["last_latency_s"])
+    evidence = snapshot.get("evidence")
+    if evidence is not None:
+        add("edge_evidence_written_total", "counter", "Fall evidence sets written to disk.", evidence["written"])
+        add("edge_evidence_failed_total", "counter", "Fall evidence sets that failed to write.", evidence["failed"])
+        add("edge_evidence_pending", "gauge", "Fall evidence sets waiting to be written.", evidence["pending"])
+    store = snapshot.get("store")
+    if store is not None:
+        add("edge_store_bytes", "gauge", "Bytes of fall evidence kept on disk.", store["bytes"])
+        add("edge_store_events", "gauge", "Fall events kept on disk.", store["events"])
+        add("edge_store_max_bytes", "gauge", "Byte budget of the evidence store.", store["max_bytes"])
+        add("edge_store_evicted_total", "counter", "Uploaded fall events deleted to stay within budget.",
+            store["evicted"])
+        add("edge_store_blocked_events", "gauge", "Events over budget kept because they are not uploaded yet.",
+            store["blocked"])
+        add("edge_disk_free_bytes", "gauge", "Free space on the evidence disk.", store["disk_free_bytes"])
+        add("edge_disk_total_bytes", "gauge", "Size of the evidence disk.", store["disk_total_bytes"])
+
+    lines = []
+    for name, (kind, help_text, samples) in families.items():
+        if help_text is not None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            label_str = ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+            lines.append(f"{name}{{{label_str}}} {value}" if label_str else f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves collect_fn() (a zero-argument callable returning a collect() snapshot)."""
+
+    def __init__(self, collect_fn, port=9100, host="127.0.0.1"):
+        self.collect_fn = collect_fn
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        host, port = self._server.server_address[:2]
+        print(f"[metrics] Serving http://{host}:{port}/metrics (and /metrics.json)")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _make_handler(self):
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body = render_prometheus(metrics.collect_fn()).encode()
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                elif self.path == "/metrics.json":
+                    body = json.dumps(metrics.collect_fn()).encode()
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep the edge console for detection output
+
+        return Handler
@@ -0,0 +1,200 @@
+"""
+Durable outbox of fall events waiting to be uploaded.
+
+A SQLite journal (WAL mode) records every saved fall image with its upload
+state and an idempotency key. The server uses the key to drop duplicates, so
+an event can be resent safely after a crash or a lost response.
+
+Several processes (main.py and upload_missing.py) may share the journal:
+an event is claimed with a lease (claimed_at) and only reclaimed by someone
+else once the lease has expired, so a live upload is never sent twice.
+"""
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+ACKED = "acked"
+LOST = "lost"  # the image file is gone; nothing left to upload
+REJECTED = "rejected"  # the server refused the upload with a 4xx; resending it cannot succeed
+
+# An in_flight event whose claim is older than this is taken to belong to a dead process
+DEFAULT_LEASE_SECONDS = 600
+
+DEFAULT_PATH = os.path.join("captured", "outbox.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    image_path TEXT NOT NULL UNIQUE,
+    room TEXT NOT NULL,
+    occurred_at TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at TEXT NOT NULL,
+    acked_at TEXT,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS events_state ON events (state, id);
+"""
+
+
+def make_idempotency_key():
+    """
+    Random key, generated once per event and stored with it.
+    (Not derived from the file name: two boxes with the same room name, or two
+    falls in the same second, would otherwise share a key and the server would
+    drop the second event as a duplicate.)
+    """
+    return uuid.uuid4().hex
+
+
+class Outbox:
+    """Thread-safe handle on the outbox journal."""
+
+    def __init__(self, path=DEFAULT_PATH, lease_seconds=DEFAULT_LEASE_SECONDS):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(events)")}
+        if "claimed_at" not in columns:
+            # Journal from before leases; its in_flight rows (claimed_at NULL) count as expired
+            self._conn.execute("ALTER TABLE events ADD COLUMN claimed_at REAL")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def add(self, image_path, room="living_room", occurred_at=None, claim=False):
+        """
+        Record a new event as pending. Returns its idempotency key (existing key if already recorded).
+        claim=True records it already in flight under this process's lease (the caller uploads it now).
+        """
+        key = make_idempotency_key()
+        state, claimed_at = (IN_FLIGHT, time.time()) if claim else (PENDING, None)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO events"
+                " (idempotency_key, image_path, room, occurred_at, created_at, state, claimed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, image_path, room, occurred_at or datetime.utcnow().isoformat(), datetime.utcnow().isoformat(),
+                 state, claimed_at),
+            )
+            row = self._conn.execute(
+                "SELECT idempotency_key FROM events WHERE image_path = ?", (image_path,)
+            ).fetchone()
+        return row["idempotency_key"]
+
+    def claim_pending(self, limit=None):
+        """
+        Mark up to `limit` pending events (and in_flight ones whose lease expired) in flight
+        and return them, oldest first. Safe against other processes claiming at the same time.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT * FROM events WHERE state = ?"
+                    " OR (state = ? AND (claimed_at IS NULL OR claimed_at < ?)) ORDER BY id LIMIT ?",
+                    (PENDING, IN_FLIGHT, now - self.lease_seconds, -1 if limit is None else limit),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE events SET state = ?, claimed_at = ? WHERE id = ?",
+                    [(IN_FLIGHT, now, row["id"]) for row in rows],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [dict(row) for row in rows]
+
+    def mark_in_flight(self, key):
+        """Claim (or renew the lease on) an event that is about to be sent."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE events SET state = ?, claimed_at = ? WHERE idempotency_key = ?",
+                (IN_FLIGHT, time.time(), key),
+            )
+
+    def renew(self, keys):
+        """Extend the lease on events this process holds (queued or being sent)."""
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE events SET claimed_at = ? WHERE idempotency_key = ? AND state = ?",
+                [(time.time(), key, IN_FLIGHT) for key in keys],
+            )
+
+    def mark_acked(self, key):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE events SET state = ?, attempts = attempts + 1, last_error = NULL, acked_at = ?"
+                " WHERE idempotency_key = ?",
+                (ACKED, datetime.utcnow().isoformat(), key),
+            )
+
+    def mark_failed(self, key, error=None):
+        """Put the event back to pending so a later replay retries it."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE events SET state = ?, attempts = attempts + 1, last_error = ?, claimed_at = NULL"
+                " WHERE idempotency_key = ?",
+                (PENDING, error, key),
+            )
+
+    def mark_lost(self, key, error=None):
+        """The image file is gone: stop retrying the event."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE events SET state = ?, last_error = ?, claimed_at = NULL WHERE idempotency_key = ?",
+                (LOST, error, key),
+            )
+
+    def mark_rejected(self, key, error=None):
+        """The server refused the upload itself (e.g. 400, 413): stop retrying, keep the error for a person to look at."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE events SET state = ?, attempts = attempts + 1, last_error = ?, claimed_at = NULL"
+                " WHERE idempotency_key = ?",
+                (REJECTED, error, key),
+            )
+
+    def is_acked(self, image_path):
+        with self._lock:
+            row = self._conn.execute("SELECT state FROM events WHERE image_path = ?", (image_path,)).fetchone()
+        return row is not None and row["state"] == ACKED
+
+    def import_directory(self, save_dir, room="living_room"):
+        """Record *_fall.jpg files saved before the outbox existed. Returns how many were new."""
+        if not os.path.isdir(save_dir):
+            return 0
+        with self._lock:
+            known = {row[0] for row in self._conn.execute("SELECT image_path FROM events")}
+        added = 0
+        for filename in sorted(os.listdir(save_dir)):
+            path = os.path.join(save_dir, filename)
+            if filename.endswith("_fall.jpg") and os.path.isfile(path) and path not in known:
+                occurred_at = datetime.utcfromtimestamp(os.path.getmtime(path)).isoformat()
+                self.add(path, room=room, occurred_at=occurred_at)
+                added += 1
+        return added
+
+    def counts(self):
+        """Number of events per state."""
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM events GROUP BY state").fetchall()
+        counts = {PENDING: 0, IN_FLIGHT: 0, ACKED: 0, LOST: 0, REJECTED: 0}
+        counts.update({state: n for state, n in rows})
+        return counts
@@ -0,0 +1,135 @@
+"""
+Building blocks for the staged edge pipeline: capture → inference → render.
+Stages run on their own threads and are joined by bounded FrameQueues.
+"""
+import queue
+import threading
+from dataclasses import dataclass
+
+from timing import TIMERS
+
+
+@dataclass
+class StageStats:
+    name: str
+    processed: int = 0  # items the stage finished
+    dropped: int = 0  # items discarded before the stage could take them
+
+    def __str__(self):
+        return f"{self.name}: processed={self.processed}, dropped={self.dropped}"
+
+
+class FrameQueue:
+    """
+    Bounded queue between two stages.
+
+    drop_oldest=True (live sources): a full queue evicts its oldest item, so
+    the consumer always gets the newest frame and the producer never blocks.
+    drop_oldest=False (file sources): the producer waits, so every frame is kept.
+
+    Dropped items are counted on `stats`, the StageStats of the consuming stage.
+    ready_event, if given, is set on every put/close so one consumer can wait
+    on several queues at once.
+    """
+
+    def __init__(self, maxsize, drop_oldest, stats, ready_event=None):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self.drop_oldest = drop_oldest
+        self.stats = stats
+        self.ready_event = ready_event
+
+    def _notify(self):
+        if self.ready_event is not None:
+            self.ready_event.set()
+
+    def put(self, item):
+        """Returns False if the queue was closed and the item discarded."""
+        if self.drop_oldest:
+            with self._lock:
+                while True:
+                    try:
+                        self._queue.put_nowait(item)
+                        self._notify()
+                        return not self._closed.is_set()
+                    except queue.Full:
+                        try:
+                            self._queue.get_nowait()
+                            self.stats.dropped += 1
+                        except queue.Empty:
+                            pass
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                self._notify()
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self):
+        """Next item, or None once the queue is closed and drained."""
+        while True:
+            try:
+                return self._queue.get(timeout=0.1)
+            except queue.Empty:
+                if self._closed.is_set():
+                    return None
+
+    def get_nowait(self):
+        """Next item, or None if nothing is queued right now."""
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def done(self):
+        """Closed and fully drained."""
+        return self._closed.is_set() and self._queue.empty()
+
+    def close(self):
+        """Producer is done (or the pipeline is stopping)."""
+        self._closed.set()
+        self._notify()
+
+    def qsize(self):
+        return self._queue.qsize()
+
+
+class CaptureThread(threading.Thread):
+    """
+    Reads frames from a cv2.VideoCapture into a FrameQueue until the source ends.
+    The thread owns the capture and releases it itself once the loop exits, so
+    release() never runs while a read (up to the read timeout) is still blocked.
+    """
+
+    def __init__(self, cap, out_queue, stop_event, stats):
+        super().__init__(name="capture", daemon=True)
+        self.cap = cap
+        self.out_queue = out_queue
+        self.stop_event = stop_event
+        self.stats = stats
+        self.ended = False  # True when the source ran out (vs. being stopped)
+
+    def run(self):
+        try:
+            while not self.stop_event.is_set():
+                with TIMERS.time("decode"):
+                    ret, frame = self.cap.read()
+                if not ret:
+                    self.ended = True
+                    break
+                self.stats.processed += 1
+                if not self.out_queue.put(frame):
+                    break
+        finally:
+            self.out_queue.close()
+            self.cap.release()
+
+    def close(self, timeout=2):
+        """Wait up to `timeout` for the thread; a read still blocked then releases the capture when it returns."""
+        if self.ident is None:
+            self.cap.release()  # never started: nobody else will
+            return
+        self.join(timeout)
@@ -0,0 +1,79 @@
+"""
+Vectorized post-processing of detector output.
+
+The raw boxes of a frame are converted to NumPy once, then the person filter,
+confidence threshold, areas and largest-box selection are array operations.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+PERSON_CLASS = 0  # 0 is person class in COCO dataset
+
+
+@dataclass
+class Detections:
+    """Persons found in one frame."""
+    xyxy: np.ndarray  # (n, 4) int32 boxes (x1, y1, x2, y2)
+    conf: np.ndarray  # (n,) float32
+    areas: np.ndarray  # (n,) int64
+    largest: int = -1  # index of the largest box, -1 if none
+    candidates: int = 0  # boxes the backend returned before filtering (persons only: backends filter by class)
+
+    def __len__(self):
+        return len(self.conf)
+
+    @property
+    def largest_bbox(self):
+        """The largest person as an (x1, y1, x2, y2) tuple of ints, or None."""
+        if self.largest < 0:
+            return None
+        return tuple(int(v) for v in self.xyxy[self.largest])
+
+    def scaled(self, factor):
+        """The same detections in a frame `factor` times larger (boxes found on a downscaled copy)."""
+        xyxy = np.round(self.xyxy * factor).astype(np.int32)
+        wh = (xyxy[:, 2:] - xyxy[:, :2]).astype(np.int64)
+        return Detections(xyxy=xyxy, conf=self.conf, areas=wh[:, 0] * wh[:, 1], largest=self.largest,
+                          candidates=self.candidates)
+
+    @classmethod
+    def empty(cls):
+        return cls(
+            xyxy=np.empty((0, 4), dtype=np.int32),
+            conf=np.empty(0, dtype=np.float32),
+            areas=np.empty(0, dtype=np.int64),
+        )
+
+
+def detections_from_array(boxes, conf_threshold=0.0, person_class=PERSON_CLASS):
+    """
+    boxes: (n, 6+) array laid out like ultralytics `Boxes.data`:
+    x1, y1, x2, y2, [track_id,] conf, cls
+    """
+    boxes = np.asarray(boxes, dtype=np.float32)
+    if boxes.size == 0:
+        return Detections.empty()
+    candidates = len(boxes)
+
+    cls = boxes[:, -1].astype(np.int32)
+    conf = boxes[:, -2]
+    keep = (cls == person_class) & (conf >= conf_threshold)
+    if not keep.any():
+        detections = Detections.empty()
+        detections.candidates = candidates
+        return detections
+
+    xyxy = boxes[keep, :4].astype(np.int32)
+    conf = conf[keep]
+    wh = (xyxy[:, 2:] - xyxy[:, :2]).astype(np.int64)
+    areas = wh[:, 0] * wh[:, 1]
+    largest = int(np.argmax(areas))
+    if areas[largest] <= 0:
+        largest = -1
+    return Detections(xyxy=xyxy, conf=conf, areas=areas, largest=largest, candidates=candidates)
+
+
+def detections_from_result(result, conf_threshold=0.0, person_class=PERSON_CLASS):
+    """Ultralytics Results → Detections, with a single tensor → NumPy conversion."""
+    return detections_from_array(result.boxes.data.cpu().numpy(), conf_threshold, person_class)
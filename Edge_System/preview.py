@@ -0,0 +1,111 @@
+"""
+Low-rate MJPEG preview served on localhost, used instead of cv2.imshow in headless mode.
+
+    http://127.0.0.1:<port>/               index of all rooms
+    http://127.0.0.1:<port>/stream/<room>  multipart MJPEG stream of one room
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+BOUNDARY = "frame"
+
+
+class MjpegPreviewServer:
+    """
+    Holds the latest JPEG per room and serves it to browsers.
+
+    Frames are only encoded when should_update() says the room is due, so the
+    preview costs at most `fps` encodes per second per room.
+    """
+
+    def __init__(self, port=8080, fps=2, host="127.0.0.1", jpeg_quality=70):
+        self.fps = fps
+        self.jpeg_quality = jpeg_quality
+        self._interval = 1.0 / fps
+        self._frames = {}  # room -> JPEG bytes
+        self._last_update = {}  # room -> monotonic time of the last encode
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="preview", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        host, port = self._server.server_address[:2]
+        print(f"[preview] MJPEG preview at http://{host}:{port}/")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def should_update(self, room):
+        """True when `room` is due for a new preview frame."""
+        return time.monotonic() - self._last_update.get(room, 0.0) >= self._interval
+
+    def update(self, room, frame):
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            return
+        with self._lock:
+            self._frames[room] = buf.tobytes()
+            self._last_update[room] = time.monotonic()
+
+    def _latest(self, room):
+        with self._lock:
+            return self._frames.get(room)
+
+    def _rooms(self):
+        with self._lock:
+            return sorted(self._frames)
+
+    def _make_handler(self):
+        preview = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/":
+                    self._index()
+                elif self.path.startswith("/stream/"):
+                    self._stream(self.path[len("/stream/"):])
+                else:
+                    self.send_error(404)
+
+            def _index(self):
+                images = "".join(
+                    f'<h3>{room}</h3><img src="/stream/{room}" style="max-width: 100%;" />'
+                    for room in preview._rooms()
+                )
+                body = f"<html><body><h2>Edge Fall Detection</h2>{images}</body></html>".encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, room):
+                self.send_response(200)
+                self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                try:
+                    while True:
+                        jpeg = preview._latest(room)
+                        if jpeg is not None:
+                            self.wfile.write(
+                                f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                                f"Content-Length: {len(jpeg)}\r\n\r\n".encode()
+                            )
+                            self.wfile.write(jpeg)
+                            self.wfile.write(b"\r\n")
+                        time.sleep(preview._interval)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Browser closed the stream
+
+            def log_message(self, format, *args):
+                pass  # Keep the edge console for detection output
+
+        return Handler
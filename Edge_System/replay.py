@@ -0,0 +1,184 @@
+"""
+Re-run the fall logic over recorded detection logs (.dlog) without YOLO.
+
+The logs (see detection_log.py) already hold each frame's tracked boxes, so
+only the cheap part of the pipeline is replayed: the standing → lying check
+of fall_logic, vectorized over every record, plus the per-track cooldown.
+A grid of ratio thresholds × cooldowns is spread over a process pool and
+each setting is scored against labelled fall timestamps.
+
+Labels are a CSV with a `timestamp` column (epoch seconds, ISO 8601, or
+video seconds for logs written by analyze.py --record) and an optional
+`room` column; rows without a room apply to every log.
+
+Usage:
+    python replay.py logs/*.dlog --labels falls.csv
+    python replay.py logs/*.dlog --labels falls.csv --ratios 1.1:2.0:0.05 --cooldowns 0,5,10,30 --workers 8
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import product
+
+import numpy as np
+
+from detection_log import load_log, room_from_path
+from fall_logic import lying_mask
+
+# Per-process replay data, filled by _init_worker
+_LOGS = []
+
+
+def prepare_log(log):
+    """
+    Sort a log by (track, frame) once; everything threshold-independent is computed here.
+    Returns a dict of columns reused by every replay_falls() call.
+    """
+    order = np.lexsort((log["frame"], log["track"]))
+    track = np.asarray(log["track"])[order]
+    xyxy = np.stack([np.asarray(log[k])[order] for k in ("x1", "y1", "x2", "y2")], axis=1)
+    return {
+        "t": np.asarray(log["t"])[order],
+        "track": track,
+        "xyxy": xyxy.astype(np.float32),
+        # Row i continues the track of row i - 1 (a track's first sighting can never be a fall)
+        "continues": np.concatenate([[False], track[1:] == track[:-1]]),
+    }
+
+
+def replay_falls(prepared, ratio_threshold=1.3, cooldown_seconds=10):
+    """
+    Times of the falls the live tracker would have reported with these settings,
+    one per frame even when several tracks fall at once (like the saved events).
+    """
+    lying = lying_mask(prepared["xyxy"], ratio_threshold)
+    # detect_fall for every record at once: previous observation standing, this one lying
+    candidates = np.flatnonzero(prepared["continues"] & lying & ~np.roll(lying, 1))
+    if not len(candidates):
+        return np.empty(0)
+
+    # Cooldown only matters between falls of the same track, and there are few candidates
+    t = prepared["t"][candidates]
+    track = prepared["track"][candidates]
+    keep = np.zeros(len(candidates), dtype=bool)
+    last_track, last_fall = None, None
+    for i in range(len(candidates)):
+        if track[i] != last_track:
+            last_track, last_fall = track[i], None
+        if last_fall is None or t[i] - last_fall >= cooldown_seconds:
+            keep[i] = True
+            last_fall = t[i]
+    return np.unique(t[keep])
+
+
+def score(predicted, labels, tolerance):
+    """Match predictions to labels (each used once) within ±tolerance seconds. Returns (tp, fp, fn)."""
+    predicted = np.sort(np.asarray(predicted, dtype=np.float64))
+    used = np.zeros(len(predicted), dtype=bool)
+    tp = 0
+    for label in np.sort(np.asarray(labels, dtype=np.float64)):
+        lo = np.searchsorted(predicted, label - tolerance, side="left")
+        hi = np.searchsorted(predicted, label + tolerance, side="right")
+        free = np.flatnonzero(~used[lo:hi])
+        if len(free):
+            used[lo + free[0]] = True
+            tp += 1
+    return tp, len(predicted) - tp, len(labels) - tp
+
+
+def _init_worker(paths, labels):
+    # Each worker maps the logs itself; the OS page cache shares the bytes between processes
+    _LOGS.clear()
+    for path in paths:
+        room = room_from_path(path)
+        room_labels = [ts for label_room, ts in labels if not label_room or label_room == room]
+        _LOGS.append((prepare_log(load_log(path)), np.asarray(room_labels, dtype=np.float64)))
+
+
+def _evaluate(params):
+    ratio_threshold, cooldown_seconds, tolerance = params
+    tp = fp = fn = 0
+    for prepared, labels in _LOGS:
+        falls = replay_falls(prepared, ratio_threshold, cooldown_seconds)
+        a, b, c = score(falls, labels, tolerance)
+        tp, fp, fn = tp + a, fp + b, fn + c
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "ratio_threshold": round(float(ratio_threshold), 4),
+        "cooldown_seconds": float(cooldown_seconds),
+        "falls": tp + fp,
+        "tp": tp,
+        "fp": fp,
+        "fn": fn,
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(f1, 4),
+    }
+
+
+def sweep(paths, labels, ratios, cooldowns, tolerance=2.0, workers=None):
+    """
+    Evaluate every (ratio, cooldown) pair over all logs in a process pool.
+    labels: list of (room, timestamp) pairs, room "" for any log.
+    Returns one result dict per pair, best F1 first (then fewest false alarms).
+    """
+    grid = [(r, c, tolerance) for r, c in product(ratios, cooldowns)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(paths, labels)) as pool:
+        results = list(pool.map(_evaluate, grid, chunksize=max(1, len(grid) // (4 * (workers or os.cpu_count())))))
+    return sorted(results, key=lambda r: (-r["f1"], r["fp"], r["ratio_threshold"]))
+
+
+def parse_timestamp(value):
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def read_labels(path):
+    """CSV with a `timestamp` column and an optional `room` column → [(room, seconds), ...]."""
+    with open(path, newline="") as f:
+        return [(row.get("room") or "", parse_timestamp(row["timestamp"])) for row in csv.DictReader(f)]
+
+
+def parse_range(spec):
+    """'1.1:2.0:0.05' → 1.1, 1.15, …, 2.0; '0,5,10' → 0, 5, 10."""
+    if ":" in spec:
+        start, stop, step = map(float, spec.split(":"))
+        return np.round(np.arange(start, stop + step / 2, step), 6).tolist()
+    return [float(v) for v in spec.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay detection logs through the fall logic and sweep thresholds")
+    parser.add_argument("logs", nargs="+", help=".dlog files written by main.py --record-detections or analyze.py --record")
+    parser.add_argument("--labels", default=None, help="CSV of true falls (timestamp[,room]); without it only fall counts are shown")
+    parser.add_argument("--ratios", default="1.1:2.0:0.05", help="ratio thresholds, start:stop:step or a,b,c (default: 1.1:2.0:0.05)")
+    parser.add_argument("--cooldowns", default="0,5,10,20,30", help="cooldowns in seconds (default: 0,5,10,20,30)")
+    parser.add_argument("--tolerance", type=float, default=2.0, help="seconds between a label and a detected fall (default: 2)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--top", type=int, default=10, help="settings to print (default: 10)")
+    parser.add_argument("--output", default=None, help="write every result to this JSON file")
+    args = parser.parse_args()
+
+    labels = read_labels(args.labels) if args.labels else []
+    records = sum(len(load_log(path)) for path in args.logs)
+    started = time.perf_counter()
+    results = sweep(args.logs, labels, parse_range(args.ratios), parse_range(args.cooldowns),
+                    tolerance=args.tolerance, workers=args.workers)
+    elapsed = time.perf_counter() - started
+
+    print(f"{len(results)} settings × {records} detections in {elapsed:.2f}s ({len(labels)} labelled falls)")
+    print(f"{'ratio':>7}{'cooldown':>10}{'falls':>7}{'tp':>5}{'fp':>5}{'fn':>5}{'prec':>7}{'recall':>8}{'f1':>7}")
+    for r in results[:args.top]:
+        print(f"{r['ratio_threshold']:>7.2f}{r['cooldown_seconds']:>10.0f}{r['falls']:>7}{r['tp']:>5}{r['fp']:>5}"
+              f"{r['fn']:>5}{r['precision']:>7.2f}{r['recall']:>8.2f}{r['f1']:>7.2f}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
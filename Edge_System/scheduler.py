@@ -0,0 +1,82 @@
+"""
+Motion-gated inference scheduling.
+
+A cheap frame difference on a small grayscale copy decides whether the
+detector needs to run. A still, empty room only gets every Nth frame
+inferred; motion or a tracked person brings it back to every frame.
+"""
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+
+@dataclass
+class GateStats:
+    frames: int = 0
+    inferred: int = 0
+    motion_frames: int = 0
+
+    @property
+    def duty_cycle(self):
+        """Fraction of frames that went through the detector."""
+        return self.inferred / self.frames if self.frames else 0.0
+
+    def __str__(self):
+        return (f"gate: inferred={self.inferred}/{self.frames} "
+                f"(duty={self.duty_cycle:.0%}), motion_frames={self.motion_frames}")
+
+
+class MotionGate:
+    """
+    idle_stride: run the detector every Nth frame while nothing moves (1 disables gating)
+    motion_threshold: fraction of downscaled pixels that must change to count as motion
+    pixel_delta: per-pixel gray level change that counts as changed
+    hold_frames: keep inferring every frame for this long after the last motion
+    """
+
+    def __init__(self, idle_stride=5, motion_threshold=0.005, pixel_delta=25, width=160, hold_frames=30):
+        self.idle_stride = max(1, idle_stride)
+        self.motion_threshold = motion_threshold
+        self.pixel_delta = pixel_delta
+        self.width = width
+        self.hold_frames = hold_frames
+        self.stats = GateStats()
+        self._prev = None
+        self._since_motion = hold_frames  # frames since motion was last seen
+        self._since_inference = 0
+
+    def _has_motion(self, frame):
+        h, w = frame.shape[:2]
+        size = (self.width, max(1, h * self.width // w))
+        small = cv2.cvtColor(cv2.resize(frame, size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        small = cv2.GaussianBlur(small, (5, 5), 0)
+        prev, self._prev = self._prev, small
+        if prev is None or prev.shape != small.shape:
+            return True
+        changed = np.count_nonzero(cv2.absdiff(small, prev) > self.pixel_delta)
+        return changed > self.motion_threshold * small.size
+
+    def should_infer(self, frame, tracking=False):
+        """
+        Call once per frame. tracking: a person is currently tracked, which
+        forces inference so no fall transition is skipped.
+        """
+        self.stats.frames += 1
+        if self.idle_stride == 1:
+            self.stats.inferred += 1
+            return True
+
+        if self._has_motion(frame):
+            self.stats.motion_frames += 1
+            self._since_motion = 0
+        else:
+            self._since_motion += 1
+
+        active = tracking or self._since_motion < self.hold_frames
+        self._since_inference += 1
+        if active or self._since_inference >= self.idle_stride:
+            self._since_inference = 0
+            self.stats.inferred += 1
+            return True
+        return False
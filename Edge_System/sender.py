@@ -1,20 +1,59 @@
 """
 Send fall event to Django service.
+
+send_fall_event() uploads synchronously; UploadWorker does the same from a
+background thread so the detection loop only enqueues.
 """
+from dataclasses import dataclass
 from datetime import datetime
+import os
+import queue
+import random
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 import traceback
 
+from timing import TIMERS
+
 SERVER_URL = "https://yunhyungnam.pythonanywhere.com/api/fall-events/"
 
+# Answers worth sending again later; any other 4xx is a permanent rejection of the upload
+RETRY_STATUS_CODES = {408, 429}
+
+
+@dataclass
+class UploadResult:
+    """Outcome of send_fall_event(); truthy on success."""
+    ok: bool
+    status_code: int = None  # None if no HTTP response came back (connection error, timeout, ...)
+    error: str = None
+
+    def __bool__(self):
+        return self.ok
+
+    @property
+    def retryable(self):
+        """No response, 5xx, 408 or 429: the same upload may succeed later."""
+        if self.ok:
+            return False
+        return self.status_code is None or self.status_code >= 500 or self.status_code in RETRY_STATUS_CODES
+
+
+def send_fall_event(image_path, room="living_room", occurred_at=None, session=None, idempotency_key=None):
+    """
+    Upload one fall image. Returns an UploadResult (truthy on success).
+    occurred_at: ISO timestamp of the fall (defaults to now)
+    session: requests.Session to reuse a keep-alive connection (defaults to a one-off request)
+    idempotency_key: lets the server drop duplicates when an upload is resent
+    """
+    http = session or requests
 
-def send_fall_event(image_path, room="living_room"):
-    import os
-    
     # Check if image file exists
     if not os.path.exists(image_path):
         print(f"Error: Image file not found: {image_path}")
-        return False
+        return UploadResult(False, error="image file not found")
     
     file_size = os.path.getsize(image_path)
     print(f"[업로드 시도] 이미지 전송 시작: {image_path} ({file_size} bytes)")
@@ -25,12 +64,17 @@ def send_fall_event(image_path, room="living_room"):
             files = {"image": (os.path.basename(image_path), f, "image/jpeg")}
             data = {
                 "location": room,
-                "description": "Fall detected in living room",
-                "occurred_at": datetime.utcnow().isoformat(),
+                "description": f"Fall detected in {room}",
+                "occurred_at": occurred_at or datetime.utcnow().isoformat(),
             }
             
+            headers = {}
+            if idempotency_key:
+                data["idempotency_key"] = idempotency_key
+                headers["Idempotency-Key"] = idempotency_key
+
             print(f"[업로드 시도] 데이터: location={room}, occurred_at={data['occurred_at']}")
-            resp = requests.post(SERVER_URL, files=files, data=data, timeout=10)
+            resp = http.post(SERVER_URL, files=files, data=data, headers=headers, timeout=10)
             
             print(f"[서버 응답] 상태 코드: {resp.status_code}")
             print(f"[서버 응답] 응답 내용: {resp.text[:200]}")  # 처음 200자만 출력
@@ -42,25 +86,223 @@ def send_fall_event(image_path, room="living_room"):
                 print(f"[업로드 성공] 이미지 URL: {result['image_url']}")
             else:
                 print("[경고] 응답에 image_url이 없습니다")
-            return True
+            return UploadResult(True, status_code=resp.status_code)
             
     except requests.exceptions.ConnectionError as e:
         print(f"[업로드 실패] 서버 연결 실패: {SERVER_URL}")
         print(f"[업로드 실패] 서버가 실행 중인지 확인하세요: {e}")
         traceback.print_exc()
-        return False
+        return UploadResult(False, error=f"connection error: {e}")
     except requests.exceptions.Timeout as e:
         print(f"[업로드 실패] 서버 응답 시간 초과: {e}")
         traceback.print_exc()
-        return False
+        return UploadResult(False, error=f"timeout: {e}")
     except requests.exceptions.HTTPError as e:
+        # A Response is falsy for 4xx/5xx, so compare with None
+        status_code = e.response.status_code if e.response is not None else None
         print(f"[업로드 실패] HTTP 에러: {e}")
-        print(f"[업로드 실패] 응답 상태 코드: {e.response.status_code if e.response else 'N/A'}")
-        if e.response:
-            print(f"[업로드 실패] 응답 내용: {e.response.text[:500]}")
+        print(f"[업로드 실패] 응답 상태 코드: {status_code if status_code is not None else 'N/A'}")
+        body = e.response.text[:500] if e.response is not None else ""
+        if body:
+            print(f"[업로드 실패] 응답 내용: {body}")
         traceback.print_exc()
-        return False
+        return UploadResult(False, status_code=status_code, error=f"HTTP {status_code}: {body[:200]}")
     except Exception as e:
         print(f"[업로드 실패] 예상치 못한 에러: {type(e).__name__}: {e}")
         traceback.print_exc()
-        return False
+        return UploadResult(False, error=f"{type(e).__name__}: {e}")
+
+
+def image_available(image_path, outbox=None, key=None):
+    """
+    True if the image file exists. If it is gone, the outbox event is marked lost:
+    retrying cannot bring the file back. Shared by every path that replays the outbox.
+    """
+    if os.path.exists(image_path):
+        return True
+    print(f"Error: Image file not found: {image_path}")
+    if outbox is not None and key is not None:
+        outbox.mark_lost(key, "image file not found")
+    return False
+
+
+class UploadWorker:
+    """
+    Background uploader fed from an in-process queue.
+
+    Uses one keep-alive requests.Session, retries failed uploads with
+    exponential backoff and jitter, and tracks queue depth and latency.
+    With an Outbox, every event is journaled before it is queued and its
+    state is updated as the upload progresses, so nothing is lost on a crash.
+    Every poll_interval seconds the worker also claims events that are pending
+    in the outbox (earlier failures, expired leases of a dead process).
+    """
+
+    def __init__(self, outbox=None, max_queue=100, max_retries=5, base_delay=1.0, max_delay=60.0,
+                 poll_interval=60.0):
+        self.outbox = outbox
+        self.poll_interval = poll_interval
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="uploader", daemon=True)
+        self._lock = threading.Lock()
+        self._held = set()  # outbox keys this worker has claimed and not finished (lease renewed on poll)
+        self.uploaded = 0
+        self.failed = 0
+        self.retries = 0
+        self.last_latency = None  # seconds, last successful upload
+        self._total_latency = 0.0
+
+    def start(self):
+        # Events left pending by an earlier run go out first
+        self._poll_outbox()
+        self._thread.start()
+        return self
+
+    def _poll_outbox(self):
+        """Queue claimable outbox events, leaving half of the queue free for new falls."""
+        if self.outbox is None:
+            return
+        free = self._queue.maxsize // 2 - self._queue.qsize()
+        if free <= 0:
+            return
+        for row in self.outbox.claim_pending(limit=free):
+            with self._lock:
+                self._held.add(row["idempotency_key"])
+            self._queue.put_nowait((row["image_path"], row["room"], row["occurred_at"], row["idempotency_key"]))
+
+    def stop(self, timeout=10):
+        """Let queued uploads finish for up to `timeout` seconds, then return."""
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self.session.close()
+
+    def enqueue(self, image_path, room="living_room"):
+        """Queue an upload without waiting on the network. Returns False if the queue is full."""
+        occurred_at = datetime.utcnow().isoformat()
+        key = None
+        if self.outbox is not None:
+            # Claimed right away, so upload_missing.py running alongside does not send it too
+            key = self.outbox.add(image_path, room=room, occurred_at=occurred_at, claim=True)
+            with self._lock:
+                self._held.add(key)
+        item = (image_path, room, occurred_at, key)
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            if key is not None:
+                # Kept in the outbox as pending; a later poll picks it up
+                with self._lock:
+                    self._held.discard(key)
+                self.outbox.mark_failed(key, "upload queue full")
+                print(f"[업로드 대기열] 대기열이 가득 차서 나중에 보냅니다: {image_path}")
+                return False
+            print(f"[업로드 대기열] 대기열이 가득 차서 이벤트를 버립니다: {image_path}")
+            with self._lock:
+                self.failed += 1
+            return False
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._lock:
+            avg = self._total_latency / self.uploaded if self.uploaded else None
+            return {
+                "queue_depth": self.queue_depth,
+                "uploaded": self.uploaded,
+                "failed": self.failed,
+                "retries": self.retries,
+                "last_latency_s": self.last_latency,
+                "avg_latency_s": avg,
+            }
+
+    def _backoff(self, attempt):
+        # Exponential backoff with full jitter: uniform(0, min(max, base * 2^attempt))
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _run(self):
+        next_poll = time.monotonic() + self.poll_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, next_poll - time.monotonic()))
+            except queue.Empty:
+                item = False
+            if time.monotonic() >= next_poll:
+                self._renew_leases()
+                self._poll_outbox()
+                next_poll = time.monotonic() + self.poll_interval
+            if item is False:
+                continue
+            if item is None:
+                break
+            image_path, room, occurred_at, key = item
+            try:
+                self._send(image_path, room, occurred_at, key)
+            finally:
+                with self._lock:
+                    self._held.discard(key)
+
+    def _renew_leases(self):
+        with self._lock:
+            held = list(self._held)
+        if self.outbox is not None and held:
+            self.outbox.renew(held)
+
+    def _send(self, image_path, room, occurred_at, key):
+        if key is not None:
+            self.outbox.mark_in_flight(key)
+        if not image_available(image_path, self.outbox, key):
+            with self._lock:
+                self.failed += 1
+            return
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                # A long retry run must not let the leases of this and the queued events expire
+                self._renew_leases()
+            started = time.monotonic()
+            result = send_fall_event(
+                image_path, room=room, occurred_at=occurred_at, session=self.session, idempotency_key=key
+            )
+            latency = time.monotonic() - started
+            TIMERS.record("upload", latency)
+            if result:
+                with self._lock:
+                    self.uploaded += 1
+                    self.last_latency = latency
+                    self._total_latency += latency
+                if key is not None:
+                    self.outbox.mark_acked(key)
+                print(f"[업로드 성공] {image_path} ({latency:.2f}s, 대기열 {self.queue_depth}개)")
+                break
+            if not result.retryable:
+                # The server rejected the upload itself (400, 413, ...): resending the same request cannot help
+                with self._lock:
+                    self.failed += 1
+                if key is not None:
+                    self.outbox.mark_rejected(key, result.error)
+                print(f"[업로드 거부] 서버가 거부하여 재시도하지 않습니다 ({result.status_code}): {image_path}")
+                break
+            if attempt == self.max_retries:
+                with self._lock:
+                    self.failed += 1
+                if key is not None:
+                    # Back to pending: the next outbox poll (or upload_missing.py) retries it
+                    self.outbox.mark_failed(key, "max retries exceeded")
+                print(f"[업로드 실패] 재시도 {self.max_retries}회 후 포기: {image_path}")
+                break
+            delay = self._backoff(attempt)
+            with self._lock:
+                self.retries += 1
+            print(f"[업로드 재시도] {delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries}): {image_path}")
+            time.sleep(delay)
@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import datetime
+
+from capture_store import EVENT_FILE, CaptureStore
+from outbox import Outbox
+
+
+def stamp(days_ago):
+    return datetime.fromtimestamp(time.time() - days_ago * 86400).strftime("%Y%m%d_%H%M%S")
+
+
+class EventFileTests(unittest.TestCase):
+    def test_names(self):
+        cases = {
+            "20240101_120000_123_kitchen_fall.jpg": ("20240101_120000_123_kitchen", "fall.jpg"),
+            "20240101_120000_123_living_room-2_pre_fall": ("20240101_120000_123_living_room-2", "pre_fall"),
+            "20240101_120000_123_kitchen_pre_fall.mp4": ("20240101_120000_123_kitchen", "pre_fall.mp4"),
+            # Saved before rooms were recorded
+            "20240101_120000_fall.jpg": ("20240101_120000", "fall.jpg"),
+            "20240101_120000_pre_fall": ("20240101_120000", "pre_fall"),
+            "20240101_120000_sequence.jpg": ("20240101_120000", "sequence.jpg"),
+        }
+        for name, groups in cases.items():
+            self.assertEqual(EVENT_FILE.match(name).groups(), groups, name)
+        for name in ("20240101_120000_fall.jpg.tmp", "20240101_120000_kitchen_pre_fall.tmp", "outbox.sqlite3"):
+            self.assertIsNone(EVENT_FILE.match(name), name)
+
+
+class CaptureStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.outbox = Outbox(os.path.join(self.dir, "outbox.sqlite3"))
+
+    def tearDown(self):
+        self.outbox.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def write_event(self, prefix, nbytes=1000, acked=True):
+        """An event of about nbytes: fall image, sequence image and a pre-fall directory."""
+        fall = os.path.join(self.dir, f"{prefix}_fall.jpg")
+        for path in (fall, os.path.join(self.dir, f"{prefix}_sequence.jpg")):
+            with open(path, "wb") as f:
+                f.write(b"x" * (nbytes // 2))
+        os.makedirs(os.path.join(self.dir, f"{prefix}_pre_fall"))
+        key = self.outbox.add(fall, claim=True)
+        if acked:
+            self.outbox.mark_acked(key)
+        return prefix
+
+    def exists(self, prefix):
+        return os.path.exists(os.path.join(self.dir, f"{prefix}_fall.jpg"))
+
+    def test_rescan_indexes_existing_events(self):
+        prefix = self.write_event(f"{stamp(1)}_000_kitchen")
+        store = CaptureStore(self.dir, self.outbox, max_bytes=None, max_age_days=None)
+        self.assertEqual(store.stats()["events"], 1)
+        self.assertEqual(store.stats()["bytes"], 1000)
+        self.assertEqual(store.sweep(), 0)
+        self.assertTrue(self.exists(prefix))
+
+    def test_oldest_uploaded_events_go_first_until_under_budget(self):
+        old, middle, new = (self.write_event(f"{stamp(d)}_000_kitchen") for d in (3, 2, 1))
+        store = CaptureStore(self.dir, self.outbox, max_bytes=2000, max_age_days=None)
+        self.assertEqual(store.sweep(), 1)
+        self.assertFalse(self.exists(old))
+        self.assertTrue(self.exists(middle) and self.exists(new))
+        self.assertFalse(os.path.exists(os.path.join(self.dir, f"{old}_pre_fall")))
+
+    def test_events_not_uploaded_are_never_evicted(self):
+        pending = self.write_event(f"{stamp(3)}_000_kitchen", acked=False)
+        uploaded = self.write_event(f"{stamp(2)}_000_kitchen")
+        store = CaptureStore(self.dir, self.outbox, max_bytes=500, max_age_days=None)
+        self.assertEqual(store.sweep(), 1)
+        self.assertTrue(self.exists(pending))
+        self.assertFalse(self.exists(uploaded))
+        self.assertEqual(store.blocked, 1)
+
+    def test_age_limit(self):
+        expired = self.write_event(f"{stamp(40)}_000_kitchen")
+        recent = self.write_event(f"{stamp(1)}_000_kitchen")
+        store = CaptureStore(self.dir, self.outbox, max_bytes=None, max_age_days=30)
+        self.assertEqual(store.sweep(), 1)
+        self.assertFalse(self.exists(expired))
+        self.assertTrue(self.exists(recent))
+
+    def test_events_without_room_are_evicted_too(self):
+        old = self.write_event(stamp(40))
+        store = CaptureStore(self.dir, self.outbox, max_bytes=None, max_age_days=30)
+        self.assertEqual(store.sweep(), 1)
+        self.assertFalse(self.exists(old))
+
+    def test_add_indexes_a_new_event(self):
+        store = CaptureStore(self.dir, self.outbox, max_bytes=None, max_age_days=None)
+        store.add(self.write_event(f"{stamp(0)}_000_kitchen"))
+        self.assertEqual(store.stats()["events"], 1)
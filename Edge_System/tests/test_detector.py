@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+
+from detector import decode_yolov8, letterbox
+from postprocess import PERSON_CLASS, detections_from_array
+
+
+def head_output(anchors, classes=3):
+    """A (1, 4 + classes, n) YOLOv8 head output from (cx, cy, w, h, class scores...) rows."""
+    pred = np.zeros((4 + classes, len(anchors)), dtype=np.float32)
+    for i, anchor in enumerate(anchors):
+        pred[:len(anchor), i] = anchor
+    return pred[None]
+
+
+class LetterboxTests(unittest.TestCase):
+    def test_wide_frame_is_padded_top_and_bottom(self):
+        image, scale, (pad_x, pad_y) = letterbox(np.zeros((320, 640, 3), dtype=np.uint8), 320)
+        self.assertEqual(image.shape, (320, 320, 3))
+        self.assertEqual((scale, pad_x, pad_y), (0.5, 0, 80))
+        self.assertEqual(int(image[0, 0, 0]), 114)
+        self.assertEqual(int(image[160, 160, 0]), 0)
+
+
+class DecodeTests(unittest.TestCase):
+    params = [(0.5, (0, 80))]  # a 640x320 frame letterboxed to 320
+
+    def test_boxes_are_mapped_back_to_the_frame(self):
+        output = head_output([(100, 180, 40, 80, 0.9)])
+        [detections] = decode_yolov8(output, self.params, conf=0.25)
+        self.assertEqual(detections.xyxy.tolist(), [[160, 120, 240, 280]])
+        self.assertAlmostEqual(float(detections.conf[0]), 0.9, places=5)
+
+    def test_anchor_whose_best_class_is_not_person_is_dropped(self):
+        # Person 0.4 clears the threshold, but the anchor is more likely class 2
+        output = head_output([(100, 180, 40, 80, 0.4, 0.0, 0.8), (200, 180, 40, 80, 0.6, 0.0, 0.1)])
+        [detections] = decode_yolov8(output, self.params, conf=0.25)
+        self.assertEqual(len(detections), 1)
+        self.assertEqual(detections.xyxy[0, 0], 360)
+
+    def test_overlapping_boxes_are_suppressed(self):
+        output = head_output([(100, 180, 40, 80, 0.9), (102, 180, 40, 80, 0.8), (100, 180, 40, 80, 0.1)])
+        [detections] = decode_yolov8(output, self.params, conf=0.25)
+        self.assertEqual(len(detections), 1)
+        self.assertAlmostEqual(float(detections.conf[0]), 0.9, places=5)
+
+
+class DetectionsTests(unittest.TestCase):
+    def test_filters_class_and_confidence_and_finds_the_largest(self):
+        boxes = [
+            (0, 0, 10, 10, 0.9, PERSON_CLASS),
+            (0, 0, 50, 50, 0.9, 56),  # chair
+            (0, 0, 30, 30, 0.8, PERSON_CLASS),
+            (0, 0, 40, 40, 0.1, PERSON_CLASS),
+        ]
+        detections = detections_from_array(boxes, conf_threshold=0.25)
+        self.assertEqual(len(detections), 2)
+        self.assertEqual(detections.candidates, 4)
+        self.assertEqual(detections.areas.tolist(), [100, 900])
+        self.assertEqual(detections.largest_bbox, (0, 0, 30, 30))
+
+    def test_empty(self):
+        self.assertIsNone(detections_from_array([]).largest_bbox)
+        detections = detections_from_array([(0, 0, 10, 10, 0.9, 56)])
+        self.assertEqual((len(detections), detections.candidates), (0, 1))
+
+    def test_scaled(self):
+        detections = detections_from_array([(10, 20, 30, 60, 0.9, PERSON_CLASS)]).scaled(2)
+        self.assertEqual(detections.xyxy.tolist(), [[20, 40, 60, 120]])
+        self.assertEqual(detections.areas.tolist(), [3200])
+        self.assertEqual(detections.largest_bbox, (20, 40, 60, 120))
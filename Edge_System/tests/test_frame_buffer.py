@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+
+from frame_buffer import FrameRingBuffer
+
+
+def frame(value, shape=(8, 8, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def values(frames):
+    return [int(f[0, 0, 0]) for f in frames]
+
+
+class RawBufferTests(unittest.TestCase):
+    def test_keeps_the_newest_frames_oldest_first(self):
+        buffer = FrameRingBuffer(4)
+        for n in range(6):
+            buffer.push(frame(n))
+        self.assertEqual(len(buffer), 4)
+        self.assertEqual(values(buffer.snapshot()), [2, 3, 4, 5])
+
+    def test_snapshot_is_a_copy(self):
+        buffer = FrameRingBuffer(2)
+        buffer.push(frame(1))
+        snapshot = buffer.snapshot()
+        buffer.push(frame(2))
+        buffer.push(frame(3))
+        self.assertEqual(values(snapshot), [1])
+
+    def test_byte_budget_subsamples_evenly_and_keeps_the_newest(self):
+        buffer = FrameRingBuffer(60)
+        for n in range(60):
+            buffer.push(frame(n))
+        per_frame = frame(0).nbytes
+        snapshot = buffer.snapshot(max_bytes=10 * per_frame)
+        self.assertEqual(len(snapshot), 10)
+        self.assertEqual(values(snapshot)[0], 0)
+        self.assertEqual(values(snapshot)[-1], 59)
+        self.assertEqual(values(snapshot), sorted(values(snapshot)))
+        # A budget below one frame still returns the newest one
+        self.assertEqual(values(buffer.snapshot(max_bytes=1)), [59])
+        self.assertEqual(len(buffer.snapshot(max_bytes=1000 * per_frame)), 60)
+
+    def test_resolution_change_starts_over(self):
+        buffer = FrameRingBuffer(4)
+        buffer.push(frame(1))
+        buffer.push(frame(2, shape=(16, 16, 3)))
+        self.assertEqual(len(buffer), 1)
+        self.assertEqual(buffer.snapshot()[0].shape, (16, 16, 3))
+
+    def test_clear(self):
+        buffer = FrameRingBuffer(3)
+        buffer.push(frame(1))
+        buffer.clear()
+        self.assertEqual(buffer.snapshot(), [])
+
+    def test_capacity_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            FrameRingBuffer(0)
+
+
+class CompressedBufferTests(unittest.TestCase):
+    def test_stores_jpeg_and_decodes_in_order(self):
+        buffer = FrameRingBuffer(3, compress=True)
+        for n in (0, 100, 200, 250):
+            buffer.push(frame(n, shape=(16, 16, 3)))
+        self.assertEqual(len(buffer.snapshot_encoded()), 3)
+        self.assertLess(buffer.nbytes, 3 * frame(0, shape=(16, 16, 3)).nbytes)
+        # JPEG is lossy: compare roughly
+        for decoded, expected in zip(values(buffer.snapshot()), (100, 200, 250)):
+            self.assertAlmostEqual(decoded, expected, delta=3)
@@ -0,0 +1,120 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from outbox import ACKED, IN_FLIGHT, LOST, PENDING, REJECTED, Outbox
+
+
+class OutboxTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "outbox.sqlite3")
+        self.outboxes = []
+
+    def tearDown(self):
+        for outbox in self.outboxes:
+            outbox.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def open(self, **kwargs):
+        outbox = Outbox(self.path, **kwargs)
+        self.outboxes.append(outbox)
+        return outbox
+
+    def states(self, outbox):
+        return {state: n for state, n in outbox.counts().items() if n}
+
+
+class IdempotencyKeyTests(OutboxTestCase):
+    def test_one_random_key_per_event(self):
+        outbox = self.open()
+        first = outbox.add("/captured/a_fall.jpg")
+        second = outbox.add("/captured/b_fall.jpg")
+        self.assertNotEqual(first, second)
+        self.assertEqual(len(first), 32)
+
+    def test_re_adding_a_path_returns_its_stored_key(self):
+        outbox = self.open()
+        key = outbox.add("/captured/a_fall.jpg")
+        self.assertEqual(outbox.add("/captured/a_fall.jpg"), key)
+        self.assertEqual(self.open().add("/captured/a_fall.jpg"), key)
+        self.assertEqual(self.states(outbox), {PENDING: 1})
+
+
+class LeaseTests(OutboxTestCase):
+    def test_claim_is_exclusive_and_ordered(self):
+        outbox = self.open()
+        paths = [f"/captured/{n}_fall.jpg" for n in range(3)]
+        for path in paths:
+            outbox.add(path)
+        self.assertEqual([row["image_path"] for row in outbox.claim_pending(limit=2)], paths[:2])
+        self.assertEqual([row["image_path"] for row in self.open().claim_pending()], paths[2:])
+        self.assertEqual(outbox.claim_pending(), [])
+
+    def test_opening_does_not_take_over_live_claims(self):
+        main = self.open()
+        main.add("/captured/a_fall.jpg", claim=True)
+        replay = self.open()  # e.g. upload_missing.py started while main.py runs
+        self.assertEqual(replay.claim_pending(), [])
+        self.assertEqual(self.states(replay), {IN_FLIGHT: 1})
+
+    def test_expired_lease_is_reclaimed(self):
+        self.open(lease_seconds=0.2).add("/captured/a_fall.jpg", claim=True)
+        other = self.open(lease_seconds=0.2)
+        self.assertEqual(other.claim_pending(), [])
+        time.sleep(0.3)
+        self.assertEqual(len(other.claim_pending()), 1)
+
+    def test_renew_keeps_the_lease(self):
+        holder = self.open(lease_seconds=0.3)
+        key = holder.add("/captured/a_fall.jpg", claim=True)
+        other = self.open(lease_seconds=0.3)
+        for _ in range(3):
+            time.sleep(0.15)
+            holder.renew([key])
+            self.assertEqual(other.claim_pending(), [])
+
+    def test_outcomes(self):
+        outbox = self.open()
+        keys = [outbox.add(f"/captured/{n}_fall.jpg", claim=True) for n in range(4)]
+        outbox.mark_acked(keys[0])
+        outbox.mark_failed(keys[1], "timeout")
+        outbox.mark_lost(keys[2], "image file not found")
+        outbox.mark_rejected(keys[3], "HTTP 400")
+        self.assertEqual(self.states(outbox), {ACKED: 1, PENDING: 1, LOST: 1, REJECTED: 1})
+        self.assertTrue(outbox.is_acked("/captured/0_fall.jpg"))
+        self.assertFalse(outbox.is_acked("/captured/1_fall.jpg"))
+        # Only the failed upload is offered again
+        self.assertEqual([row["idempotency_key"] for row in outbox.claim_pending()], [keys[1]])
+
+    def test_journal_from_before_leases(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, idempotency_key TEXT NOT NULL UNIQUE,"
+            " image_path TEXT NOT NULL UNIQUE, room TEXT NOT NULL, occurred_at TEXT NOT NULL,"
+            " state TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0, last_error TEXT,"
+            " created_at TEXT NOT NULL, acked_at TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO events (idempotency_key, image_path, room, occurred_at, state, created_at)"
+            " VALUES ('k', '/captured/old_fall.jpg', 'room', 't', 'in_flight', 't')"
+        )
+        conn.commit()
+        conn.close()
+        # No claimed_at: left in flight by a process that is long gone
+        self.assertEqual([row["idempotency_key"] for row in self.open().claim_pending()], ["k"])
+
+
+class ImportDirectoryTests(OutboxTestCase):
+    def test_records_fall_images_once(self):
+        save_dir = os.path.join(self.dir, "captured")
+        os.makedirs(os.path.join(save_dir, "20240101_120000_pre_fall"))
+        for name in ("20240101_120000_fall.jpg", "20240101_120000_sequence.jpg"):
+            open(os.path.join(save_dir, name), "wb").close()
+        outbox = self.open()
+        self.assertEqual(outbox.import_directory(save_dir), 1)
+        self.assertEqual(outbox.import_directory(save_dir), 0)
+        self.assertEqual(self.states(outbox), {PENDING: 1})
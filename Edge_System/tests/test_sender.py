@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from outbox import ACKED, LOST, PENDING, REJECTED, Outbox
+from sender import UploadResult, UploadWorker
+
+
+class UploadResultTests(unittest.TestCase):
+    def test_retryable(self):
+        self.assertTrue(UploadResult(True))
+        self.assertFalse(UploadResult(True).retryable)
+        for status_code in (None, 500, 503, 408, 429):
+            self.assertTrue(UploadResult(False, status_code).retryable, status_code)
+        for status_code in (400, 401, 404, 413):
+            self.assertFalse(UploadResult(False, status_code).retryable, status_code)
+
+
+class UploadWorkerTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.outbox = Outbox(os.path.join(self.dir, "outbox.sqlite3"))
+        self.image = os.path.join(self.dir, "20240101_120000_000_kitchen_fall.jpg")
+        with open(self.image, "wb") as f:
+            f.write(b"jpeg")
+        self.worker = UploadWorker(self.outbox, max_retries=2, base_delay=0)
+
+    def tearDown(self):
+        self.worker.session.close()
+        self.outbox.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def send(self, *results):
+        """Run one queued upload with send_fall_event answering `results` in turn."""
+        key = self.outbox.add(self.image, claim=True)
+        with mock.patch("sender.send_fall_event", side_effect=results) as send:
+            self.worker._send(self.image, "kitchen", "2024-01-01T12:00:00", key)
+        self.assertTrue(all(call.kwargs["idempotency_key"] == key for call in send.call_args_list))
+        return send.call_count
+
+    def state(self):
+        return {state for state, n in self.outbox.counts().items() if n}
+
+    def test_server_errors_are_retried_until_accepted(self):
+        self.assertEqual(self.send(UploadResult(False, 503), UploadResult(False, 429), UploadResult(True, 201)), 3)
+        self.assertEqual(self.state(), {ACKED})
+        self.assertEqual(self.worker.stats()["uploaded"], 1)
+
+    def test_client_error_is_rejected_without_retrying(self):
+        self.assertEqual(self.send(UploadResult(False, 413, "HTTP 413: too large")), 1)
+        self.assertEqual(self.state(), {REJECTED})
+        self.assertEqual(self.worker.stats()["failed"], 1)
+
+    def test_exhausted_retries_leave_the_event_pending(self):
+        self.assertEqual(self.send(*[UploadResult(False, error="timeout")] * 3), 3)
+        self.assertEqual(self.state(), {PENDING})
+
+    def test_missing_image_is_lost(self):
+        os.remove(self.image)
+        self.assertEqual(self.send(), 0)
+        self.assertEqual(self.state(), {LOST})
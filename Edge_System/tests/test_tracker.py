@@ -0,0 +1,110 @@
+import unittest
+
+import numpy as np
+
+from fall_logic import PersonState, detect_fall, is_lying_down, lying_mask
+from tracker import PersonTracker, iou_matrix, match_boxes
+
+STANDING = (100, 100, 160, 300)  # 60 x 200
+LYING = (60, 240, 260, 300)  # 200 x 60, where the standing person falls to
+
+
+class FallLogicTests(unittest.TestCase):
+    def test_lying_is_wider_than_tall(self):
+        self.assertFalse(is_lying_down(STANDING))
+        self.assertTrue(is_lying_down(LYING))
+        self.assertFalse(is_lying_down((0, 0, 10, 0)))  # zero height
+
+    def test_lying_mask_matches_scalar_version(self):
+        boxes = [STANDING, LYING, (0, 0, 10, 0), (0, 0, 130, 100), (0, 0, 131, 100)]
+        self.assertEqual(lying_mask(boxes).tolist(), [is_lying_down(b) for b in boxes])
+
+    def test_fall_is_standing_then_lying(self):
+        standing, lying = PersonState(False, STANDING), PersonState(True, LYING)
+        self.assertTrue(detect_fall(standing, lying))
+        self.assertFalse(detect_fall(lying, lying))
+        self.assertFalse(detect_fall(lying, standing))
+        self.assertFalse(detect_fall(None, lying))
+
+
+class MatchingTests(unittest.TestCase):
+    def test_iou_matrix(self):
+        iou = iou_matrix([(0, 0, 10, 10)], [(0, 0, 10, 10), (5, 0, 15, 10), (20, 20, 30, 30)])
+        np.testing.assert_allclose(iou, [[1.0, 1 / 3, 0.0]], rtol=1e-6)
+
+    def test_best_overlap_wins(self):
+        tracks = [(0, 0, 10, 10), (100, 0, 110, 10)]
+        dets = [(101, 0, 111, 10), (1, 0, 11, 10), (300, 300, 310, 310)]
+        matches, unmatched_tracks, unmatched_dets = match_boxes(tracks, dets)
+        self.assertEqual(sorted(matches), [(0, 1), (1, 0)])
+        self.assertEqual((unmatched_tracks, unmatched_dets), ([], [2]))
+
+    def test_fall_is_matched_by_center_distance(self):
+        # Standing → lying barely overlaps, but the centers are close
+        self.assertLess(iou_matrix([STANDING], [LYING])[0, 0], 0.3)
+        matches, _, _ = match_boxes([STANDING], [LYING])
+        self.assertEqual(matches, [(0, 0)])
+
+    def test_empty(self):
+        self.assertEqual(match_boxes([], [STANDING]), ([], [], [0]))
+        self.assertEqual(match_boxes([STANDING], []), ([], [0], []))
+
+
+class PersonTrackerTests(unittest.TestCase):
+    def test_ids_follow_people_not_detection_order(self):
+        tracker = PersonTracker()
+        near, far = (100, 100, 200, 400), (500, 100, 540, 200)
+        first = {t.bbox: t.track_id for t in tracker.update([near, far], now=0)}
+        # Both move a little and the detector lists them the other way round
+        near2, far2 = (105, 100, 205, 400), (490, 80, 570, 260)
+        second = {t.bbox: t.track_id for t in tracker.update([far2, near2], now=0.1)}
+        self.assertEqual(second[near2], first[near])
+        self.assertEqual(second[far2], first[far])
+
+    def test_fall_is_reported_once_per_cooldown(self):
+        tracker = PersonTracker(cooldown_seconds=10)
+        tracker.update([STANDING], now=0)
+        [track] = tracker.update([LYING], now=1)
+        self.assertTrue(track.fell)
+        self.assertEqual(track.history()[:, 4].tolist(), [0, 1])
+
+        tracker.update([STANDING], now=2)
+        [track] = tracker.update([LYING], now=3)
+        self.assertFalse(track.fell)
+        self.assertAlmostEqual(track.cooldown_remaining, 8)
+
+        tracker.update([STANDING], now=12)
+        [track] = tracker.update([LYING], now=13)
+        self.assertTrue(track.fell)
+
+    def test_someone_already_lying_is_not_a_fall(self):
+        tracker = PersonTracker()
+        tracker.update([LYING], now=0)
+        [track] = tracker.update([LYING], now=1)
+        self.assertFalse(track.fell)
+
+    def test_cooldown_is_per_person(self):
+        tracker = PersonTracker(cooldown_seconds=10)
+        other = (900, 100, 960, 300)
+        other_lying = (860, 240, 1060, 300)
+        tracker.update([STANDING, other], now=0)
+        fell = {t.bbox: t.fell for t in tracker.update([LYING, other], now=1)}
+        self.assertEqual(fell, {LYING: True, other: False})
+        # The first person's cooldown does not hold back the second
+        fell = {t.bbox: t.fell for t in tracker.update([LYING, other_lying], now=2)}
+        self.assertEqual(fell, {LYING: False, other_lying: True})
+
+    def test_lost_tracks_are_dropped(self):
+        tracker = PersonTracker(max_missed=2)
+        tracker.update([STANDING], now=0)
+        for n in range(3):
+            tracker.update([], now=n + 1)
+        self.assertEqual(tracker.tracks, [])
+        [track] = tracker.update([STANDING], now=5)
+        self.assertEqual(track.track_id, 2)
+
+    def test_history_is_a_bounded_ring(self):
+        tracker = PersonTracker(history_size=3)
+        for n in range(5):
+            [track] = tracker.update([(100 + n, 100, 160 + n, 300)], now=n)
+        self.assertEqual(track.history()[:, 0].tolist(), [102, 103, 104])
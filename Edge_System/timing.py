@@ -0,0 +1,160 @@
+"""
+Low-overhead per-stage latency histograms for the edge pipeline.
+
+Each sample costs two perf_counter_ns() calls, a log and one counter
+increment. Latencies land in log-spaced buckets (10 µs … ~100 s, ~5% wide),
+which is enough for p50/p95/p99 without keeping the samples.
+
+    with TIMERS.time("inference"):
+        ...
+    print(TIMERS.report())
+
+STARTUP records the one-off start-up milestones (model load, warm-up, time
+to first detection) of the process.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+MIN_NS = 10_000  # 10 µs: everything faster lands in the first bucket
+GROWTH = 1.05  # bucket width ratio
+BUCKETS = 330  # 10 µs * 1.05^330 ≈ 100 s
+_LOG_GROWTH = math.log(GROWTH)
+
+
+class _Histogram:
+    __slots__ = ("counts", "count", "total_ns", "max_ns")
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, ns):
+        index = 0 if ns <= MIN_NS else min(BUCKETS - 1, int(math.log(ns / MIN_NS) / _LOG_GROWTH) + 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, q):
+        """Upper edge of the bucket holding the q-th percentile, in ns."""
+        if not self.count:
+            return 0
+        target = q / 100 * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(self.max_ns, MIN_NS * GROWTH ** index)
+        return self.max_ns
+
+
+class StageTimer:
+    """Thread-safe collection of one latency histogram per stage name."""
+
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        self.record_ns(stage, int(seconds * 1e9))
+
+    def record_ns(self, stage, ns):
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = _Histogram()
+            histogram.add(ns)
+
+    @contextmanager
+    def time(self, stage):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record_ns(stage, time.perf_counter_ns() - start)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def summary(self):
+        """{stage: {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}} for every stage seen so far."""
+        with self._lock:
+            stages = dict(self._stages)
+            result = {}
+            for stage, h in stages.items():
+                result[stage] = {
+                    "count": h.count,
+                    "mean_ms": round(h.total_ns / h.count / 1e6, 3) if h.count else 0.0,
+                    "p50_ms": round(h.percentile(50) / 1e6, 3),
+                    "p95_ms": round(h.percentile(95) / 1e6, 3),
+                    "p99_ms": round(h.percentile(99) / 1e6, 3),
+                    "max_ms": round(h.max_ns / 1e6, 3),
+                }
+        return result
+
+    def report(self):
+        """Human-readable table, one line per stage."""
+        summary = self.summary()
+        if not summary:
+            return "[timing] no samples"
+        lines = [f"[timing] {'stage':<16}{'count':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  (ms)"]
+        for stage, s in summary.items():
+            lines.append(
+                f"[timing] {stage:<16}{s['count']:>8}{s['mean_ms']:>10.2f}{s['p50_ms']:>10.2f}"
+                f"{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}{s['max_ms']:>10.2f}"
+            )
+        return "\n".join(lines)
+
+
+# Process-wide timer shared by every stage of the edge pipeline
+TIMERS = StageTimer()
+
+
+class StartupTimer:
+    """
+    Wall-clock milestones of one start-up, in seconds since the timer was
+    created (when main.py's imports first load this module).
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.milestones = {}  # name -> seconds since start (first mark wins)
+        self.phases = {}  # name -> duration in seconds
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        """Record `name` as reached now; later marks of the same name are ignored. True on the first one."""
+        with self._lock:
+            if name in self.milestones:
+                return False
+            self.milestones[name] = round(time.monotonic() - self.started, 3)
+            return True
+
+    @contextmanager
+    def phase(self, name):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases[name] = round(time.monotonic() - start, 3)
+
+    def summary(self):
+        with self._lock:
+            return {"milestones": dict(self.milestones), "phases": dict(self.phases)}
+
+    def report(self):
+        summary = self.summary()
+        phases = ", ".join(f"{k} {v:.2f}s" for k, v in summary["phases"].items())
+        milestones = ", ".join(f"{k} at {v:.2f}s" for k, v in summary["milestones"].items())
+        return f"[startup] {milestones} ({phases})"
+
+
+# Start-up milestones of this process (time to first detection and what it was spent on)
+STARTUP = StartupTimer()
@@ -0,0 +1,194 @@
+"""
+Multi-person tracker: stable track IDs across frames, with the fall logic run per track.
+
+Detections are matched to tracks by IoU. The IoU cost matrix is computed in
+one NumPy broadcast and matched greedily (highest IoU first), so tens of
+tracks per frame need no Python-level pairwise loops. A fall changes the box
+shape so much that IoU alone often loses the person, so leftovers get a
+second pass matched on the distance between box centers.
+"""
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from fall_logic import PersonState, detect_fall, lying_mask
+
+
+def iou_matrix(a, b):
+    """IoU between every box in a (n, 4) and every box in b (m, 4). Returns (n, m)."""
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float32).reshape(-1, 4)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.where(union > 0, union, 1), 0.0)
+
+
+def center_distance_matrix(a, b):
+    """
+    Distance between the centers of every box in a (n, 4) and b (m, 4),
+    divided by the diagonal of the box in a. Returns (n, m).
+    """
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float32).reshape(-1, 4)
+    ca = (a[:, :2] + a[:, 2:]) / 2
+    cb = (b[:, :2] + b[:, 2:]) / 2
+    diag = np.hypot(a[:, 2] - a[:, 0], a[:, 3] - a[:, 1])
+    dist = np.linalg.norm(ca[:, None, :] - cb[None, :, :], axis=2)
+    return dist / np.maximum(diag, 1)[:, None]
+
+
+def _greedy(score, threshold):
+    """Greedily pick (row, col) pairs with the highest score >= threshold."""
+    score = score.copy()
+    n, m = score.shape
+    pairs = []
+    # Each pass takes the best remaining pair and retires its row and column
+    for _ in range(min(n, m)):
+        ri, ci = divmod(int(np.argmax(score)), m)
+        if score[ri, ci] < threshold:
+            break
+        pairs.append((ri, ci))
+        score[ri, :] = -np.inf
+        score[:, ci] = -np.inf
+    return pairs
+
+
+def match_boxes(track_boxes, det_boxes, iou_threshold=0.3, max_center_distance=0.7):
+    """
+    Greedy IoU matching, then center-distance matching of the leftovers.
+    Returns (matches, unmatched_tracks, unmatched_dets) where matches is a
+    list of (track_index, detection_index).
+    """
+    track_boxes = np.asarray(track_boxes).reshape(-1, 4)
+    det_boxes = np.asarray(det_boxes).reshape(-1, 4)
+    n, m = len(track_boxes), len(det_boxes)
+    if n == 0 or m == 0:
+        return [], list(range(n)), list(range(m))
+    matches = _greedy(iou_matrix(track_boxes, det_boxes), iou_threshold)
+
+    left_tracks = np.setdiff1d(np.arange(n), [ti for ti, _ in matches])
+    left_dets = np.setdiff1d(np.arange(m), [di for _, di in matches])
+    if len(left_tracks) and len(left_dets):
+        dist = center_distance_matrix(track_boxes[left_tracks], det_boxes[left_dets])
+        for ri, ci in _greedy(-dist, -max_center_distance):
+            matches.append((int(left_tracks[ri]), int(left_dets[ci])))
+
+    matched_tracks = {ti for ti, _ in matches}
+    matched_dets = {di for _, di in matches}
+    unmatched_tracks = [i for i in range(n) if i not in matched_tracks]
+    unmatched_dets = [i for i in range(m) if i not in matched_dets]
+    return matches, unmatched_tracks, unmatched_dets
+
+
+@dataclass
+class Track:
+    track_id: int
+    state: PersonState
+    prev_state: PersonState = None
+    missed: int = 0  # consecutive frames without a matching detection
+    last_fall_time: float = None
+    fell: bool = False  # a fall was confirmed on the latest frame
+    cooldown_remaining: float = 0.0  # > 0 when a fall on the latest frame was suppressed by the cooldown
+    detection: int = -1  # index of the matched box in the latest update() call
+    history_size: int = 30
+    _history: np.ndarray = field(default=None, repr=False)  # ring of (x1, y1, x2, y2, is_lying) rows
+    _history_len: int = field(default=0, repr=False)
+
+    @property
+    def bbox(self):
+        return self.state.bbox
+
+    @property
+    def ratio(self):
+        x1, y1, x2, y2 = self.bbox
+        h = y2 - y1
+        return (x2 - x1) / h if h > 0 else 0
+
+    def observe(self, bbox, is_lying, now, cooldown_seconds):
+        """Advance the track by one matched detection and run the fall check on it."""
+        self.prev_state = self.state if self._history_len else None
+        self.state = PersonState(is_lying=bool(is_lying), bbox=bbox)
+        self.missed = 0
+        if self._history is None:
+            self._history = np.zeros((self.history_size, 5), dtype=np.int32)
+        self._history[self._history_len % self.history_size] = (*bbox, int(is_lying))
+        self._history_len += 1
+
+        self.fell = False
+        self.cooldown_remaining = 0.0
+        if detect_fall(self.prev_state, self.state):
+            if self.last_fall_time is None or (now - self.last_fall_time) >= cooldown_seconds:
+                self.fell = True
+                self.last_fall_time = now
+            else:
+                self.cooldown_remaining = cooldown_seconds - (now - self.last_fall_time)
+
+    def history(self):
+        """Recent (x1, y1, x2, y2, is_lying) rows, oldest first."""
+        if self._history_len <= self.history_size:
+            return self._history[:self._history_len].copy()
+        start = self._history_len % self.history_size
+        return np.roll(self._history, -start, axis=0)
+
+
+class PersonTracker:
+    """
+    Assigns stable IDs to person boxes and keeps fall state + cooldown per track.
+    Tracks unseen for more than max_missed frames are dropped.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_missed=15, history_size=30,
+                 cooldown_seconds=10, ratio_threshold=1.3):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.history_size = history_size
+        self.cooldown_seconds = cooldown_seconds
+        self.ratio_threshold = ratio_threshold
+        self.tracks = []
+        self._next_id = 1
+
+    def update(self, xyxy, now=None):
+        """
+        xyxy: (n, 4) person boxes of the current frame.
+        Returns the tracks matched or created on this frame; check `fell` /
+        `cooldown_remaining` on each for fall events.
+        """
+        now = time.time() if now is None else now
+        xyxy = np.asarray(xyxy, dtype=np.int32).reshape(-1, 4)
+        track_boxes = np.array([t.bbox for t in self.tracks], dtype=np.int32).reshape(-1, 4)
+        matches, unmatched_tracks, unmatched_dets = match_boxes(track_boxes, xyxy, self.iou_threshold)
+        lying = lying_mask(xyxy, self.ratio_threshold)
+        boxes = [tuple(box) for box in xyxy.tolist()]
+
+        visible = []
+        for ti, di in matches:
+            track = self.tracks[ti]
+            track.observe(boxes[di], lying[di], now, self.cooldown_seconds)
+            track.detection = di
+            visible.append(track)
+        for ti in unmatched_tracks:
+            self.tracks[ti].missed += 1
+            self.tracks[ti].fell = False
+
+        new_tracks = []
+        for di in unmatched_dets:
+            track = Track(
+                track_id=self._next_id,
+                state=PersonState(is_lying=bool(lying[di]), bbox=boxes[di]),
+                history_size=self.history_size,
+                detection=di,
+            )
+            self._next_id += 1
+            track.observe(boxes[di], lying[di], now, self.cooldown_seconds)
+            new_tracks.append(track)
+            visible.append(track)
+
+        self.tracks = [t for t in self.tracks if t.missed <= self.max_missed] + new_tracks
+        return visible
@@ -1,57 +1,117 @@
 """
-과거에 저장된 이미지 중 서버에 업로드되지 않은 것들을 업로드하는 스크립트
+서버에 아직 업로드되지 않은(acked가 아닌) 낙상 이벤트를 outbox에서 찾아 재전송하는 스크립트
+
+outbox.sqlite3에 기록되지 않은 과거 captured/*_fall.jpg 파일은 먼저 outbox에 등록됩니다.
+idempotency key를 함께 보내므로 같은 이벤트를 다시 보내도 서버에서 중복 저장되지 않습니다.
+
+사용법:
+    python upload_missing.py [--workers 4]
 """
+import argparse
 import os
 import sys
-from sender import send_fall_event
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from outbox import Outbox
+from sender import image_available, send_fall_event
 
 SAVE_DIR = "captured"
 
 
-def upload_missing_images():
-    """captured 디렉토리의 모든 fall 이미지를 찾아 서버에 업로드"""
-    
+def upload_missing_images(max_workers=4):
+    """outbox에서 acked가 아닌 이벤트만 골라 최대 max_workers개씩 동시에 업로드"""
+
     if not os.path.exists(SAVE_DIR):
         print(f"경고: {SAVE_DIR} 디렉토리가 존재하지 않습니다.")
         return
-    
-    # 모든 fall 이미지 찾기 (pre_fall 디렉토리 제외)
-    fall_images = []
-    for filename in os.listdir(SAVE_DIR):
-        if filename.endswith("_fall.jpg") and os.path.isfile(os.path.join(SAVE_DIR, filename)):
-            fall_images.append(os.path.join(SAVE_DIR, filename))
-    
-    if not fall_images:
-        print(f"{SAVE_DIR} 디렉토리에 fall 이미지가 없습니다.")
-        return
-    
-    print(f"총 {len(fall_images)}개의 fall 이미지를 찾았습니다.\n")
-    
-    success_count = 0
-    fail_count = 0
-    
-    for image_path in sorted(fall_images):
+
+    outbox = Outbox(os.path.join(SAVE_DIR, "outbox.sqlite3"))
+    try:
+        imported = outbox.import_directory(SAVE_DIR)
+        if imported:
+            print(f"outbox에 기록되지 않은 이미지 {imported}개를 등록했습니다.")
+
+        events = outbox.claim_pending()
+        if not events:
+            print(f"업로드할 이벤트가 없습니다. (outbox: {outbox.counts()})")
+            return
+
+        print(f"총 {len(events)}개의 미전송 이벤트를 {max_workers}개씩 동시에 업로드합니다.\n")
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        # 처리 중인 이벤트의 lease를 주기적으로 연장 (main.py가 같은 이벤트를 다시 보내지 않도록)
+        remaining = {event["idempotency_key"] for event in events}
+        lease = {"renewed": time.monotonic()}
+        lock = threading.Lock()
+
+        def renew_leases():
+            with lock:
+                if time.monotonic() - lease["renewed"] < outbox.lease_seconds / 4:
+                    return
+                lease["renewed"] = time.monotonic()
+                keys = list(remaining)
+            outbox.renew(keys)
+
+        def upload(event):
+            renew_leases()
+            try:
+                return replay(event)
+            finally:
+                with lock:
+                    remaining.discard(event["idempotency_key"])
+
+        def replay(event):
+            # 파일이 지워진 이벤트는 lost로 표시 (다시 보내도 소용없음)
+            if not image_available(event["image_path"], outbox, event["idempotency_key"]):
+                print(f"❌ 파일 없음: {os.path.basename(event['image_path'])}")
+                return False
+            result = send_fall_event(
+                event["image_path"],
+                room=event["room"],
+                occurred_at=event["occurred_at"],
+                session=session,
+                idempotency_key=event["idempotency_key"],
+            )
+            if result:
+                outbox.mark_acked(event["idempotency_key"])
+                print(f"✅ 성공: {os.path.basename(event['image_path'])}")
+            elif result.retryable:
+                outbox.mark_failed(event["idempotency_key"], result.error or "replay failed")
+                print(f"❌ 실패: {os.path.basename(event['image_path'])}")
+            else:
+                # 서버가 요청 자체를 거부 (400, 413 등): 다시 보내도 같은 결과이므로 rejected로 표시
+                outbox.mark_rejected(event["idempotency_key"], result.error)
+                print(f"❌ 거부됨 ({result.status_code}): {os.path.basename(event['image_path'])}")
+            return bool(result)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(upload, events))
+        session.close()
+
+        success_count = sum(results)
+        fail_count = len(results) - success_count
         print(f"\n{'='*60}")
-        print(f"업로드 중: {os.path.basename(image_path)}")
+        print(f"업로드 완료: 성공 {success_count}개, 실패 {fail_count}개 (outbox: {outbox.counts()})")
         print(f"{'='*60}")
-        
-        success = send_fall_event(image_path, room="living_room")
-        
-        if success:
-            success_count += 1
-            print(f"✅ 성공: {os.path.basename(image_path)}")
-        else:
-            fail_count += 1
-            print(f"❌ 실패: {os.path.basename(image_path)}")
-    
-    print(f"\n{'='*60}")
-    print(f"업로드 완료: 성공 {success_count}개, 실패 {fail_count}개")
-    print(f"{'='*60}")
+    finally:
+        outbox.close()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="outbox의 미전송 낙상 이벤트 재전송")
+    parser.add_argument("--workers", type=int, default=4, help="동시 업로드 수 (기본값: 4)")
+    args = parser.parse_args()
     try:
-        upload_missing_images()
+        upload_missing_images(max_workers=args.workers)
     except KeyboardInterrupt:
         print("\n\n사용자에 의해 중단되었습니다.")
     except Exception as e:
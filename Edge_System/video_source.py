@@ -1,28 +1,237 @@
 """
 Video capture helper.
 Opens a USB webcam (0), RTSP stream, HTTP stream, or video file.
+
+Live sources are wrapped in a StreamCapture: a low-latency open (FFMPEG or
+GStreamer, minimal buffering, TCP/UDP transport, hardware decode when
+available) that reconnects with backoff when the stream drops, so a camera
+reboot or a network hiccup does not end the edge loop.
 """
-import cv2
 import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+import cv2
+
+CAPTURE_BACKENDS = ("auto", "ffmpeg", "gstreamer")
 
+# OPENCV_FFMPEG_CAPTURE_OPTIONS is read at open time, so concurrent opens must not interleave
+_FFMPEG_ENV_LOCK = threading.Lock()
 
-def get_capture(source=0):
+
+def get_capture(source=0, backend="auto", transport="tcp", hw_decode=True, stop_event=None):
     """
     source:
       0 → webcam
       'rtsp://...' → RTSP IP camera
       'http://...' → HTTP stream (e.g., IP Webcam app)
       'path/to/video.mp4' → Video file (mp4, avi, mov, etc.)
-    
+    backend / transport / hw_decode: see StreamCapture (ignored for video files)
+    stop_event: interrupts a reconnect wait when the pipeline shuts down
+
     Returns:
-        cv2.VideoCapture object
+        cv2.VideoCapture for video files, StreamCapture (same read/get/release API) otherwise
     """
-    cap = cv2.VideoCapture(source)
-    if not cap.isOpened():
-        raise RuntimeError(f"Failed to open video source: {source}")
-    return cap
+    if is_video_file(source):
+        cap = cv2.VideoCapture(source)
+        if not cap.isOpened():
+            raise RuntimeError(f"Failed to open video source: {source}")
+        return cap
+    return StreamCapture(source, backend=backend, transport=transport, hw_decode=hw_decode,
+                         stop_event=stop_event)
 
 
 def is_video_file(source):
     """Check if source is a video file path."""
     return isinstance(source, str) and os.path.isfile(source)
+
+
+def gstreamer_available():
+    return cv2.videoio_registry.hasBackend(cv2.CAP_GSTREAMER)
+
+
+def gstreamer_pipeline(source, transport="tcp"):
+    """appsink keeps only the newest decoded frame (drop=true max-buffers=1); decodebin picks a hardware decoder if one is installed."""
+    sink = "videoconvert ! video/x-raw,format=BGR ! appsink drop=true max-buffers=1 sync=false"
+    if source.startswith("rtsp://"):
+        protocols = "tcp" if transport == "tcp" else "udp"
+        return f"rtspsrc location={source} latency=0 protocols={protocols} ! decodebin ! {sink}"
+    return f"uridecodebin uri={source} ! {sink}"
+
+
+@dataclass
+class SourceStats:
+    frames: int = 0
+    reconnects: int = 0  # successful reopens after a drop
+    failed_opens: int = 0
+    fps: float = 0.0  # decoded frames per second over the last second or so
+    connected: bool = False
+
+    def __str__(self):
+        state = "up" if self.connected else "down"
+        return (f"source: {state}, decode_fps={self.fps:.1f}, frames={self.frames}, "
+                f"reconnects={self.reconnects}, failed_opens={self.failed_opens}")
+
+
+class StreamCapture:
+    """
+    Live source with the cv2.VideoCapture read/get/isOpened/release API.
+
+    backend: "ffmpeg", "gstreamer" or "auto" (GStreamer for network streams when
+             OpenCV was built with it, FFMPEG otherwise)
+    transport: "tcp" (no smeared frames on lossy Wi-Fi) or "udp" (lowest latency) for RTSP
+    hw_decode: ask OpenCV for any available hardware decoder
+    read() never returns (False, None) for a dropped stream: it reopens with
+    exponential backoff and full jitter (base_delay … max_delay) until it gets a
+    frame again or stop_event is set.
+    """
+
+    def __init__(self, source, backend="auto", transport="tcp", hw_decode=True, stop_event=None,
+                 base_delay=0.5, max_delay=30.0, timeout_ms=5000):
+        if backend not in CAPTURE_BACKENDS:
+            raise ValueError(f"Unknown capture backend: {backend} (choose from {', '.join(CAPTURE_BACKENDS)})")
+        if transport not in ("tcp", "udp"):
+            raise ValueError(f"Unknown transport: {transport}")
+        self.source = source
+        self.backend = backend
+        self.transport = transport
+        self.hw_decode = hw_decode
+        self.stop_event = stop_event or threading.Event()  # pipeline-wide shutdown
+        self._released = threading.Event()  # this capture only
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout_ms = timeout_ms
+        self.stats = SourceStats()
+        self._window_start = time.monotonic()
+        self._window_frames = 0
+        self._last_fps = None  # cv2.CAP_PROP_FPS from the first successful open
+
+        # A source that cannot be opened at all is a configuration error: fail fast
+        self._cap = self._open()
+        if self._cap is None:
+            raise RuntimeError(f"Failed to open video source: {source}")
+
+    def _open(self):
+        """One open attempt. Returns an opened cv2.VideoCapture or None."""
+        is_network = isinstance(self.source, str)
+        use_gstreamer = is_network and (
+            self.backend == "gstreamer" or (self.backend == "auto" and gstreamer_available())
+        )
+        cap = None
+        if use_gstreamer:
+            cap = cv2.VideoCapture(gstreamer_pipeline(self.source, self.transport), cv2.CAP_GSTREAMER)
+            if not cap.isOpened() and self.backend == "auto":
+                cap.release()
+                cap = None  # fall back to FFMPEG
+        if cap is None:
+            cap = self._open_default(is_network)
+
+        if not cap.isOpened():
+            cap.release()
+            self.stats.failed_opens += 1
+            self.stats.connected = False
+            return None
+        # Keep at most one frame queued inside OpenCV (honoured by V4L2 and some FFMPEG builds)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        if self._last_fps is None:
+            self._last_fps = cap.get(cv2.CAP_PROP_FPS)
+        self.stats.connected = True
+        return cap
+
+    def _open_default(self, is_network):
+        params = []
+        if self.hw_decode and hasattr(cv2, "CAP_PROP_HW_ACCELERATION"):
+            params += [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        if is_network and hasattr(cv2, "CAP_PROP_OPEN_TIMEOUT_MSEC"):
+            # A hung camera must not block read() forever, or reconnect never kicks in
+            params += [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, self.timeout_ms,
+                       cv2.CAP_PROP_READ_TIMEOUT_MSEC, self.timeout_ms]
+        if not is_network:
+            return cv2.VideoCapture(self.source, cv2.CAP_ANY, params)
+
+        options = f"rtsp_transport;{self.transport}|fflags;nobuffer|flags;low_delay"
+        with _FFMPEG_ENV_LOCK:
+            previous = os.environ.get("OPENCV_FFMPEG_CAPTURE_OPTIONS")
+            os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = options
+            try:
+                return cv2.VideoCapture(self.source, cv2.CAP_FFMPEG, params)
+            finally:
+                if previous is None:
+                    del os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"]
+                else:
+                    os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = previous
+
+    def _stopping(self):
+        return self.stop_event.is_set() or self._released.is_set()
+
+    def _sleep(self, seconds):
+        """Wait up to `seconds`; True if we were stopped meanwhile."""
+        deadline = time.monotonic() + seconds
+        while not self._stopping():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._released.wait(min(remaining, 0.2))
+        return True
+
+    def _reconnect(self):
+        """Reopen until it works or we are stopped. Returns False if stopped."""
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+        self.stats.connected = False
+        self.stats.fps = 0.0
+        attempt = 0
+        while not self._stopping():
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+            print(f"[source] {self.source} dropped, reconnecting in {delay:.1f}s (attempt {attempt + 1})")
+            if self._sleep(delay):
+                break
+            self._cap = self._open()
+            if self._cap is not None:
+                self.stats.reconnects += 1
+                print(f"[source] {self.source} reconnected")
+                return True
+            attempt += 1
+        return False
+
+    def _count_frame(self):
+        self.stats.frames += 1
+        self._window_frames += 1
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed >= 1.0:
+            self.stats.fps = self._window_frames / elapsed
+            self._window_start = now
+            self._window_frames = 0
+
+    def read(self):
+        while not self._stopping():
+            if self._cap is not None:
+                ret, frame = self._cap.read()
+                if ret:
+                    self._count_frame()
+                    return True, frame
+            if not self._reconnect():
+                break
+        return False, None
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS and self._cap is None:
+            return self._last_fps or 0.0
+        return self._cap.get(prop) if self._cap is not None else 0.0
+
+    def set(self, prop, value):
+        return self._cap.set(prop, value) if self._cap is not None else False
+
+    def isOpened(self):
+        return self._cap is not None and self._cap.isOpened()
+
+    def release(self):
+        self._released.set()
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+        self.stats.connected = False
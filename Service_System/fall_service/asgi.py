@@ -1,3 +1,10 @@
+"""
+ASGI entry point. Needed for the live event stream (/api/fall-events/stream/):
+
+    uvicorn fall_service.asgi:application --host 0.0.0.0 --port 8000
+
+Run a single process: the stream's broadcast hub is in-process.
+"""
 import os
 
 from django.core.asgi import get_asgi_application
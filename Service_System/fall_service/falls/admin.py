@@ -1,9 +1,12 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.safestring import mark_safe
 
-from .models import FallEvent, Device
+from .images import request_derivatives
+from .models import BackgroundJob, Device, FallEvent
+from .stream import publish_events
 
 
 @admin.register(FallEvent)
@@ -30,6 +33,7 @@ class FallEventAdmin(admin.ModelAdmin):
     ]
     readonly_fields = [
         'created_at',
+        'updated_at',
         'image_preview',
     ]
     list_editable = ['is_checked']
@@ -43,32 +47,43 @@ class FallEventAdmin(admin.ModelAdmin):
         ('이미지', {
             'fields': ('image', 'image_preview')
         }),
+        ('축소본', {
+            'fields': ('thumbnail', 'medium', 'image_webp'),
+            'classes': ('collapse',)
+        }),
         ('시스템 정보', {
-            'fields': ('created_at',),
+            'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
     
     def thumbnail_image(self, obj):
-        """리스트에서 이미지 썸네일 표시"""
+        """리스트에서 이미지 썸네일 표시 (축소본이 없으면 원본)"""
         if obj.image:
             return format_html(
-                '<img src="{}" width="80" height="80" style="object-fit: cover; border-radius: 4px;" />',
-                obj.image.url
+                '<img src="{}" width="80" height="80" loading="lazy" style="object-fit: cover; border-radius: 4px;" />',
+                (obj.thumbnail or obj.image).url
             )
         return "No Image"
     thumbnail_image.short_description = '이미지'
     
     def image_preview(self, obj):
-        """상세 페이지에서 이미지 미리보기"""
+        """상세 페이지에서 이미지 미리보기 (중간 크기, 클릭하면 원본)"""
         if obj.image:
             return format_html(
-                '<img src="{}" style="max-width: 500px; max-height: 500px; border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);" />',
-                obj.image.url
+                '<a href="{}" target="_blank"><img src="{}" style="max-width: 500px; max-height: 500px; border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);" /></a>',
+                obj.image.url,
+                (obj.medium or obj.image).url
             )
         return "이미지가 없습니다."
     image_preview.short_description = '이미지 미리보기'
     
+    def get_changelist_instance(self, request):
+        """현재 페이지에서 축소본이 없는 이벤트는 한 번에 생성 요청"""
+        changelist = super().get_changelist_instance(request)
+        request_derivatives(changelist.result_list)
+        return changelist
+
     def get_queryset(self, request):
         """쿼리셋 최적화"""
         qs = super().get_queryset(request)
@@ -78,13 +93,18 @@ class FallEventAdmin(admin.ModelAdmin):
     
     def mark_as_checked(self, request, queryset):
         """선택된 항목들을 확인됨으로 표시"""
-        updated = queryset.update(is_checked=True)
+        # update()는 auto_now를 갱신하지 않으므로 updated_at을 직접 설정 (앱 동기화용)
+        ids = list(queryset.values_list('pk', flat=True))  # 필터 조건이 바뀌어도 같은 항목을 다시 찾기 위해
+        updated = FallEvent.objects.filter(pk__in=ids).update(is_checked=True, updated_at=timezone.now())
+        publish_events(FallEvent.objects.filter(pk__in=ids))  # update()는 post_save를 보내지 않음
         self.message_user(request, f'{updated}개의 낙상 이벤트가 확인됨으로 표시되었습니다.')
     mark_as_checked.short_description = '선택된 항목을 확인됨으로 표시'
     
     def mark_as_unchecked(self, request, queryset):
         """선택된 항목들을 미확인으로 표시"""
-        updated = queryset.update(is_checked=False)
+        ids = list(queryset.values_list('pk', flat=True))  # 필터 조건이 바뀌어도 같은 항목을 다시 찾기 위해
+        updated = FallEvent.objects.filter(pk__in=ids).update(is_checked=False, updated_at=timezone.now())
+        publish_events(FallEvent.objects.filter(pk__in=ids))  # update()는 post_save를 보내지 않음
         self.message_user(request, f'{updated}개의 낙상 이벤트가 미확인으로 표시되었습니다.')
     mark_as_unchecked.short_description = '선택된 항목을 미확인으로 표시'
 
@@ -102,3 +122,19 @@ class DeviceAdmin(admin.ModelAdmin):
         return f"{obj.token[:20]}..." if len(obj.token) > 20 else obj.token
     token_short.short_description = '토큰 (일부)'
 
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'attempts', 'run_after', 'created_at', 'finished_at']
+    list_filter = ['status', 'kind']
+    readonly_fields = ['created_at', 'finished_at', 'locked_at', 'last_error']
+    ordering = ['-created_at']
+    actions = ['retry_now']
+
+    def retry_now(self, request, queryset):
+        """실패했거나 대기 중인 작업을 바로 다시 실행하도록 예약"""
+        updated = queryset.exclude(status=BackgroundJob.RUNNING).update(
+            status=BackgroundJob.PENDING, run_after=timezone.now(), attempts=0, finished_at=None
+        )
+        self.message_user(request, f'{updated}개의 작업이 다시 실행되도록 예약되었습니다.')
+    retry_now.short_description = '선택된 작업을 지금 다시 실행'
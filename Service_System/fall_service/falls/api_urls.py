@@ -1,9 +1,12 @@
 from django.urls import path
 
-from .api_views import FallEventCreateView, FallEventDetailView, FallEventListView
+from .api_views import FallEventChangesView, FallEventCreateView, FallEventDetailView, FallEventListView
+from .stream import fall_event_stream
 
 urlpatterns = [
     path("fall-events/", FallEventCreateView.as_view(), name="fall-event-create"),
     path("fall-events/list/", FallEventListView.as_view(), name="fall-event-list"),
+    path("fall-events/changes/", FallEventChangesView.as_view(), name="fall-event-changes"),
+    path("fall-events/stream/", fall_event_stream, name="fall-event-stream"),
     path("fall-events/<int:pk>/", FallEventDetailView.as_view(), name="fall-event-detail"),
 ]
@@ -1,13 +1,56 @@
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import Q
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
 from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, quote_etag
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.response import Response
-from datetime import timedelta
 
-from .models import Device, FallEvent
+from .images import request_derivatives
+from .jobs import enqueue
+from .models import FallEvent
+from .pagination import FallEventCursorPagination, decode_position, encode_position
 from .serializers import FallEventSerializer
-from .utils import send_fcm_notification
+
+# Changes newer than this are held back one poll, so a save that took its
+# updated_at just before a slower concurrent one committed is not skipped
+SYNC_SETTLE = timedelta(seconds=2)
+
+
+def event_validators(events, extra=""):
+    """
+    ETag and Last-Modified for a list of events, from their (id, updated_at) only,
+    so a conditional GET can be answered before anything is serialized.
+    Last-Modified is only sent for a single event (see FallEventListView.list).
+    """
+    digest = hashlib.sha1(",".join(FallEventSerializer.Meta.fields).encode())  # new fields → new ETags
+    digest.update(extra.encode())
+    for event in events:
+        digest.update(f"{event.id}:{event.updated_at.isoformat()};".encode())
+    last_modified = max((event.updated_at for event in events), default=None)
+    return quote_etag(digest.hexdigest()), int(last_modified.timestamp()) if last_modified else None
+
+
+def not_modified(request, etag, last_modified):
+    """304 response if the client's If-None-Match / If-Modified-Since still matches, else None."""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    return with_validators(response, etag, last_modified) if response is not None else None
+
+
+def with_validators(response, etag, last_modified):
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+    # 캐시해도 되지만 매번 재검증 (변경이 없으면 304)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
 
 
 class FallEventCreateView(generics.CreateAPIView):
@@ -29,26 +72,41 @@ class FallEventCreateView(generics.CreateAPIView):
 
     def create(self, request, *args, **kwargs):
         """Override create to ensure proper context in response"""
+        # Edge가 재전송한 업로드는 idempotency key로 중복 제거
+        idempotency_key = request.data.get("idempotency_key") or request.headers.get("Idempotency-Key")
+        if idempotency_key:
+            existing = FallEvent.objects.filter(idempotency_key=idempotency_key).first()
+            if existing is not None:
+                return self._duplicate_response(existing, request)
+
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
         occurred_at_str = request.data.get("occurred_at")
         occurred_at = parse_datetime(occurred_at_str) if occurred_at_str else None
-        event = serializer.save(occurred_at=occurred_at)
-
-        # Notify all devices (simple version)
-        for device in Device.objects.all():
-            send_fcm_notification(
-                device.token,
-                "Fall detected",
-                f"{event.location}에서 낙상이 감지되었습니다.",
-            )
-        
+        try:
+            event = serializer.save(occurred_at=occurred_at, idempotency_key=idempotency_key or None)
+        except IntegrityError:
+            # 같은 key의 업로드가 동시에 들어와 먼저 저장된 경우
+            existing = FallEvent.objects.filter(idempotency_key=idempotency_key).first()
+            if existing is None:
+                raise
+            return self._duplicate_response(existing, request)
+
+        # 알림은 run_jobs 워커가 보냄: 업로드 응답은 기기 수와 무관하게 바로 반환
+        enqueue("notify_fall", {"event_id": event.id})
+        request_derivatives([event])
+
         # Create response with proper context
         response_serializer = FallEventSerializer(event, context={'request': request})
         headers = self.get_success_headers(response_serializer.data)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
+    def _duplicate_response(self, event, request):
+        """Already-stored event: answer with it again, without creating or notifying."""
+        response_serializer = FallEventSerializer(event, context={'request': request})
+        return Response(response_serializer.data, status=status.HTTP_200_OK)
+
 
 class FallEventListView(generics.ListAPIView):
     """
@@ -58,6 +116,8 @@ class FallEventListView(generics.ListAPIView):
     Query parameters:
     - start_date: ISO 8601 format (e.g., 2025-12-01T00:00:00Z) - 필터링 시작 날짜
     - end_date: ISO 8601 format (e.g., 2025-12-31T23:59:59Z) - 필터링 종료 날짜
+    - page_size: 한 페이지의 이벤트 수 (기본값: FALL_EVENTS_PAGE_SIZE)
+    - cursor: 다음 페이지 위치 (응답의 Link: <...>; rel="next" 헤더에 포함된 URL을 그대로 사용)
     
     Examples:
     - GET /api/fall-events/list/ - 모든 이벤트 조회
@@ -68,6 +128,7 @@ class FallEventListView(generics.ListAPIView):
 
     serializer_class = FallEventSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = FallEventCursorPagination
 
     def get_queryset(self):
         """기간별 필터링이 적용된 queryset 반환"""
@@ -93,8 +154,8 @@ class FallEventListView(generics.ListAPIView):
             except (ValueError, TypeError):
                 pass  # 잘못된 형식은 무시
         
-        # 발생 시간 기준 내림차순 정렬 (최신순)
-        return queryset.order_by("-occurred_at")
+        # 발생 시간 기준 내림차순 정렬 (최신순, 같은 시각은 id로 구분)
+        return queryset.order_by("-occurred_at", "-id")
 
     def get_serializer_context(self):
         """Add request to serializer context for image_url generation"""
@@ -102,6 +163,20 @@ class FallEventListView(generics.ListAPIView):
         context['request'] = self.request
         return context
 
+    def list(self, request, *args, **kwargs):
+        """Conditional GET: the page is fetched, but only serialized when it changed."""
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        # ETag only: a page's newest updated_at (whole seconds) misses same-second edits and
+        # can go back when the newest event is deleted, so If-Modified-Since could give a stale 304
+        etag, _ = event_validators(page, extra=self.paginator.get_next_link() or "")
+        response = not_modified(request, etag, None)
+        if response is not None:
+            return response
+        # 예전에 올라온 이벤트의 축소본은 처음 목록에 나올 때 한 번에 생성 요청
+        request_derivatives(page)
+        serializer = self.get_serializer(page, many=True)
+        return with_validators(self.get_paginated_response(serializer.data), etag, None)
+
 
 class FallEventDetailView(generics.RetrieveAPIView):
     """
@@ -118,3 +193,65 @@ class FallEventDetailView(generics.RetrieveAPIView):
         context = super().get_serializer_context()
         context['request'] = self.request
         return context
+
+    def retrieve(self, request, *args, **kwargs):
+        event = self.get_object()
+        etag, last_modified = event_validators([event])
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        request_derivatives([event])
+        return with_validators(Response(self.get_serializer(event).data), etag, last_modified)
+
+
+class FallEventChangesView(generics.GenericAPIView):
+    """
+    Delta sync: events created or modified (e.g. is_checked) since a sync token.
+    GET /api/fall-events/changes/?since=<token>
+
+    Query parameters:
+    - since: 이전 응답의 next 값. 없으면 이벤트 없이 현재 시점의 토큰만 반환
+    - limit: 한 번에 받을 최대 이벤트 수 (기본값/최대: FALL_EVENTS_MAX_PAGE_SIZE)
+
+    Response:
+        {"events": [...], "next": "<token>", "has_more": false}
+    Store `next` and send it as `since` on the next poll; while has_more is
+    true, ask again right away. Deleted events are not reported.
+    """
+
+    serializer_class = FallEventSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+    def get(self, request, *args, **kwargs):
+        settled = timezone.now() - SYNC_SETTLE
+        queryset = FallEvent.objects.filter(updated_at__lte=settled)
+        since = request.query_params.get("since")
+        if not since:
+            head = queryset.order_by("-updated_at", "-id").only("id", "updated_at").first()
+            if head is None:
+                token = encode_position(datetime(1970, 1, 1, tzinfo=dt_timezone.utc), 0)
+            else:
+                token = encode_position(head.updated_at, head.id)
+            return Response({"events": [], "next": token, "has_more": False})
+
+        try:
+            updated_at, pk = decode_position(since)
+        except ValueError:
+            raise ValidationError({"since": "Invalid sync token"})
+        maximum = getattr(settings, "FALL_EVENTS_MAX_PAGE_SIZE", 200)
+        try:
+            limit = max(1, min(int(request.query_params.get("limit", maximum)), maximum))
+        except ValueError:
+            limit = maximum
+
+        # Same keyset seek as the list cursor, ascending over falls_event_change_idx
+        changed = list(
+            queryset.filter(updated_at__gte=updated_at)
+            .filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk))
+            .order_by("updated_at", "id")[:limit + 1]
+        )
+        has_more = len(changed) > limit
+        changed = changed[:limit]
+        token = encode_position(changed[-1].updated_at, changed[-1].id) if changed else since
+        serializer = self.get_serializer(changed, many=True, context={"request": request})
+        return Response({"events": serializer.data, "next": token, "has_more": has_more})
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FallsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "fall_service.falls"
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects the live stream to FallEvent saves)
@@ -0,0 +1,75 @@
+"""
+Smaller copies of uploaded fall images.
+
+The edge uploads a full-size JPEG; lists only need a thumbnail. After an
+upload (or the first time an older event is listed) a make_derivatives job
+writes, next to falls/, in falls/derived/:
+
+    <name>_thumb.jpg    THUMBNAIL_SIZE px on the long side   (list rows, admin)
+    <name>_medium.jpg   MEDIUM_SIZE px on the long side      (detail views)
+    <name>.webp         full size WebP                       (same image, smaller file)
+
+Until they exist the serializer falls back to the original image.
+"""
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .jobs import enqueue
+
+THUMBNAIL_SIZE = 320
+MEDIUM_SIZE = 1280
+
+# field -> (file suffix, long side or None for full size, Pillow format, save options)
+DERIVATIVES = {
+    "thumbnail": ("_thumb.jpg", THUMBNAIL_SIZE, "JPEG", {"quality": 80, "optimize": True}),
+    "medium": ("_medium.jpg", MEDIUM_SIZE, "JPEG", {"quality": 85, "optimize": True}),
+    "image_webp": (".webp", None, "WEBP", {"quality": 80, "method": 4}),
+}
+
+# Events this process already asked a worker for (the job itself skips finished events)
+_requested = set()
+
+
+def has_derivatives(event):
+    return all(getattr(event, field) for field in DERIVATIVES)
+
+
+def request_derivatives(events):
+    """
+    Queue one job for every event in `events` that has no derivatives yet
+    (each event at most once per process). Called by views, never while serializing.
+    """
+    missing = [e.pk for e in events if e.image and not has_derivatives(e) and e.pk not in _requested]
+    if not missing:
+        return
+    _requested.update(missing)
+    enqueue("make_derivatives", {"event_ids": missing})
+
+
+def make_derivatives(event):
+    """Write every missing derivative of event.image and save the event. Returns the fields written."""
+    missing = [field for field in DERIVATIVES if not getattr(event, field)]
+    if not missing or not event.image or not event.image.storage.exists(event.image.name):
+        return []  # nothing to do, or the original is gone (retrying will not bring it back)
+    stem = os.path.splitext(os.path.basename(event.image.name))[0]
+
+    with event.image.open("rb") as f:
+        original = Image.open(f)
+        original = ImageOps.exif_transpose(original).convert("RGB")  # decode once for all sizes
+
+    for field in missing:
+        suffix, size, image_format, options = DERIVATIVES[field]
+        image = original
+        if size is not None and max(original.size) > size:
+            image = original.copy()
+            image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        image.save(buffer, image_format, **options)
+        getattr(event, field).save(f"{stem}{suffix}", ContentFile(buffer.getvalue()), save=False)
+
+    # updated_at changes too, so delta sync, ETags and the live stream pick up the new URLs
+    event.save(update_fields=missing + ["updated_at"])
+    return missing
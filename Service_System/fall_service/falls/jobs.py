@@ -0,0 +1,145 @@
+"""
+DB-backed background jobs.
+
+Request handlers call enqueue() (one INSERT) and return; `python manage.py
+run_jobs` claims due jobs and runs the handler registered for their kind.
+A job that raises is retried with exponential backoff until max_attempts,
+then left as failed with its last error for the admin.
+"""
+import traceback
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import BackgroundJob, Device, FallEvent
+from .utils import send_fcm_multicast
+
+HANDLERS = {}
+
+# A running job whose worker died is picked up again after this long
+STALE_AFTER = timedelta(minutes=10)
+
+
+class RetryJob(Exception):
+    """Raised by a handler to retry later with a narrowed payload (e.g. only the tokens that failed)."""
+
+    def __init__(self, message, payload=None):
+        super().__init__(message)
+        self.payload = payload
+
+
+def job(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, payload=None, delay=None):
+    """Queue a job once the current transaction commits (immediately outside a transaction)."""
+    run_after = timezone.now() + (delay or timedelta())
+
+    def create():
+        BackgroundJob.objects.create(kind=kind, payload=payload or {}, run_after=run_after)
+
+    transaction.on_commit(create)
+
+
+def claim_jobs(limit=10):
+    """
+    Mark up to `limit` due jobs as running and return them.
+    The conditional UPDATE makes the claim safe with several workers, also on SQLite.
+    """
+    now = timezone.now()
+    due = (
+        BackgroundJob.objects.filter(
+            Q(status=BackgroundJob.PENDING, run_after__lte=now)
+            | Q(status=BackgroundJob.RUNNING, locked_at__lt=now - STALE_AFTER)
+        )
+        .order_by("run_after", "id")
+        .values_list("id", "status")[:limit]
+    )
+    claimed = []
+    for job_id, status in due:
+        if BackgroundJob.objects.filter(id=job_id, status=status).update(status=BackgroundJob.RUNNING, locked_at=now):
+            claimed.append(job_id)
+    return list(BackgroundJob.objects.filter(id__in=claimed).order_by("run_after", "id"))
+
+
+def backoff(attempts, base=5, cap=3600):
+    """Seconds before retry number `attempts`: 5, 10, 20, ... capped at an hour."""
+    return min(cap, base * 2 ** (attempts - 1))
+
+
+def run_job(job):
+    """Run one claimed job and store the outcome. Returns the new status."""
+    job.attempts += 1
+    handler = HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler for job kind {job.kind!r}")
+        handler(job.payload)
+    except Exception as e:
+        if isinstance(e, RetryJob) and e.payload is not None:
+            job.payload = e.payload
+        job.last_error = "".join(traceback.format_exception_only(type(e), e)).strip()
+        if handler is not None and job.attempts < job.max_attempts:
+            job.status = BackgroundJob.PENDING
+            job.run_after = timezone.now() + timedelta(seconds=backoff(job.attempts))
+        else:
+            job.status = BackgroundJob.FAILED
+            job.finished_at = timezone.now()
+    else:
+        job.status = BackgroundJob.DONE
+        job.finished_at = timezone.now()
+    job.locked_at = None
+    job.save(update_fields=["payload", "status", "attempts", "run_after", "locked_at", "last_error", "finished_at"])
+    return job.status
+
+
+@job("notify_fall")
+def notify_fall(payload):
+    """
+    Push a fall event to every registered device.
+    payload: {"event_id": ..., "tokens": [...] (only set on retries)}
+    """
+    event = FallEvent.objects.filter(id=payload["event_id"]).first()
+    if event is None:
+        return  # deleted before the notification went out
+    tokens = payload.get("tokens")
+    if tokens is None:
+        tokens = list(Device.objects.values_list("token", flat=True))
+    if not tokens:
+        return
+
+    sent, invalid, retry = send_fcm_multicast(
+        tokens,
+        "Fall detected",
+        f"{event.location}에서 낙상이 감지되었습니다.",
+        data={"event_id": str(event.id)},
+    )
+    if invalid:
+        # 더 이상 유효하지 않은 토큰의 기기는 삭제
+        Device.objects.filter(token__in=invalid).delete()
+    if retry:
+        raise RetryJob(f"{len(retry)} of {len(tokens)} token(s) temporarily unavailable",
+                       payload={"event_id": event.id, "tokens": retry})
+
+
+@job("make_derivatives")
+def make_event_derivatives(payload):
+    """Thumbnail / medium / WebP copies of uploaded images. payload: {"event_ids": [...]}"""
+    from .images import make_derivatives  # images imports enqueue from here
+
+    errors = {}
+    for event in FallEvent.objects.filter(id__in=payload["event_ids"]):
+        try:
+            make_derivatives(event)
+        except Exception as e:
+            # One unreadable image must not hold back the rest of the batch
+            errors[event.id] = f"{type(e).__name__}: {e}"
+    if errors:
+        details = "; ".join(f"event {event_id}: {error}" for event_id, error in errors.items())
+        raise RetryJob(f"{len(errors)} event(s) failed: {details}", payload={"event_ids": list(errors)})
@@ -86,13 +86,15 @@ class Command(BaseCommand):
             # 이미지 파일도 함께 삭제하기 위해 먼저 파일 경로 저장
             deleted_files = []
             for event in old_events:
-                if event.image:
-                    try:
-                        file_path = event.image.path
-                        if os.path.exists(file_path):
-                            deleted_files.append(file_path)
-                    except:
-                        pass
+                # 원본과 축소본(thumbnail, medium, webp)
+                for image in (event.image, event.thumbnail, event.medium, event.image_webp):
+                    if image:
+                        try:
+                            file_path = image.path
+                            if os.path.exists(file_path):
+                                deleted_files.append(file_path)
+                        except:
+                            pass
             
             # 데이터베이스에서 이벤트 삭제
             deleted_count = old_events.delete()[0]
@@ -0,0 +1,97 @@
+"""
+백그라운드 작업(BackgroundJob)을 처리하는 워커
+
+낙상 알림(FCM) 전송처럼 업로드 요청 안에서 하기엔 느린 작업을 처리합니다.
+서버와 함께 계속 실행해 두세요. 여러 개를 동시에 실행해도 같은 작업을 두 번 처리하지 않습니다.
+
+사용법:
+    python manage.py run_jobs
+
+옵션:
+    --once: 지금 처리할 수 있는 작업만 처리하고 종료
+    --interval: 할 일이 없을 때 다음 확인까지 대기 시간 (초, 기본값: 1)
+    --batch: 한 번에 가져오는 작업 수 (기본값: 10)
+    --keep-days: 완료된 작업 기록 보관 기간 (일, 기본값: 7)
+
+예시:
+    python manage.py run_jobs
+    python manage.py run_jobs --once
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from fall_service.falls.jobs import claim_jobs, run_job
+from fall_service.falls.models import BackgroundJob
+
+
+class Command(BaseCommand):
+    help = '백그라운드 작업(알림 전송 등)을 처리합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='대기 중인 작업을 한 번 처리하고 종료합니다.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='할 일이 없을 때 다음 확인까지 대기 시간 (초, 기본값: 1)',
+        )
+        parser.add_argument(
+            '--batch',
+            type=int,
+            default=10,
+            help='한 번에 가져오는 작업 수 (기본값: 10)',
+        )
+        parser.add_argument(
+            '--keep-days',
+            type=int,
+            default=7,
+            help='완료된 작업 기록 보관 기간 (일 수, 기본값: 7)',
+        )
+
+    def handle(self, *args, **options):
+        once = options['once']
+        interval = options['interval']
+        batch = options['batch']
+        keep = timedelta(days=options['keep_days'])
+
+        self.stdout.write(self.style.SUCCESS('작업 워커 시작'))
+        last_purge = 0.0
+        try:
+            while True:
+                jobs = claim_jobs(batch)
+                for job in jobs:
+                    started = time.perf_counter()
+                    status = run_job(job)
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    if status == BackgroundJob.DONE:
+                        self.stdout.write(f'  {job.kind} #{job.id} 완료 ({elapsed_ms:.0f}ms)')
+                    elif status == BackgroundJob.PENDING:
+                        self.stdout.write(self.style.WARNING(
+                            f'  {job.kind} #{job.id} 재시도 예정 ({job.attempts}/{job.max_attempts}): {job.last_error}'
+                        ))
+                    else:
+                        self.stdout.write(self.style.ERROR(
+                            f'  {job.kind} #{job.id} 실패: {job.last_error}'
+                        ))
+
+                if time.monotonic() - last_purge > 3600:
+                    # 오래된 완료 작업 기록 정리 (실패한 작업은 관리자 확인용으로 남김)
+                    BackgroundJob.objects.filter(
+                        status=BackgroundJob.DONE, finished_at__lt=timezone.now() - keep
+                    ).delete()
+                    last_purge = time.monotonic()
+
+                if once and len(jobs) < batch:
+                    break
+                if len(jobs) < batch:
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS('작업 워커 종료'))
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.9 on 2026-10-17 22:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("falls", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fallevent",
+            name="idempotency_key",
+            field=models.CharField(
+                blank=True,
+                help_text="Edge-generated key used to drop duplicate uploads",
+                max_length=64,
+                null=True,
+                unique=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.9 on 2026-10-17 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("falls", "0003_backgroundjob"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="fallevent",
+            index=models.Index(
+                fields=["occurred_at", "id"], name="falls_event_time_idx"
+            ),
+        ),
+    ]
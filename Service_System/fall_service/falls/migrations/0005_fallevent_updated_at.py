@@ -0,0 +1,35 @@
+# Generated by Django 5.2.9 on 2026-10-18 00:21
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def copy_created_at(apps, schema_editor):
+    # Existing events have not changed since they were created
+    FallEvent = apps.get_model("falls", "FallEvent")
+    FallEvent.objects.update(updated_at=models.F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("falls", "0004_fallevent_falls_event_time_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fallevent",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="fallevent",
+            index=models.Index(
+                fields=["updated_at", "id"], name="falls_event_change_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.9 on 2026-10-18 00:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("falls", "0005_fallevent_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fallevent",
+            name="image_webp",
+            field=models.ImageField(blank=True, upload_to="falls/derived/"),
+        ),
+        migrations.AddField(
+            model_name="fallevent",
+            name="medium",
+            field=models.ImageField(blank=True, upload_to="falls/derived/"),
+        ),
+        migrations.AddField(
+            model_name="fallevent",
+            name="thumbnail",
+            field=models.ImageField(blank=True, upload_to="falls/derived/"),
+        ),
+    ]
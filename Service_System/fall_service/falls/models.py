@@ -1,5 +1,6 @@
 from django.contrib.auth.models import User
 from django.db import models
+from django.utils import timezone
 
 
 class FallEvent(models.Model):
@@ -11,11 +12,31 @@ class FallEvent(models.Model):
         help_text="User who will receive notification (optional)",
     )
     image = models.ImageField(upload_to="falls/")
+    # Generated from image by a make_derivatives job (see images.py)
+    thumbnail = models.ImageField(upload_to="falls/derived/", blank=True)
+    medium = models.ImageField(upload_to="falls/derived/", blank=True)
+    image_webp = models.ImageField(upload_to="falls/derived/", blank=True)
     location = models.CharField(max_length=100, default="living_room")
     description = models.TextField(blank=True)
     occurred_at = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     is_checked = models.BooleanField(default=False)
+    idempotency_key = models.CharField(
+        max_length=64,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text="Edge-generated key used to drop duplicate uploads",
+    )
+
+    class Meta:
+        # Serves the list ordering (-occurred_at, -id), its cursor and the date range filters
+        indexes = [
+            models.Index(fields=["occurred_at", "id"], name="falls_event_time_idx"),
+            # Delta sync: everything changed after a (updated_at, id) token
+            models.Index(fields=["updated_at", "id"], name="falls_event_change_idx"),
+        ]
 
     def __str__(self):
         return f"{self.location} - {self.occurred_at}"
@@ -28,3 +49,35 @@ class Device(models.Model):
 
     def __str__(self):
         return f"{self.user.username} - {self.token[:8]}"
+
+
+class BackgroundJob(models.Model):
+    """Work done outside the request by `manage.py run_jobs` (see jobs.py)."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_after"], name="falls_job_due_idx")]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
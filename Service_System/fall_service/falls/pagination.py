@@ -0,0 +1,98 @@
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+def encode_position(moment, pk):
+    """Opaque token for a (datetime, id) position; used by the list cursor and the sync token."""
+    raw = f"{moment.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_position(token):
+    """(datetime, id) from encode_position(); ValueError if the token is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        moment, pk = raw.rsplit("|", 1)
+        return datetime.fromisoformat(moment), int(pk)
+    except UnicodeDecodeError as e:
+        raise ValueError(str(e))
+
+
+class FallEventCursorPagination(BasePagination):
+    """
+    Keyset pagination over (occurred_at, id), newest first.
+
+    A page is "the next page_size rows after this (occurred_at, id)", answered
+    from the falls_event_time_idx index, so every page costs the same however
+    much history is kept (unlike OFFSET, which reads and skips all earlier rows).
+
+    The body stays a plain JSON list, as the Android client expects; the next
+    page is in the Link header:
+        Link: <.../api/fall-events/list/?cursor=...>; rel="next"
+
+    Query parameters:
+    - cursor: opaque value taken from the Link header
+    - page_size: rows per page (default FALL_EVENTS_PAGE_SIZE, at most FALL_EVENTS_MAX_PAGE_SIZE)
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by("-occurred_at", "-id")
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            occurred_at, pk = self.decode_cursor(cursor)
+            # The redundant occurred_at <= bound lets the database seek into the index
+            # instead of walking it from the newest row and filtering the OR
+            queryset = queryset.filter(occurred_at__lte=occurred_at).filter(
+                Q(occurred_at__lt=occurred_at) | Q(occurred_at=occurred_at, id__lt=pk)
+            )
+
+        # One extra row tells whether there is a next page without a COUNT query
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        page = rows[:self.page_size]
+        self.last = page[-1] if page else None
+        return page
+
+    def get_page_size(self, request):
+        default = getattr(settings, "FALL_EVENTS_PAGE_SIZE", 50)
+        maximum = getattr(settings, "FALL_EVENTS_MAX_PAGE_SIZE", 200)
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, default))
+        except (TypeError, ValueError):
+            size = default
+        return max(1, min(size, maximum))
+
+    @staticmethod
+    def encode_cursor(event):
+        return encode_position(event.occurred_at, event.id)
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            return decode_position(cursor)
+        except ValueError:
+            raise NotFound("Invalid cursor")
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        params = self.request.query_params.copy()
+        params[self.cursor_query_param] = self.encode_cursor(self.last)
+        return self.request.build_absolute_uri(f"{self.request.path}?{params.urlencode()}")
+
+    def get_paginated_response(self, data):
+        next_link = self.get_next_link()
+        headers = {"Link": f'<{next_link}>; rel="next"'} if next_link else {}
+        return Response(data, headers=headers)
@@ -5,6 +5,10 @@ from .models import FallEvent
 
 class FallEventSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    # 축소본 (백그라운드 작업이 만들기 전까지는 원본 URL)
+    thumbnail_url = serializers.SerializerMethodField()
+    medium_url = serializers.SerializerMethodField()
+    webp_url = serializers.SerializerMethodField()
     # image 필드를 명시적으로 추가해야 업로드된 파일이 저장됩니다
     image = serializers.ImageField(write_only=True, required=True)
 
@@ -14,21 +18,37 @@ class FallEventSerializer(serializers.ModelSerializer):
             "id",
             "image",  # 쓰기 전용 (write_only=True)
             "image_url",  # 읽기 전용 (SerializerMethodField)
+            "thumbnail_url",
+            "medium_url",
+            "webp_url",
             "location",
             "description",
             "occurred_at",
             "created_at",
+            "updated_at",
             "is_checked",
         ]
-        read_only_fields = ["id", "created_at", "is_checked"]
+        read_only_fields = ["id", "created_at", "updated_at", "is_checked"]
 
     def get_image_url(self, obj):
         """읽기 전용: 이미지 URL 반환"""
-        if obj.image:
+        return self._file_url(obj.image)
+
+    def get_thumbnail_url(self, obj):
+        return self._file_url(obj.thumbnail or obj.image)
+
+    def get_medium_url(self, obj):
+        return self._file_url(obj.medium or obj.image)
+
+    def get_webp_url(self, obj):
+        return self._file_url(obj.image_webp)
+
+    def _file_url(self, file):
+        if file:
             request = self.context.get("request")
             if request:
-                return request.build_absolute_uri(obj.image.url)
+                return request.build_absolute_uri(file.url)
             else:
                 # Fallback: return relative URL if no request context
-                return obj.image.url
+                return file.url
         return None
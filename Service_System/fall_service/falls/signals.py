@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import FallEvent
+from .stream import hub, message_for
+
+
+@receiver(post_save, sender=FallEvent)
+def push_fall_event(sender, instance, created, **kwargs):
+    """Send saved events to the live stream once the transaction commits."""
+    if not hub.subscribers:
+        return  # nobody listening: skip the serialization
+    event_type = "created" if created else "updated"
+    transaction.on_commit(lambda: hub.publish(message_for(instance, event_type)))
@@ -0,0 +1,194 @@
+"""
+Server-Sent Events feed of fall events.
+
+    GET /api/fall-events/stream/          (EventSource / text/event-stream)
+
+Every new FallEvent is sent as an `created` event and every later change
+(e.g. is_checked) as `updated`; `data` is the same JSON as the REST API.
+The SSE id is the delta sync token of /api/fall-events/changes/, so a
+client that reconnects with Last-Event-ID (EventSource does this by itself)
+first gets everything it missed from the database, then the live feed.
+
+Saves are fanned out by an in-process BroadcastHub: each connection is an
+asyncio queue, not a thread, so thousands of idle connections cost only
+memory and a heartbeat comment every HEARTBEAT_SECONDS. A connection that
+falls QUEUE_SIZE messages behind is closed and resumes on reconnect.
+
+Needs an ASGI server, e.g. `uvicorn fall_service.asgi:application`; the
+hub only sees saves made in its own process.
+"""
+import asyncio
+import json
+import threading
+from dataclasses import dataclass, field
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Q
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed, StreamingHttpResponse
+
+from .models import FallEvent
+from .pagination import decode_position, encode_position
+from .serializers import FallEventSerializer
+
+HEARTBEAT_SECONDS = 15
+QUEUE_SIZE = 100
+RETRY_MS = 3000  # EventSource reconnect delay
+BACKLOG_LIMIT = 1000  # events replayed on resume; a client further behind should reload the list
+
+
+@dataclass
+class FeedMessage:
+    event_type: str  # "created" or "updated"
+    token: str
+    payload: dict
+    _frames: dict = field(default_factory=dict, repr=False)
+
+    def frame(self, base_url):
+        """SSE frame with the *_url fields made absolute for base_url, encoded once per host."""
+        frame = self._frames.get(base_url)
+        if frame is None:
+            payload = dict(self.payload)
+            for key, value in payload.items():
+                if key.endswith("_url") and isinstance(value, str) and value.startswith("/"):
+                    payload[key] = base_url + value
+            data = json.dumps(payload, ensure_ascii=False)
+            frame = f"id: {self.token}\nevent: {self.event_type}\ndata: {data}\n\n"
+            self._frames[base_url] = frame
+        return frame
+
+
+def message_for(event, event_type):
+    # No request here: the *_url fields come out relative and frame() completes them per connection
+    return FeedMessage(event_type, encode_position(event.updated_at, event.id), dict(FallEventSerializer(event).data))
+
+
+class Subscription:
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+
+    def put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Too far behind: drop what is queued and tell the stream to close
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class BroadcastHub:
+    """Fans messages out to every subscribed connection. publish() may be called from any thread."""
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self.published = 0
+
+    @property
+    def subscribers(self):
+        return len(self._subscriptions)
+
+    def subscribe(self):
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, message):
+        with self._lock:
+            by_loop = {}
+            for subscription in self._subscriptions:
+                by_loop.setdefault(subscription.loop, []).append(subscription)
+        self.published += 1
+        # One wake-up per event loop, not per connection
+        for loop, subscriptions in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_deliver, subscriptions, message)
+            except RuntimeError:
+                pass  # loop already closed
+
+
+def _deliver(subscriptions, message):
+    for subscription in subscriptions:
+        subscription.put(message)
+
+
+hub = BroadcastHub()
+
+
+def publish_events(events, event_type="updated"):
+    """Push saved events to the feed (for bulk update() calls, which send no post_save)."""
+    if not hub.subscribers:
+        return
+    for event in events:
+        hub.publish(message_for(event, event_type))
+
+
+def missed_messages(position):
+    """Events changed after a Last-Event-ID position, oldest first (same keyset as the changes endpoint)."""
+    updated_at, pk = position
+    events = (
+        FallEvent.objects.filter(updated_at__gte=updated_at)
+        .filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk))
+        .order_by("updated_at", "id")[:BACKLOG_LIMIT]
+    )
+    # Created after the client's last message → it has never seen it
+    return [message_for(event, "created" if event.created_at > updated_at else "updated") for event in events]
+
+
+async def _event_stream(base_url, position):
+    subscription = hub.subscribe()  # before reading the backlog, so nothing falls in between
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        replayed = set()
+        if position is not None:
+            for message in await sync_to_async(missed_messages)(position):
+                replayed.add((message.token, message.event_type))
+                yield message.frame(base_url)
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if message is None:
+                break  # fell behind; the client reconnects with Last-Event-ID
+            if (message.token, message.event_type) in replayed:
+                continue
+            yield message.frame(base_url)
+    finally:
+        hub.unsubscribe(subscription)
+
+
+async def fall_event_stream(request):
+    """
+    Live fall events.
+    GET /api/fall-events/stream/
+
+    Resume: Last-Event-ID header (sent by EventSource on reconnect) or
+    ?last_event_id=<id of the last message, or a `next` token from /changes/>.
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse("The event stream needs an ASGI server (fall_service.asgi).", status=501)
+
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    position = None
+    if last_event_id:
+        try:
+            position = decode_position(last_event_id)
+        except ValueError:
+            return HttpResponseBadRequest("Invalid Last-Event-ID")
+
+    base_url = request.build_absolute_uri("/").rstrip("/")
+    response = StreamingHttpResponse(_event_stream(base_url, position), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: do not buffer the stream
+    return response
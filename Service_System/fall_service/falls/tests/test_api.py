@@ -0,0 +1,210 @@
+import re
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from fall_service.falls.api_views import SYNC_SETTLE
+from fall_service.falls.models import BackgroundJob, FallEvent
+from fall_service.falls.pagination import encode_position
+
+from .helpers import TempMediaMixin, jpeg_upload
+
+LINK = re.compile(r'^<(?P<url>[^>]+)>; rel="next"$')
+
+
+def make_event(occurred_at, **fields):
+    # Only the file name matters here: nothing reads the image
+    return FallEvent.objects.create(image="falls/test.jpg", occurred_at=occurred_at, **fields)
+
+
+class ListCursorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        base = datetime(2026, 10, 1, 12, 0, tzinfo=dt_timezone.utc)
+        cls.events = [make_event(base + timedelta(minutes=m)) for m in (0, 5, 5, 5, 10, 20, 20)]
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def expected_ids(self):
+        ordered = sorted(self.events, key=lambda e: (e.occurred_at, e.id), reverse=True)
+        return [event.id for event in ordered]
+
+    def next_url(self, response):
+        link = response.headers.get("Link")
+        if link is None:
+            return None
+        match = LINK.match(link)
+        self.assertIsNotNone(match, link)
+        return match["url"]
+
+    def test_pages_follow_occurred_at_then_id_across_ties(self):
+        seen = []
+        url = "/api/fall-events/list/?page_size=2"
+        pages = 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data), 2)
+            seen.extend(item["id"] for item in response.data)
+            url = self.next_url(response)
+            pages += 1
+        # Page boundaries fall inside the groups of equal occurred_at; nothing is skipped or repeated
+        self.assertEqual(seen, self.expected_ids())
+        self.assertEqual(pages, 4)
+
+    def test_link_header_keeps_query_and_is_absent_on_last_page(self):
+        response = self.client.get("/api/fall-events/list/?page_size=5")
+        url = self.next_url(response)
+        self.assertTrue(url.startswith("http://testserver/api/fall-events/list/?"))
+        self.assertIn("page_size=5", url)
+        self.assertIn("cursor=", url)
+
+        last = self.client.get(url)
+        self.assertEqual(len(last.data), 2)
+        self.assertNotIn("Link", last.headers)
+
+    def test_page_size_is_capped(self):
+        with self.settings(FALL_EVENTS_MAX_PAGE_SIZE=3):
+            response = self.client.get("/api/fall-events/list/?page_size=1000")
+        self.assertEqual(len(response.data), 3)
+
+    def test_invalid_cursor_is_not_found(self):
+        for cursor in ("not-a-cursor", "%%%", encode_position(timezone.now(), 1)[:-3]):
+            response = self.client.get("/api/fall-events/list/", {"cursor": cursor})
+            self.assertEqual(response.status_code, 404, cursor)
+
+    def test_if_none_match_gives_304_until_the_page_changes(self):
+        first = self.client.get("/api/fall-events/list/")
+        etag = first.headers["ETag"]
+
+        cached = self.client.get("/api/fall-events/list/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b"")
+        self.assertEqual(cached.headers["ETag"], etag)
+
+        event = self.events[0]
+        event.is_checked = True
+        event.save()
+        changed = self.client.get("/api/fall-events/list/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["ETag"], etag)
+
+    def test_list_is_validated_by_etag_only(self):
+        first = self.client.get("/api/fall-events/list/")
+        self.assertNotIn("Last-Modified", first.headers)
+
+        # Deleting the newest event lowers the newest updated_at; the page must still come back
+        newest = max(self.events, key=lambda e: e.updated_at)
+        since = self.client.get(f"/api/fall-events/{newest.id}/").headers["Last-Modified"]
+        FallEvent.objects.filter(id=newest.id).delete()
+        response = self.client.get("/api/fall-events/list/", HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), len(self.events) - 1)
+
+    def test_detail_if_none_match(self):
+        url = f"/api/fall-events/{self.events[0].id}/"
+        etag = self.client.get(url).headers["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+class ChangesTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.settled = timezone.now() - SYNC_SETTLE - timedelta(seconds=10)
+
+    def event_at(self, updated_at):
+        event = make_event(timezone.now())
+        # updated_at is auto_now: set it directly to place the change in time
+        FallEvent.objects.filter(id=event.id).update(updated_at=updated_at)
+        event.refresh_from_db()
+        return event
+
+    def changes(self, **params):
+        response = self.client.get("/api/fall-events/changes/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_first_poll_returns_only_a_token(self):
+        event = self.event_at(self.settled)
+        data = self.changes()
+        self.assertEqual(data["events"], [])
+        self.assertEqual(data["next"], encode_position(event.updated_at, event.id))
+
+    def test_changes_after_token_in_order_with_ties(self):
+        start = self.changes()["next"]
+        events = [self.event_at(self.settled) for _ in range(3)] + [self.event_at(self.settled + timedelta(seconds=1))]
+
+        data = self.changes(since=start, limit=2)
+        self.assertEqual([e["id"] for e in data["events"]], [events[0].id, events[1].id])
+        self.assertTrue(data["has_more"])
+        data = self.changes(since=data["next"], limit=2)
+        self.assertEqual([e["id"] for e in data["events"]], [events[2].id, events[3].id])
+        self.assertFalse(data["has_more"])
+
+        # Nothing new: the same token comes back
+        again = self.changes(since=data["next"])
+        self.assertEqual(again["events"], [])
+        self.assertEqual(again["next"], data["next"])
+
+    def test_recent_changes_wait_for_the_settle_window(self):
+        start = self.changes()["next"]
+        fresh = self.event_at(timezone.now())
+        data = self.changes(since=start)
+        self.assertEqual(data["events"], [])
+        self.assertEqual(data["next"], start)
+
+        # Once older than SYNC_SETTLE it is reported from the same token
+        FallEvent.objects.filter(id=fresh.id).update(updated_at=timezone.now() - SYNC_SETTLE - timedelta(seconds=1))
+        data = self.changes(since=start)
+        self.assertEqual([e["id"] for e in data["events"]], [fresh.id])
+
+    def test_modified_event_is_reported_again(self):
+        event = self.event_at(self.settled)
+        token = self.changes(since=self.changes()["next"])["next"]
+        FallEvent.objects.filter(id=event.id).update(is_checked=True, updated_at=self.settled + timedelta(seconds=5))
+        data = self.changes(since=token)
+        self.assertEqual([(e["id"], e["is_checked"]) for e in data["events"]], [(event.id, True)])
+
+    def test_invalid_since_is_bad_request(self):
+        response = self.client.get("/api/fall-events/changes/", {"since": "not-a-token"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("since", response.data)
+
+
+class UploadIdempotencyTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def upload(self, **extra):
+        data = {"image": jpeg_upload(), "location": "room1", "occurred_at": "2026-10-17T10:00:00Z"}
+        data.update(extra.pop("data", {}))
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post("/api/fall-events/", data, format="multipart", **extra)
+
+    def test_same_key_header_stores_one_event(self):
+        first = self.upload(HTTP_IDEMPOTENCY_KEY="edge-key-1")
+        second = self.upload(HTTP_IDEMPOTENCY_KEY="edge-key-1")
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data["id"], first.data["id"])
+        self.assertEqual(FallEvent.objects.count(), 1)
+        self.assertEqual(FallEvent.objects.get().idempotency_key, "edge-key-1")
+        # The retry does not notify again
+        self.assertEqual(BackgroundJob.objects.filter(kind="notify_fall").count(), 1)
+
+    def test_key_in_form_field(self):
+        first = self.upload(data={"idempotency_key": "edge-key-2"})
+        second = self.upload(data={"idempotency_key": "edge-key-2"})
+        self.assertEqual((first.status_code, second.status_code), (201, 200))
+        self.assertEqual(second.data["id"], first.data["id"])
+
+    def test_different_or_missing_keys_are_separate_events(self):
+        self.upload(HTTP_IDEMPOTENCY_KEY="edge-key-3")
+        self.upload(HTTP_IDEMPOTENCY_KEY="edge-key-4")
+        self.upload()
+        self.upload()
+        self.assertEqual(FallEvent.objects.count(), 4)
@@ -0,0 +1,75 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from fall_service.falls import images
+from fall_service.falls.jobs import claim_jobs, run_job
+from fall_service.falls.models import BackgroundJob, FallEvent
+
+from .helpers import TempMediaMixin, jpeg_upload
+
+
+class DerivativeTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        images._requested.clear()
+        self.client = APIClient()
+
+    def upload(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/fall-events/",
+                {"image": jpeg_upload(size=(1600, 1200)), "location": "room1", "occurred_at": "2026-10-17T10:00:00Z"},
+                format="multipart",
+            )
+        self.assertEqual(response.status_code, 201)
+        return response
+
+    def test_upload_queues_derivatives_once(self):
+        self.upload()
+        kinds = sorted(BackgroundJob.objects.values_list("kind", flat=True))
+        self.assertEqual(kinds, ["make_derivatives", "notify_fall"])
+
+    def test_job_writes_derivatives_and_urls_follow(self):
+        event_id = self.upload().data["id"]
+        for job in claim_jobs():
+            self.assertEqual(run_job(job), BackgroundJob.DONE)
+
+        event = FallEvent.objects.get(id=event_id)
+        self.assertEqual(max(event.thumbnail.width, event.thumbnail.height), images.THUMBNAIL_SIZE)
+        self.assertEqual(max(event.medium.width, event.medium.height), images.MEDIUM_SIZE)
+        self.assertTrue(event.image_webp.name.endswith(".webp"))
+        data = self.client.get(f"/api/fall-events/{event_id}/").data
+        self.assertTrue(data["thumbnail_url"].endswith("_thumb.jpg"))
+        self.assertTrue(data["webp_url"].endswith(".webp"))
+
+    def test_list_backfills_old_events_in_one_job(self):
+        for _ in range(3):
+            FallEvent.objects.create(image=jpeg_upload(), location="room1", occurred_at=timezone.now())
+        with self.captureOnCommitCallbacks(execute=True):
+            data = self.client.get("/api/fall-events/list/").data
+        # Not generated yet: the original stands in
+        self.assertEqual(data[0]["thumbnail_url"], data[0]["image_url"])
+        jobs = list(BackgroundJob.objects.all())
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(len(jobs[0].payload["event_ids"]), 3)
+
+        # Serializing again (e.g. the live stream) never queues anything
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get("/api/fall-events/list/")
+        self.assertEqual(BackgroundJob.objects.count(), 1)
+
+    def test_broken_image_is_retried_alone(self):
+        good = FallEvent.objects.create(image=jpeg_upload(), location="room1", occurred_at=timezone.now())
+        broken = FallEvent.objects.create(
+            image=SimpleUploadedFile("broken.jpg", b"not a jpeg", content_type="image/jpeg"),
+            location="room1",
+            occurred_at=timezone.now(),
+        )
+        job = BackgroundJob.objects.create(kind="make_derivatives", payload={"event_ids": [broken.id, good.id]})
+
+        self.assertEqual(run_job(claim_jobs()[0]), BackgroundJob.PENDING)
+        self.assertTrue(images.has_derivatives(FallEvent.objects.get(id=good.id)))
+        job.refresh_from_db()
+        self.assertEqual(job.payload, {"event_ids": [broken.id]})
+        self.assertIn(f"event {broken.id}: UnidentifiedImageError", job.last_error)
@@ -0,0 +1,202 @@
+from datetime import timedelta
+from unittest import mock
+
+import requests
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from fall_service.falls import utils
+from fall_service.falls.jobs import HANDLERS, STALE_AFTER, RetryJob, backoff, claim_jobs, enqueue, run_job
+from fall_service.falls.models import BackgroundJob, Device, FallEvent
+
+from .helpers import TempMediaMixin, jpeg_upload
+
+
+class StubResponse:
+    def __init__(self, status_code=200, body=None, headers=None):
+        self.status_code = status_code
+        self._body = body or {}
+        self.headers = headers or {}
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+
+class StubFcm:
+    """
+    Stands in for the pooled FCM session. Each registration_id is answered
+    with the error listed in `errors` (success otherwise); `fail_batches`
+    answers that many requests with a connection error first.
+    """
+
+    def __init__(self, errors=None, fail_batches=0):
+        self.errors = errors or {}
+        self.fail_batches = fail_batches
+        self.requests = []
+
+    def post(self, url, json=None, timeout=None):
+        self.requests.append(json)
+        if self.fail_batches:
+            self.fail_batches -= 1
+            raise requests.ConnectionError("stub connection error")
+        results = []
+        for token in json["registration_ids"]:
+            error = self.errors.get(token)
+            results.append({"error": error} if error else {"message_id": f"msg-{token}"})
+        return StubResponse(body={"results": results})
+
+
+class JobQueueTests(TestCase):
+    def make_job(self, **fields):
+        fields.setdefault("kind", "test")
+        return BackgroundJob.objects.create(**fields)
+
+    def test_enqueue_waits_for_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            enqueue("test", {"n": 1})
+            self.assertFalse(BackgroundJob.objects.exists())
+        for callback in callbacks:
+            callback()
+        self.assertEqual(BackgroundJob.objects.get().payload, {"n": 1})
+
+    def test_claim_takes_due_and_stale_jobs_once(self):
+        now = timezone.now()
+        due = self.make_job()
+        self.make_job(run_after=now + timedelta(minutes=5))  # not due yet
+        self.make_job(status=BackgroundJob.RUNNING, locked_at=now)  # another worker has it
+        stale = self.make_job(status=BackgroundJob.RUNNING, locked_at=now - STALE_AFTER - timedelta(seconds=1))
+        self.make_job(status=BackgroundJob.DONE)
+
+        claimed = claim_jobs()
+        self.assertEqual({job.id for job in claimed}, {due.id, stale.id})
+        self.assertTrue(all(job.status == BackgroundJob.RUNNING and job.locked_at for job in claimed))
+        self.assertEqual(claim_jobs(), [])
+
+    def test_claim_limit(self):
+        for _ in range(3):
+            self.make_job()
+        self.assertEqual(len(claim_jobs(limit=2)), 2)
+        self.assertEqual(len(claim_jobs(limit=2)), 1)
+
+    def test_backoff_doubles_up_to_cap(self):
+        self.assertEqual([backoff(n) for n in range(1, 5)], [5, 10, 20, 40])
+        self.assertEqual(backoff(20), 3600)
+
+    def test_failing_job_retries_with_backoff_then_fails(self):
+        def broken(payload):
+            raise ValueError("boom")
+
+        job = self.make_job(max_attempts=3)
+        with mock.patch.dict(HANDLERS, {"test": broken}):
+            for attempt in (1, 2):
+                [claimed] = claim_jobs()
+                before = timezone.now()
+                self.assertEqual(run_job(claimed), BackgroundJob.PENDING)
+                job.refresh_from_db()
+                self.assertEqual(job.attempts, attempt)
+                self.assertIsNone(job.locked_at)
+                self.assertEqual(job.last_error, "ValueError: boom")
+                delay = (job.run_after - before).total_seconds()
+                self.assertAlmostEqual(delay, backoff(attempt), delta=1)
+                # Not due until the backoff has passed
+                self.assertEqual(claim_jobs(), [])
+                BackgroundJob.objects.filter(id=job.id).update(run_after=timezone.now())
+
+            [claimed] = claim_jobs()
+            self.assertEqual(run_job(claimed), BackgroundJob.FAILED)
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 3)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(claim_jobs(), [])
+
+    def test_retry_job_narrows_payload(self):
+        def partial(payload):
+            raise RetryJob("one left", payload={"tokens": ["b"]})
+
+        job = self.make_job(payload={"tokens": ["a", "b"]})
+        with mock.patch.dict(HANDLERS, {"test": partial}):
+            run_job(claim_jobs()[0])
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.PENDING)
+        self.assertEqual(job.payload, {"tokens": ["b"]})
+
+    def test_unknown_kind_fails_without_retry(self):
+        job = self.make_job(kind="no-such-kind")
+        self.assertEqual(run_job(claim_jobs()[0]), BackgroundJob.FAILED)
+        job.refresh_from_db()
+        self.assertIn("No handler", job.last_error)
+
+
+@override_settings(FCM_URL="https://fcm.test/send", FCM_SERVER_KEY="test-key")
+class FcmMulticastTests(TestCase):
+    def send(self, stub, tokens):
+        with mock.patch.object(utils, "get_fcm_session", return_value=stub), \
+                mock.patch.object(utils.time, "sleep"):
+            return utils.send_fcm_multicast(tokens, "title", "body", data={"event_id": "1"})
+
+    def test_batches_and_sorts_results_per_token(self):
+        stub = StubFcm(errors={"t2": "NotRegistered", "t4": "Unavailable", "t5": "MismatchSenderId"})
+        with mock.patch.object(utils, "FCM_BATCH_SIZE", 2):
+            sent, invalid, retry = self.send(stub, ["t1", "t2", "t3", "t4", "t5"])
+
+        self.assertEqual([r["registration_ids"] for r in stub.requests], [["t1", "t2"], ["t3", "t4"], ["t5"]])
+        self.assertEqual(stub.requests[0]["notification"], {"title": "title", "body": "body"})
+        self.assertEqual(stub.requests[0]["data"], {"event_id": "1"})
+        self.assertEqual((sent, invalid, retry), (2, ["t2"], ["t4"]))
+
+    def test_connection_errors_are_retried(self):
+        stub = StubFcm(fail_batches=2)
+        self.assertEqual(self.send(stub, ["t1"]), (1, [], []))
+        self.assertEqual(len(stub.requests), 3)
+
+    def test_batch_that_keeps_failing_is_returned_for_retry(self):
+        stub = StubFcm(fail_batches=100)
+        with mock.patch.object(utils, "FCM_BATCH_SIZE", 2):
+            sent, invalid, retry = self.send(stub, ["t1", "t2", "t3"])
+        self.assertEqual((sent, invalid, retry), (0, [], ["t1", "t2", "t3"]))
+
+
+@override_settings(FCM_URL="https://fcm.test/send", FCM_SERVER_KEY="test-key")
+class NotifyFallTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        user = User.objects.create_user("caregiver")
+        for token in ("good", "gone", "busy"):
+            Device.objects.create(user=user, token=token)
+        self.event = FallEvent.objects.create(image=jpeg_upload(), location="room1", occurred_at=timezone.now())
+
+    def run_notify(self, stub, payload=None):
+        job = BackgroundJob.objects.create(kind="notify_fall", payload=payload or {"event_id": self.event.id})
+        with mock.patch.object(utils, "get_fcm_session", return_value=stub), \
+                mock.patch.object(utils.time, "sleep"):
+            run_job(claim_jobs()[0])
+        job.refresh_from_db()
+        return job
+
+    def test_not_registered_devices_are_deleted_and_unavailable_retried(self):
+        stub = StubFcm(errors={"gone": "NotRegistered", "busy": "Unavailable"})
+        job = self.run_notify(stub)
+
+        self.assertEqual(sorted(stub.requests[0]["registration_ids"]), ["busy", "gone", "good"])
+        self.assertEqual(sorted(Device.objects.values_list("token", flat=True)), ["busy", "good"])
+        self.assertEqual(job.status, BackgroundJob.PENDING)
+        self.assertEqual(job.payload, {"event_id": self.event.id, "tokens": ["busy"]})
+
+        # The retry only goes to the token that was unavailable
+        BackgroundJob.objects.filter(id=job.id).update(run_after=timezone.now())
+        retry_stub = StubFcm()
+        with mock.patch.object(utils, "get_fcm_session", return_value=retry_stub):
+            self.assertEqual(run_job(claim_jobs()[0]), BackgroundJob.DONE)
+        self.assertEqual(retry_stub.requests[0]["registration_ids"], ["busy"])
+
+    def test_deleted_event_is_skipped(self):
+        event_id = self.event.id
+        self.event.delete()
+        stub = StubFcm()
+        job = self.run_notify(stub, payload={"event_id": event_id})
+        self.assertEqual(job.status, BackgroundJob.DONE)
+        self.assertEqual(stub.requests, [])
@@ -0,0 +1,119 @@
+import asyncio
+import json
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from django.utils import timezone
+
+from fall_service.falls import stream
+from fall_service.falls.models import FallEvent
+from fall_service.falls.pagination import encode_position
+
+BASE_URL = "http://edge.test"
+
+
+def make_event(**fields):
+    return FallEvent.objects.create(
+        image="falls/a.jpg",
+        thumbnail="falls/derived/a_thumb.jpg",
+        medium="falls/derived/a_medium.jpg",
+        image_webp="falls/derived/a.webp",
+        occurred_at=timezone.now(),
+        **fields,
+    )
+
+
+def parse_frame(frame):
+    fields = dict(line.split(": ", 1) for line in frame.strip().split("\n"))
+    fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+class FeedMessageTests(TestCase):
+    def test_every_url_field_is_made_absolute(self):
+        event = make_event()
+        message = stream.message_for(event, "created")
+        frame = parse_frame(message.frame(BASE_URL))
+
+        self.assertEqual(frame["event"], "created")
+        self.assertEqual(frame["id"], encode_position(event.updated_at, event.id))
+        data = frame["data"]
+        self.assertEqual(data["image_url"], f"{BASE_URL}/media/falls/a.jpg")
+        self.assertEqual(data["thumbnail_url"], f"{BASE_URL}/media/falls/derived/a_thumb.jpg")
+        self.assertEqual(data["medium_url"], f"{BASE_URL}/media/falls/derived/a_medium.jpg")
+        self.assertEqual(data["webp_url"], f"{BASE_URL}/media/falls/derived/a.webp")
+        # The shared payload stays relative for the other hosts
+        self.assertEqual(message.payload["thumbnail_url"], "/media/falls/derived/a_thumb.jpg")
+        self.assertIn("http://other.test/media/falls/a.jpg", message.frame("http://other.test"))
+
+    def test_missing_derivative_stays_null(self):
+        event = FallEvent.objects.create(image="falls/b.jpg", occurred_at=timezone.now())
+        data = parse_frame(stream.message_for(event, "created").frame(BASE_URL))["data"]
+        self.assertIsNone(data["webp_url"])
+        self.assertEqual(data["thumbnail_url"], f"{BASE_URL}/media/falls/b.jpg")
+
+    def test_missed_messages_after_position(self):
+        old = make_event()
+        FallEvent.objects.filter(id=old.id).update(updated_at=timezone.now() - timedelta(minutes=5))
+        old.refresh_from_db()
+        checked = make_event()
+        new = make_event()
+        FallEvent.objects.filter(id=checked.id).update(
+            created_at=old.updated_at - timedelta(minutes=1), is_checked=True
+        )
+
+        messages = stream.missed_messages((old.updated_at, old.id))
+        self.assertEqual([m.payload["id"] for m in messages], [checked.id, new.id])
+        # Created before the client's position → it already has the event, this is an edit
+        self.assertEqual([m.event_type for m in messages], ["updated", "created"])
+
+
+class BroadcastHubTests(TestCase):
+    def test_publish_reaches_every_subscriber(self):
+        async def scenario():
+            hub = stream.BroadcastHub()
+            first, second = hub.subscribe(), hub.subscribe()
+            message = stream.FeedMessage("created", "token", {"id": 1})
+            hub.publish(message)
+            received = await asyncio.gather(
+                asyncio.wait_for(first.queue.get(), 1), asyncio.wait_for(second.queue.get(), 1)
+            )
+            hub.unsubscribe(first)
+            return received, hub.subscribers
+
+        received, subscribers = asyncio.run(scenario())
+        self.assertEqual([m.token for m in received], ["token", "token"])
+        self.assertEqual(subscribers, 1)
+
+    def test_slow_subscriber_is_closed(self):
+        async def scenario():
+            subscription = stream.BroadcastHub().subscribe()
+            for n in range(stream.QUEUE_SIZE + 1):
+                subscription.put(stream.FeedMessage("updated", str(n), {}))
+            return subscription.queue.qsize(), subscription.queue.get_nowait()
+
+        self.assertEqual(asyncio.run(scenario()), (1, None))
+
+
+class StreamViewTests(TestCase):
+    def test_needs_asgi(self):
+        self.assertEqual(self.client.get("/api/fall-events/stream/").status_code, 501)
+
+    async def test_resume_replays_missed_events_with_absolute_urls(self):
+        event = await sync_to_async(make_event)()
+        since = encode_position(event.updated_at - timedelta(seconds=1), 0)
+        response = await self.async_client.get("/api/fall-events/stream/", headers={"Last-Event-ID": since})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b"retry: 3000\n\n")
+        frame = parse_frame((await anext(chunks)).decode())
+        await chunks.aclose()
+        self.assertEqual(frame["data"]["id"], event.id)
+        self.assertEqual(frame["data"]["medium_url"], "http://testserver/media/falls/derived/a_medium.jpg")
+
+    async def test_invalid_last_event_id(self):
+        response = await self.async_client.get("/api/fall-events/stream/", headers={"Last-Event-ID": "bad"})
+        self.assertEqual(response.status_code, 400)
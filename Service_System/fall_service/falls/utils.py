@@ -1,15 +1,95 @@
+import threading
+import time
+
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+DEFAULT_FCM_URL = "https://fcm.googleapis.com/fcm/send"
+# FCM legacy HTTP API: at most 1000 registration_ids per multicast request
+FCM_BATCH_SIZE = 1000
+# Per-token errors that mean the token will never work again → delete the Device
+INVALID_TOKEN_ERRORS = {"NotRegistered", "InvalidRegistration", "MissingRegistration"}
+# Per-token errors worth sending again later
+RETRY_TOKEN_ERRORS = {"Unavailable", "InternalServerError", "DeviceMessageRateExceeded"}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_fcm_session():
+    """One pooled session per process, so every send reuses open TLS connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+            session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+            session.headers.update({
+                "Authorization": f"key={settings.FCM_SERVER_KEY}",
+                "Content-Type": "application/json",
+            })
+            _session = session
+        return _session
+
+
+def _post_fcm(data, retries=3, backoff=0.5):
+    """POST one FCM request; 5xx / 429 / connection errors are retried with backoff (Retry-After honoured)."""
+    url = getattr(settings, "FCM_URL", DEFAULT_FCM_URL)
+    timeout = getattr(settings, "FCM_TIMEOUT", 5)
+    session = get_fcm_session()
+    for attempt in range(retries + 1):
+        try:
+            response = session.post(url, json=data, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+        else:
+            if response.status_code < 500 and response.status_code != 429:
+                response.raise_for_status()  # 400 / 401: retrying will not help
+                return response.json()
+            if attempt == retries:
+                response.raise_for_status()
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                time.sleep(min(int(retry_after), 60))
+                continue
+        time.sleep(backoff * 2 ** attempt)
+
+
+def send_fcm_multicast(tokens, title, body, data=None):
+    """
+    Send one notification to many tokens, FCM_BATCH_SIZE per request.
+    Returns (sent, invalid_tokens, retry_tokens).
+    """
+    sent = 0
+    invalid = []
+    retry = []
+    for start in range(0, len(tokens), FCM_BATCH_SIZE):
+        batch = list(tokens[start:start + FCM_BATCH_SIZE])
+        payload = {
+            "registration_ids": batch,
+            "notification": {"title": title, "body": body},
+        }
+        if data:
+            payload["data"] = data
+        try:
+            result = _post_fcm(payload)
+        except requests.RequestException:
+            # Only this batch is sent again later; the others already went out
+            retry.extend(batch)
+            continue
+        # results are in the same order as registration_ids
+        for token, item in zip(batch, result.get("results", [])):
+            error = item.get("error")
+            if error is None:
+                sent += 1
+            elif error in INVALID_TOKEN_ERRORS:
+                invalid.append(token)
+            elif error in RETRY_TOKEN_ERRORS:
+                retry.append(token)
+    return sent, invalid, retry
 
 
 def send_fcm_notification(token, title, body):
-    url = "https://fcm.googleapis.com/fcm/send"
-    headers = {
-        "Authorization": f"key={settings.FCM_SERVER_KEY}",
-        "Content-Type": "application/json",
-    }
-    data = {
-        "to": token,
-        "notification": {"title": title, "body": body},
-    }
-    requests.post(url, json=data, headers=headers, timeout=3)
+    return send_fcm_multicast([token], title, body)
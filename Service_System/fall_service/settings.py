@@ -79,5 +79,12 @@ REST_FRAMEWORK = {
     ]
 }
 
+# /api/fall-events/list/ page size (?page_size= may ask for up to the maximum)
+FALL_EVENTS_PAGE_SIZE = 50
+FALL_EVENTS_MAX_PAGE_SIZE = 200
+
 # Set your FCM server key in environment or override here
 FCM_SERVER_KEY = "replace-with-fcm-server-key"
+# Point at a local stub to test notifications without Google
+FCM_URL = "https://fcm.googleapis.com/fcm/send"
+FCM_TIMEOUT = 5